@@ -224,12 +224,13 @@ def read_video_ids(input_file: Path) -> List[str]:
 
     Args:
         input_file: Path to text file with one video ID per line
+                    (extra columns, e.g. publish date, and # comments are ignored)
 
     Returns:
         List of video IDs (stripped of whitespace, empty lines removed)
     """
     with open(input_file, 'r') as f:
-        video_ids = [line.strip() for line in f if line.strip()]
+        video_ids = [line.split()[0] for line in f if line.strip() and not line.lstrip().startswith('#')]
 
     # Remove duplicates while preserving order
     seen = set()
@@ -13,6 +13,9 @@ import json
 import re
 from pathlib import Path
 
+from lib.artifact_io import invalidate_artifact, load_json_artifact
+from lib.tracing import llm_usage, span
+
 
 class Speaker(BaseModel):
     """Speaker identification"""
@@ -185,8 +188,7 @@ def extract_earnings_insights_auto(
         EarningsInsights object with auto-detected company information
     """
     # Load transcript
-    with open(transcript_file, 'r', encoding='utf-8') as f:
-        transcript_data = json.load(f)
+    transcript_data = load_json_artifact(transcript_file)
 
     # Format transcript for analysis
     formatted_transcript = format_transcript_for_analysis(transcript_data)
@@ -281,14 +283,17 @@ Transcript:
     # Call OpenAI with structured output
     client = OpenAI()
 
-    completion = client.beta.chat.completions.parse(
-        model="gpt-4o-2024-08-06",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        response_format=EarningsInsights,
-    )
+    with span('llm', cat='llm', model="gpt-4o-2024-08-06", purpose='insights',
+              prompt_chars=len(system_prompt) + len(user_prompt)) as traced:
+        completion = client.beta.chat.completions.parse(
+            model="gpt-4o-2024-08-06",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format=EarningsInsights,
+        )
+        traced.set(**llm_usage(completion))
 
     insights = completion.choices[0].message.parsed
 
@@ -309,6 +314,7 @@ Transcript:
                 "created_at": completion.created
             }
             json.dump(raw_output, f, indent=2, ensure_ascii=False)
+        invalidate_artifact(output_file)
 
     return insights
 
@@ -334,8 +340,7 @@ def extract_earnings_insights(
         EarningsInsights object
     """
     # Load transcript
-    with open(transcript_file, 'r', encoding='utf-8') as f:
-        transcript_data = json.load(f)
+    transcript_data = load_json_artifact(transcript_file)
 
     # Format transcript for analysis
     formatted_transcript = format_transcript_for_analysis(transcript_data)
@@ -423,14 +428,17 @@ Transcript:
     # Call OpenAI with structured output
     client = OpenAI()
 
-    completion = client.beta.chat.completions.parse(
-        model="gpt-4o-2024-08-06",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        response_format=EarningsInsights,
-    )
+    with span('llm', cat='llm', model="gpt-4o-2024-08-06", purpose='insights',
+              prompt_chars=len(system_prompt) + len(user_prompt)) as traced:
+        completion = client.beta.chat.completions.parse(
+            model="gpt-4o-2024-08-06",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format=EarningsInsights,
+        )
+        traced.set(**llm_usage(completion))
 
     insights = completion.choices[0].message.parsed
 
@@ -450,6 +458,7 @@ Transcript:
                 "created_at": completion.created
             }
             json.dump(raw_output, f, indent=2, ensure_ascii=False)
+        invalidate_artifact(output_file)
 
     return insights
 
@@ -20,44 +20,22 @@ import sys
 import os
 from pathlib import Path
 from datetime import datetime
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
+sys.path.insert(0, str(Path(__file__).parent))
+from lib import compositing
+from lib.compositing import dot_pattern, linear_gradient, to_image
+
 
 def create_gradient_background(width: int, height: int, color1: tuple, color2: tuple) -> Image.Image:
-    """Create a gradient background from color1 to color2"""
-    base = Image.new('RGB', (width, height), color1)
-    top = Image.new('RGB', (width, height), color2)
-    mask = Image.new('L', (width, height))
-    mask_data = []
-    for y in range(height):
-        for x in range(width):
-            # Diagonal gradient
-            mask_data.append(int(255 * (y / height)))
-    mask.putdata(mask_data)
-    base.paste(top, (0, 0), mask)
-    return base
+    """Create a gradient background from color1 (top) to color2 (bottom)"""
+    return linear_gradient(width, height, color1, color2)
 
 
 def get_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
-    """Get font, trying system fonts"""
-    font_paths = [
-        # Linux fonts
-        '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
-        '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-        # Fallback
-        None
-    ]
-
-    font_path = font_paths[0] if bold else font_paths[1]
-
-    try:
-        if font_path and os.path.exists(font_path):
-            return ImageFont.truetype(font_path, size)
-        # Try to find any TTF font
-        return ImageFont.truetype(font_paths[0], size)
-    except:
-        # Fallback to default
-        return ImageFont.load_default()
+    """Get font, trying system fonts (loaded once per size/weight)"""
+    return compositing.get_font(size, bold)
 
 
 def draw_text_with_shadow(
@@ -112,16 +90,10 @@ def generate_thumbnail(
             (30, 41, 59)    # Slate 800
         )
 
-        draw = ImageDraw.Draw(img, 'RGBA')
+        # Add subtle pattern/texture (50px dots on a 100px grid)
+        img = to_image(dot_pattern(np.asarray(img, dtype=np.float32), 100, 25, (255, 255, 255), 10 / 255))
 
-        # Add subtle pattern/texture
-        for i in range(0, width, 100):
-            for j in range(0, height, 100):
-                opacity = 10
-                draw.ellipse(
-                    [i, j, i + 50, j + 50],
-                    fill=(255, 255, 255, opacity)
-                )
+        draw = ImageDraw.Draw(img, 'RGBA')
 
         # Extract data
         company_name = data.get('company', 'Unknown Company')
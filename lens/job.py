@@ -16,8 +16,13 @@ Usage:
     # Check status
     python job.py status job_001_pltr_q3_2025
 
-    # List all jobs
+    # List jobs (from the catalog index - no job.yaml parsing)
     python job.py list
+    python job.py list --status failed --failed-step transcribe
+    python job.py list --ticker NVDA --since 2025-11-01 --until 2025-11-30
+
+    # Rebuild the catalog index from disk (changed job.yaml files only; --full for all)
+    python job.py reindex
 """
 
 import sys
@@ -32,6 +37,10 @@ from typing import Dict, Any, Optional
 import psycopg2
 import json
 
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.job_catalog import get_catalog, index_saved_job
+from lib.step_payloads import LazyStep, attach_sidecars, externalize, get_threshold
+
 # Directories
 LENS_DIR = Path(__file__).parent
 PROJECT_ROOT = LENS_DIR.parent
@@ -80,30 +89,77 @@ def lookup_company(ticker: str) -> Optional[Dict[str, Any]]:
 class JobManager:
     """Manage job lifecycle"""
 
-    def __init__(self, job_file: Path):
+    def __init__(self, job_file: Path, index: bool = True):
+        """
+        Args:
+            job_file: Path to job.yaml
+            index: Update the job catalog on every save (staged runs index the
+                   shared directory when they sync instead)
+        """
         self.job_file = job_file
+        self.index = index
         self.job = self._load()
+        # Inline steps whose size hasn't been checked since they changed
+        self._dirty = set(
+            step for step, data in self.job.get('processing', {}).items()
+            if isinstance(data, dict) and not isinstance(data, LazyStep)
+        )
 
     def _load(self) -> Dict[str, Any]:
-        """Load job from YAML"""
+        """Load job from YAML (large step payloads stay in steps/*.json until read)"""
         if not self.job_file.exists():
             raise FileNotFoundError(f"Job file not found: {self.job_file}")
 
         with open(self.job_file, 'r') as f:
-            return yaml.safe_load(f)
-
-    def _save(self):
-        """Save job to YAML"""
+            return attach_sidecars(yaml.safe_load(f), self.job_file.parent)
+
+    def _persist_step(self, step: str, data: Any, threshold: Optional[int]) -> Any:
+        """job.yaml form of one step - payloads over the threshold go to steps/<step>.json"""
+        if isinstance(data, LazyStep) and not data.modified:
+            return data.stub()
+        if not isinstance(data, dict) or (step not in self._dirty and not isinstance(data, LazyStep)):
+            return data
+
+        self._dirty.discard(step)
+        stored = externalize(self.job_file.parent, step, data, threshold)
+        if 'sidecar' in stored:
+            # Keep the full data in memory; later saves reuse the sidecar until it changes
+            lazy = LazyStep(data, self.job_file.parent / stored['sidecar']['file'],
+                            stored['sidecar']['keys'], stored['sidecar'])
+            lazy.loaded = True
+            self.job['processing'][step] = lazy
+        elif isinstance(data, LazyStep):
+            # Shrunk below the threshold - back to an ordinary inline step
+            self.job['processing'][step] = stored
+        return stored
+
+    def _save(self, scan_artifacts: bool = False):
+        """Save job to YAML (and update the catalog index)"""
         self.job_file.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(self.job_file, 'w') as f:
-            yaml.dump(self.job, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        document = dict(self.job)
+        if isinstance(self.job.get('processing'), dict):
+            threshold = get_threshold()
+            document['processing'] = {
+                step: self._persist_step(step, data, threshold)
+                for step, data in list(self.job['processing'].items())
+            }
+
+        # Write-then-rename so a worker dying mid-save never leaves a truncated job.yaml
+        tmp_file = self.job_file.with_name(self.job_file.name + '.tmp')
+        with open(tmp_file, 'w') as f:
+            yaml.dump(document, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        os.replace(tmp_file, self.job_file)
+
+        if self.index:
+            index_saved_job(self.job, self.job_file.parent, scan=scan_artifacts)
 
     def update_step(self, step: str, status: str, **data):
         """Update step status and data"""
         # Initialize step if it doesn't exist (backward compatibility)
         if step not in self.job['processing']:
             self.job['processing'][step] = {}
+        self._dirty.add(step)
 
         self.job['processing'][step]['status'] = status
 
@@ -111,20 +167,21 @@ class JobManager:
         for key, value in data.items():
             self.job['processing'][step][key] = value
 
-        self._save()
+        # Artifact sizes only change when a step finishes
+        self._save(scan_artifacts=status in ('completed', 'failed'))
 
     def get_step(self, step: str) -> Dict[str, Any]:
-        """Get step data"""
+        """Get step data (an externalized payload is read from its sidecar when first accessed)"""
         return self.job['processing'].get(step, {})
 
     def get_value(self, step: str, key: str) -> Any:
-        """Get specific value from step"""
+        """Get specific value from step (only loads the sidecar if key lives there)"""
         return self.job['processing'].get(step, {}).get(key)
 
     def set_status(self, status: str):
         """Set overall job status"""
         self.job['status'] = status
-        self._save()
+        self._save(scan_artifacts=True)
 
 
 def generate_random_id(length: int = 4) -> str:
@@ -262,6 +319,7 @@ def create_job(args):
     job_file = job_dir / "job.yaml"
     with open(job_file, 'w') as f:
         yaml.dump(job, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    index_saved_job(job, job_dir)
 
     print()
     print("=" * 60)
@@ -280,71 +338,104 @@ def create_job(args):
     return job_id
 
 
-def list_jobs(args):
-    """List all jobs"""
-    if not JOBS_DIR.exists():
-        print("No jobs directory found")
-        return
+def format_size(size_bytes: Optional[int]) -> str:
+    if size_bytes is None:
+        return '-'
+    if size_bytes >= 1024 ** 3:
+        return f"{size_bytes / 1024 ** 3:.1f} GB"
+    return f"{size_bytes / 1024 ** 2:.1f} MB"
 
-    # Look for job directories containing job.yaml
-    job_dirs = [d for d in JOBS_DIR.iterdir() if d.is_dir() and (d / "job.yaml").exists()]
-    jobs = sorted(job_dirs, key=lambda p: (p / "job.yaml").stat().st_mtime, reverse=True)
+
+def list_jobs(args):
+    """List jobs from the catalog index"""
+    catalog = get_catalog()
+    if args.refresh and JOBS_DIR.exists():
+        catalog.reindex(JOBS_DIR)
+
+    jobs = catalog.query(
+        status=args.status,
+        ticker=args.ticker,
+        since=args.since,
+        until=args.until,
+        failed_step=args.failed_step,
+        workflow=args.workflow,
+        limit=args.limit
+    )
 
     if not jobs:
-        print("No jobs found")
+        print("No jobs found (run 'python job.py reindex' if jobs were created on another machine)")
         return
 
-    print(f"{'Job ID':<40} {'Status':<12} {'Company':<15} {'Created'}")
-    print("-" * 100)
+    print(f"{'Job ID':<40} {'Status':<12} {'Company':<15} {'Created':<20} {'Size':>9}  {'Failed step'}")
+    print("-" * 115)
 
-    for job_dir in jobs:
-        job_file = job_dir / "job.yaml"
-        with open(job_file, 'r') as f:
-            job = yaml.safe_load(f)
-
-        job_id = job['job_id']
-        status = job['status']
-        company = f"{job['company']['ticker']} {job['company']['quarter']}"
-        created = job['created_at'][:19].replace('T', ' ')
+    for job in jobs:
+        company = f"{job['ticker'] or '-'} {job['quarter'] or ''}".strip()
+        created = (job['created_at'] or '')[:19].replace('T', ' ')
+        print(f"{job['job_id']:<40} {job['status'] or '-':<12} {company:<15} {created:<20} "
+              f"{format_size(job['artifact_bytes']):>9}  {job['failed_step'] or ''}")
 
-        print(f"{job_id:<40} {status:<12} {company:<15} {created}")
+    print(f"\n{len(jobs)} jobs")
 
 
 def show_status(args):
-    """Show job status"""
-    job_file = JOBS_DIR / args.job_id / "job.yaml"
-
-    if not job_file.exists():
-        print(f"Job not found: {args.job_id}")
-        sys.exit(1)
-
-    with open(job_file, 'r') as f:
-        job = yaml.safe_load(f)
+    """Show job status (from the catalog index; indexes the job first if it isn't yet)"""
+    catalog = get_catalog()
+    job = catalog.get(args.job_id)
+
+    if job is None:
+        job_file = JOBS_DIR / args.job_id / "job.yaml"
+        if not job_file.exists():
+            print(f"Job not found: {args.job_id}")
+            sys.exit(1)
+        with open(job_file, 'r') as f:
+            catalog.index_job(yaml.safe_load(f), job_file.parent, scan=True)
+        job = catalog.get(args.job_id)
 
     print(f"Job: {job['job_id']}")
     print(f"Status: {job['status']}")
-    print(f"Company: {job['company']['ticker']} {job['company']['quarter']}")
+    print(f"Company: {job['ticker']} {job['quarter']}")
+    print(f"Workflow: {job['workflow']}")
     print(f"Created: {job['created_at']}")
+    print(f"Updated: {job['updated_at']}")
     print()
     print("Processing:")
-    for step_name, step_data in job['processing'].items():
-        status = step_data.get('status', 'pending')
+    for step in job['steps']:
+        status = step['status'] or 'pending'
         icon = "✓" if status == "completed" else "✗" if status == "failed" else "○"
-        print(f"  {icon} {step_name:<15} {status}")
+        print(f"  {icon} {step['step']:<15} {status}")
+        if step['error']:
+            print(f"      {step['error'][:200]}")
 
     print()
     print("Outputs:")
-    if job['outputs'].get('full_video'):
-        print(f"  Full video: {job['outputs']['full_video']}")
-    if job['outputs'].get('youtube_url'):
-        print(f"  YouTube: {job['outputs']['youtube_url']}")
-
-    if job.get('notes'):
+    if job['full_video']:
+        print(f"  Full video: {job['full_video']}")
+    if job['youtube_url']:
+        print(f"  YouTube: {job['youtube_url']}")
+    if job['artifacts']:
+        print(f"  Artifacts: {len(job['artifacts'])} files, {format_size(job['artifact_bytes'])}")
+
+    if job['notes']:
         print()
         print("Notes:")
         print(job['notes'])
 
 
+def reindex_jobs(args):
+    """Rebuild the catalog index from the job directories"""
+    if not JOBS_DIR.exists():
+        print("No jobs directory found")
+        return
+
+    print(f"🔍 Indexing {JOBS_DIR} ({'all jobs' if args.full else 'changed jobs'})...")
+    started = datetime.now()
+    counts = get_catalog().reindex(JOBS_DIR, full=args.full)
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ {counts['indexed']} indexed, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed, {counts['errors']} errors ({elapsed:.1f}s)")
+
+
 def process_job(args):
     """Process job - run workflow steps"""
     job_file = JOBS_DIR / args.job_id / "job.yaml"
@@ -386,7 +477,19 @@ def main():
     create_parser.add_argument('--workflow', required=True, help='Workflow name: manual-audio, youtube-video, or audio-batch')
 
     # List jobs
-    list_parser = subparsers.add_parser('list', help='List all jobs')
+    list_parser = subparsers.add_parser('list', help='List jobs (from the catalog index)')
+    list_parser.add_argument('--status', help='Job status: pending, processing, completed, failed')
+    list_parser.add_argument('--ticker', help='Ticker symbol')
+    list_parser.add_argument('--since', help='Created on or after (YYYY-MM-DD)')
+    list_parser.add_argument('--until', help='Created on or before (YYYY-MM-DD)')
+    list_parser.add_argument('--failed-step', help='Only jobs where this step failed')
+    list_parser.add_argument('--workflow', help='Workflow name')
+    list_parser.add_argument('--limit', type=int, help='Maximum jobs to show')
+    list_parser.add_argument('--refresh', action='store_true', help='Reindex changed jobs first')
+
+    # Rebuild index
+    reindex_parser = subparsers.add_parser('reindex', help='Rebuild the job catalog index from disk')
+    reindex_parser.add_argument('--full', action='store_true', help='Re-parse every job.yaml (default: changed only)')
 
     # Show status
     status_parser = subparsers.add_parser('status', help='Show job status')
@@ -407,6 +510,8 @@ def main():
         list_jobs(args)
     elif args.command == 'status':
         show_status(args)
+    elif args.command == 'reindex':
+        reindex_jobs(args)
     elif args.command == 'process':
         process_job(args)
 
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Artifact I/O - compressed JSON artifacts and a transparent reader
+
+Transcripts and insights are written pretty-printed for humans, but uploaded
+and (optionally) kept on disk as compact, compressed JSON:
+
+    transcripts/transcript.json  ->  transcripts/transcript.json.gz
+
+The R2 object keeps its .json key and is stored with Content-Encoding, so
+clients fetching the signed URL get plain JSON back (decoded by the HTTP stack).
+
+Every lens consumer reads artifacts through load_json_artifact() /
+resolve_artifact(), which fall back to the compressed sibling when the plain
+file was removed.
+
+During a workflow run an ArtifactContext is active: load_json_artifact()
+memoizes parsed artifacts by path and (mtime, size), so the transcript and
+insights are parsed once per run rather than once per step. A rewritten file
+changes its mtime and is re-parsed; writers also call invalidate_artifact().
+Cached objects are shared between steps - treat them as read-only.
+
+Environment:
+    ARTIFACT_ENCODING           gzip (default), zstd (needs `zstandard`) or none
+    ARTIFACT_KEEP_UNCOMPRESSED  false = keep only the compressed form locally
+"""
+
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Suffix appended to the artifact name for each Content-Encoding
+ENCODING_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 9
+
+
+@dataclass
+class CompressedArtifact:
+    """Compressed form of a JSON artifact, ready to upload"""
+    path: Path  # File to upload (compressed, or the plain file when encoding is None)
+    source: Path  # Logical artifact path (plain .json name)
+    encoding: Optional[str]  # 'gzip', 'zstd' or None
+    raw_bytes: int  # Size of the original JSON (compact size if only the compressed form is left)
+    compressed_bytes: int
+
+    @property
+    def ratio(self) -> float:
+        """Original size / uploaded size"""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 1.0
+
+    @property
+    def upload_args(self) -> Dict[str, str]:
+        """S3 ExtraArgs so R2 serves the object as JSON with the right encoding"""
+        args = {'ContentType': 'application/json; charset=utf-8'}
+        if self.encoding:
+            args['ContentEncoding'] = self.encoding
+        return args
+
+
+def get_artifact_encoding() -> Optional[str]:
+    """Configured artifact encoding (None = upload plain JSON)"""
+    encoding = os.getenv('ARTIFACT_ENCODING', 'gzip').lower()
+    if encoding in ('', 'none', 'identity'):
+        return None
+    if encoding not in ENCODING_SUFFIXES:
+        raise ValueError(f"Unsupported ARTIFACT_ENCODING: {encoding} (use gzip, zstd or none)")
+    if encoding == 'zstd' and zstandard is None:
+        print("⚠️  zstandard not installed, falling back to gzip (pip install zstandard)")
+        return 'gzip'
+    return encoding
+
+
+def keep_uncompressed() -> bool:
+    """Whether job directories keep the plain JSON next to the compressed form"""
+    return os.getenv('ARTIFACT_KEEP_UNCOMPRESSED', 'true').lower() not in ('0', 'false', 'no')
+
+
+def compressed_path(path: Path, encoding: str) -> Path:
+    """transcript.json -> transcript.json.gz"""
+    return path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+
+
+def resolve_artifact(path: Path) -> Path:
+    """
+    Find the on-disk file for an artifact
+
+    Returns the plain path if it exists, else an existing compressed sibling,
+    else the plain path unchanged (so callers' existence checks fail as before).
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+    for encoding in ENCODING_SUFFIXES:
+        candidate = compressed_path(path, encoding)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def artifact_exists(path: Path) -> bool:
+    """True if the artifact exists in plain or compressed form"""
+    return resolve_artifact(path).exists()
+
+
+def _encoding_of(path: Path) -> Optional[str]:
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        if path.name.endswith(suffix):
+            return encoding
+    return None
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        # mtime=0 keeps output deterministic so unchanged artifacts skip re-upload
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def _decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst artifacts (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def read_artifact_bytes(path: Path) -> bytes:
+    """Read an artifact's decoded bytes (plain or compressed)"""
+    resolved = resolve_artifact(path)
+    return _decompress(resolved.read_bytes(), _encoding_of(resolved))
+
+
+def open_artifact(path: Path) -> TextIO:
+    """Open an artifact for text reading (plain or compressed)"""
+    return io.StringIO(read_artifact_bytes(path).decode('utf-8'))
+
+
+def load_json_artifact(path: Path) -> Any:
+    """Load a JSON artifact (plain or compressed), from the run's cache when one is active"""
+    context = get_active_context()
+    if context is not None:
+        return context.load_json(path)
+    return json.loads(read_artifact_bytes(path))
+
+
+@dataclass
+class ArtifactStats:
+    """Cache activity for one artifact"""
+    hits: int = 0
+    misses: int = 0
+    parse_seconds: float = 0.0  # Time spent reading + parsing on misses
+    saved_seconds: float = 0.0  # Parse time avoided by hits (last parse time per hit)
+
+
+class ArtifactContext:
+    """Parsed JSON artifacts memoized for one workflow run"""
+
+    def __init__(self):
+        # resolved path -> ((mtime_ns, size), parsed value, parse seconds)
+        self._entries: Dict[str, Tuple[Tuple[int, int], Any, float]] = {}
+        self.stats: Dict[str, ArtifactStats] = {}
+        self._lock = threading.Lock()
+
+    def load_json(self, path: Path) -> Any:
+        """
+        Parsed artifact, re-read only if the file changed since it was cached
+
+        Args:
+            path: Artifact path (plain name; compressed siblings are resolved)
+
+        Returns:
+            Parsed JSON (shared - do not mutate)
+        """
+        resolved = resolve_artifact(path)
+        stat = resolved.stat()
+        key = str(resolved.absolute())
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            stats = self.stats.setdefault(key, ArtifactStats())
+            entry = self._entries.get(key)
+            if entry and entry[0] == signature:
+                stats.hits += 1
+                stats.saved_seconds += entry[2]
+                return entry[1]
+
+        start = time.perf_counter()
+        value = json.loads(_decompress(resolved.read_bytes(), _encoding_of(resolved)))
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._entries[key] = (signature, value, elapsed)
+            stats.misses += 1
+            stats.parse_seconds += elapsed
+        return value
+
+    def invalidate(self, path: Path):
+        """Drop an artifact (plain and compressed forms) after it was rewritten"""
+        path = Path(path)
+        names = [path] + [compressed_path(path, encoding) for encoding in ENCODING_SUFFIXES]
+        with self._lock:
+            for name in names:
+                self._entries.pop(str(name.absolute()), None)
+
+    def totals(self) -> ArtifactStats:
+        """Activity summed over all artifacts"""
+        total = ArtifactStats()
+        with self._lock:
+            for stats in self.stats.values():
+                total.hits += stats.hits
+                total.misses += stats.misses
+                total.parse_seconds += stats.parse_seconds
+                total.saved_seconds += stats.saved_seconds
+        return total
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-artifact stats for artifacts that were read"""
+        with self._lock:
+            return {
+                key: {
+                    'hits': stats.hits,
+                    'misses': stats.misses,
+                    'parse_seconds': round(stats.parse_seconds, 3),
+                    'saved_seconds': round(stats.saved_seconds, 3),
+                }
+                for key, stats in self.stats.items()
+            }
+
+
+_active_context: Optional[ArtifactContext] = None
+
+
+def set_active_context(context: Optional[ArtifactContext]):
+    """
+    Enable artifact caching for this process
+
+    While a context is active, load_json_artifact() reads through it.
+    """
+    global _active_context
+    _active_context = context
+
+
+def get_active_context() -> Optional[ArtifactContext]:
+    """Active context (None = parse on every read)"""
+    return _active_context
+
+
+def invalidate_artifact(path: Path):
+    """Tell the active context (if any) that an artifact was rewritten"""
+    context = get_active_context()
+    if context is not None:
+        context.invalidate(path)
+
+
+def compress_json_artifact(path: Path, encoding: Optional[str] = None) -> CompressedArtifact:
+    """
+    Write the compact, compressed form of a JSON artifact
+
+    Re-encodes as compact JSON (no indentation) before compressing. If the plain
+    file is gone (kept-compressed-only job), the existing compressed file is reused.
+
+    Args:
+        path: Plain artifact path (e.g. job_dir/transcripts/transcript.json)
+        encoding: 'gzip' or 'zstd' (default: ARTIFACT_ENCODING)
+
+    Returns:
+        CompressedArtifact describing the file to upload
+    """
+    path = Path(path)
+    encoding = encoding or get_artifact_encoding()
+
+    if not path.exists():
+        resolved = resolve_artifact(path)
+        if not resolved.exists():
+            raise FileNotFoundError(f"Artifact not found: {path}")
+        existing = _encoding_of(resolved)
+        if existing == encoding or encoding is None:
+            raw = _decompress(resolved.read_bytes(), existing)
+            return CompressedArtifact(resolved, path, existing, len(raw), resolved.stat().st_size)
+        raw = _decompress(resolved.read_bytes(), existing)
+    else:
+        raw = path.read_bytes()
+
+    if encoding is None:
+        return CompressedArtifact(path, path, None, len(raw), len(raw))
+
+    compact = json.dumps(json.loads(raw), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    data = _compress(compact, encoding)
+
+    target = compressed_path(path, encoding)
+    tmp = target.with_name(target.name + '.tmp')
+    tmp.write_bytes(data)
+    tmp.replace(target)
+    invalidate_artifact(path)
+
+    return CompressedArtifact(target, path, encoding, len(raw), len(data))
+
+
+def drop_uncompressed(artifact: CompressedArtifact):
+    """Remove the plain JSON once its compressed form exists"""
+    if artifact.encoding and artifact.path.exists() and artifact.source.exists():
+        artifact.source.unlink()
+        invalidate_artifact(artifact.source)
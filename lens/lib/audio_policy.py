@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Audio policy - decide between stream copy, remux and re-encode
+
+The ffmpeg steps used to re-encode audio unconditionally (MP3 128k for the
+upload, AAC 192k for the banner render) even when the source already had the
+right codec. Each consumer now names a target and asks the policy:
+
+    copy    source file already is the target (codec, bitrate, container)
+    remux   codec/bitrate satisfy the target, only the container differs
+            (-c:a copy into the target container, no decode)
+    encode  anything else - encoded once per job into the job's
+            .audio_cache/ and reused by every later consumer ('cached')
+
+Cache entries are keyed by source path, size, mtime and target, so a replaced
+source is re-encoded and a re-run of the same step is free.
+"""
+
+import hashlib
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.download_cache import link_file
+from lib.media_probe import ProbeError, probe
+from lib.tracing import traced_run
+
+AUDIO_CACHE_DIR = '.audio_cache'
+
+# Audio codecs each output container can carry without re-encoding
+CONTAINER_CODECS = {
+    '.mp4': ('aac', 'mp3', 'alac', 'ac3', 'eac3', 'opus', 'flac'),
+    '.m4a': ('aac', 'alac'),
+    '.mov': ('aac', 'mp3', 'alac', 'ac3', 'pcm_s16le'),
+    '.mp3': ('mp3',),
+    '.webm': ('opus', 'vorbis'),
+    '.mkv': None,  # Anything
+}
+
+
+@dataclass(frozen=True)
+class AudioTarget:
+    """Audio a consumer needs"""
+    name: str
+    codec: str                           # ffprobe codec_name
+    extension: str                       # Container for a standalone audio file
+    bitrate: str                         # Encode bitrate (e.g. '128k')
+    encoder: str                         # ffmpeg encoder
+    sample_rate: Optional[int] = None    # Required sample rate (None = any)
+    max_kbps: Optional[int] = None       # Copy only up to this bitrate (None = any)
+
+    def encoder_args(self):
+        args = ['-c:a', self.encoder, '-b:a', self.bitrate]
+        if self.sample_rate:
+            args += ['-ar', str(self.sample_rate)]
+        return args
+
+
+# Upload audio (BatchProcessor extract_audio -> R2 audio.mp3); higher-bitrate MP3s are re-encoded to keep uploads small
+MP3_UPLOAD = AudioTarget('mp3_128', 'mp3', '.mp3', '128k', 'libmp3lame', sample_rate=44100, max_kbps=160)
+
+# Banner render audio (YouTube re-encodes anyway; any AAC bitrate is fine)
+AAC_RENDER = AudioTarget('aac_192', 'aac', '.m4a', '192k', 'aac')
+
+
+def probe_audio(path: Path) -> Dict:
+    """
+    First audio stream of a media file (memoized probe)
+
+    Returns:
+        Dict with codec_name, bit_rate, sample_rate, channels, duration (empty if probing fails)
+    """
+    try:
+        return probe(path).audio_info()
+    except ProbeError:
+        return {}
+
+
+def container_accepts(extension: str, codec: Optional[str]) -> bool:
+    """Whether an output container can take this audio codec as a stream copy"""
+    codecs = CONTAINER_CODECS.get(extension.lower(), ())
+    return codecs is None or codec in codecs
+
+
+def satisfies(info: Dict, target: AudioTarget) -> bool:
+    """Whether the probed audio stream can be used for target without re-encoding"""
+    if info.get('codec_name') != target.codec:
+        return False
+    if target.sample_rate and info.get('sample_rate') and int(info['sample_rate']) != target.sample_rate:
+        return False
+    if target.max_kbps and info.get('bit_rate') and int(info['bit_rate']) > target.max_kbps * 1000:
+        return False
+    return True
+
+
+def plan(source: Path, target: AudioTarget, info: Optional[Dict] = None) -> str:
+    """
+    How to get target audio from source
+
+    Returns:
+        'copy', 'remux' or 'encode'
+    """
+    info = probe_audio(source) if info is None else info
+    if not satisfies(info, target):
+        return 'encode'
+    if Path(source).suffix.lower() == target.extension:
+        return 'copy'
+    return 'remux'
+
+
+def _cache_path(source: Path, target: AudioTarget, cache_dir: Path, action: str) -> Path:
+    stat = source.stat()
+    key = hashlib.sha1(
+        f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{target.name}|{action}".encode()
+    ).hexdigest()[:16]
+    return cache_dir / f"{target.name}_{key}{target.extension}"
+
+
+def prepare_audio(
+    source: Path,
+    target: AudioTarget,
+    cache_dir: Path,
+    info: Optional[Dict] = None
+) -> Tuple[Path, str]:
+    """
+    Audio file satisfying target, re-encoding at most once per source
+
+    Args:
+        source: Audio or video file (first audio stream is used)
+        target: Required audio
+        cache_dir: Job's audio cache (<job_dir>/.audio_cache)
+        info: probe_audio(source), if already probed
+
+    Returns:
+        (audio file, mode) - mode is 'copy' (source itself), 'remux', 'encode' or 'cached'
+    """
+    source = Path(source)
+    action = plan(source, target, info)
+    if action == 'copy':
+        return source, 'copy'
+
+    cached = _cache_path(source, target, cache_dir, action)
+    if cached.exists():
+        return cached, 'cached'
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_name(cached.stem + '.tmp' + cached.suffix)
+    codec_args = ['-c:a', 'copy'] if action == 'remux' else target.encoder_args()
+    cmd = ['ffmpeg', '-i', str(source), '-vn', '-sn', '-dn', '-map', '0:a:0', *codec_args, '-y', str(tmp)]
+    result = traced_run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        if tmp.exists():
+            tmp.unlink()
+        raise Exception(f"FFmpeg audio {action} failed: {result.stderr}")
+    tmp.replace(cached)
+    return cached, action
+
+
+def materialize_audio(source: Path, target: AudioTarget, dest: Path, cache_dir: Path) -> str:
+    """
+    Put target audio at dest (linked from the cache, never encoded twice)
+
+    Returns:
+        Mode from prepare_audio
+    """
+    audio, mode = prepare_audio(source, target, cache_dir)
+    if Path(audio).resolve() != Path(dest).resolve():
+        link_file(audio, dest)
+    return mode
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Channel state store - watermarks for incremental YouTube channel syncs
+
+Per uploads playlist we keep the newest video seen (id + publish time) and the
+ETag of the first page, so a sync pages only until it reaches the watermark
+and can skip the channel entirely on a 304 (If-None-Match). Channel lookups
+(@handle -> channel id -> uploads playlist) and the earnings classification
+of every video seen are cached too, so nothing is fetched twice.
+
+State lives in SQLite (CHANNEL_STATE_DB, default ~/.markethawk/channel_state.db).
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .sqlite_store import connect, init_schema
+
+DEFAULT_STATE_DB = Path.home() / '.markethawk' / 'channel_state.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_key TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    uploads_playlist_id TEXT NOT NULL,
+    resolved_at TEXT
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_id TEXT PRIMARY KEY,
+    channel_id TEXT,
+    last_video_id TEXT,
+    last_published_at TEXT,
+    etag TEXT,
+    videos_seen INTEGER NOT NULL DEFAULT 0,
+    synced_at TEXT
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    playlist_id TEXT,
+    published_at TEXT,
+    title TEXT,
+    is_earnings INTEGER,
+    first_seen TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_playlist ON videos(playlist_id, published_at)
+"""
+
+
+@dataclass
+class PlaylistState:
+    """Watermark for one uploads playlist"""
+    playlist_id: str
+    channel_id: Optional[str] = None
+    last_video_id: Optional[str] = None
+    last_published_at: Optional[str] = None  # ISO 8601 (RFC 3339), compares lexicographically
+    etag: Optional[str] = None
+    videos_seen: int = 0
+    synced_at: Optional[str] = None
+
+
+class ChannelStateStore:
+    """SQLite-backed channel/playlist watermarks (safe to share across threads)"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: SQLite file (defaults to CHANNEL_STATE_DB or ~/.markethawk/channel_state.db)
+        """
+        self.db_path = Path(db_path or os.getenv('CHANNEL_STATE_DB', DEFAULT_STATE_DB))
+        self._lock = threading.Lock()
+        init_schema(self.db_path, SCHEMA)
+
+    def get_channel(self, channel_key: str) -> Optional[Dict]:
+        """Cached channel resolution for an id or @handle"""
+        with self._lock, connect(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM channels WHERE channel_key = ?", (channel_key,)).fetchone()
+        return dict(row) if row else None
+
+    def save_channel(self, channel_key: str, channel_id: str, uploads_playlist_id: str):
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO channels (channel_key, channel_id, uploads_playlist_id, resolved_at)
+                VALUES (?, ?, ?, ?)
+            """, (channel_key, channel_id, uploads_playlist_id, datetime.now().isoformat()))
+
+    def get_playlist(self, playlist_id: str) -> PlaylistState:
+        """Watermark for a playlist (empty state if never synced)"""
+        with self._lock, connect(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM playlists WHERE playlist_id = ?", (playlist_id,)).fetchone()
+        return PlaylistState(**dict(row)) if row else PlaylistState(playlist_id)
+
+    def save_playlist(self, state: PlaylistState):
+        """Advance a playlist watermark"""
+        state.synced_at = datetime.now().isoformat()
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO playlists
+                    (playlist_id, channel_id, last_video_id, last_published_at, etag, videos_seen, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (state.playlist_id, state.channel_id, state.last_video_id, state.last_published_at,
+                  state.etag, state.videos_seen, state.synced_at))
+
+    def reset_playlist(self, playlist_id: str):
+        """Forget a watermark (next sync lists the whole playlist)"""
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("DELETE FROM playlists WHERE playlist_id = ?", (playlist_id,))
+
+    def known_videos(self, video_ids: Sequence[str]) -> Dict[str, Optional[bool]]:
+        """Cached earnings classification for already-seen videos (None = not classified)"""
+        if not video_ids:
+            return {}
+        with self._lock, connect(self.db_path) as conn:
+            rows = conn.execute(
+                f"SELECT video_id, is_earnings FROM videos WHERE video_id IN ({','.join('?' * len(video_ids))})",
+                list(video_ids)
+            ).fetchall()
+        return {r['video_id']: (None if r['is_earnings'] is None else bool(r['is_earnings'])) for r in rows}
+
+    def record_videos(self, videos: List[Dict], playlist_id: Optional[str] = None):
+        """
+        Remember videos (and their classification)
+
+        Args:
+            videos: Dicts with video_id and optional published_at, title, is_earnings
+        """
+        now = datetime.now().isoformat()
+        with self._lock, connect(self.db_path) as conn:
+            for video in videos:
+                is_earnings = video.get('is_earnings')
+                conn.execute("""
+                    INSERT INTO videos (video_id, playlist_id, published_at, title, is_earnings, first_seen)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (video_id) DO UPDATE SET
+                        playlist_id = COALESCE(excluded.playlist_id, playlist_id),
+                        published_at = COALESCE(excluded.published_at, published_at),
+                        title = COALESCE(excluded.title, title),
+                        is_earnings = COALESCE(excluded.is_earnings, is_earnings)
+                """, (video['video_id'], playlist_id, video.get('published_at'), video.get('title'),
+                      None if is_earnings is None else int(is_earnings), now))
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Compositing - vectorized drawing primitives for thumbnails and banners
+
+Gradients, overlays, dot patterns and text shadows are computed as numpy
+arrays and turned into images with Image.frombuffer, instead of per-pixel
+Python loops (the old 1280x720 gradient built a 921,600-element list) or one
+rectangle per row.
+
+Fonts and image assets are loaded once per process (ImageFont.truetype used
+to be called for every text element of every thumbnail).
+
+render_batch() runs many render tasks (all variations for all jobs of a
+batch) on a process pool - Pillow drawing holds the GIL, so threads don't
+help.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+FONT_BOLD = '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'
+FONT_REGULAR = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+
+Color = Tuple[int, int, int]
+
+
+@lru_cache(maxsize=64)
+def get_font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """TrueType font (cached per size/weight), Pillow's default font if DejaVu is missing"""
+    for path in (FONT_BOLD if bold else FONT_REGULAR, FONT_BOLD):
+        try:
+            if os.path.exists(path):
+                return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=32)
+def _load_asset(path: str, mtime: float, size: Optional[Tuple[int, int]]) -> Image.Image:
+    img = Image.open(path)
+    img.load()
+    if size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    return img
+
+
+def load_asset(path: str, size: Optional[Tuple[int, int]] = None) -> Image.Image:
+    """
+    Image asset (logo, CEO photo, ...) loaded and resized once per process
+
+    Returns:
+        A copy - safe to draw on
+    """
+    return _load_asset(str(path), os.path.getmtime(path), size).copy()
+
+
+def to_image(array: np.ndarray) -> Image.Image:
+    """uint8 H x W x 3 (RGB) or H x W x 4 (RGBA) array -> Image without copying pixel by pixel"""
+    array = np.ascontiguousarray(array, dtype=np.uint8)
+    height, width, channels = array.shape
+    mode = 'RGBA' if channels == 4 else 'RGB'
+    return Image.frombuffer(mode, (width, height), array.tobytes(), 'raw', mode, 0, 1)
+
+
+def _ramp(width: int, height: int, direction: str) -> np.ndarray:
+    """0-1 ramp of shape (H, W, 1) along direction ('vertical', 'horizontal', 'diagonal')"""
+    if direction == 'vertical':
+        t = np.broadcast_to(np.linspace(0, 1, height, endpoint=False, dtype=np.float32)[:, None], (height, width))
+    elif direction == 'horizontal':
+        t = np.broadcast_to(np.linspace(0, 1, width, endpoint=False, dtype=np.float32)[None, :], (height, width))
+    elif direction == 'diagonal':
+        y = np.arange(height, dtype=np.float32)[:, None] / height
+        x = np.arange(width, dtype=np.float32)[None, :] / width
+        t = (x + y) / 2
+    else:
+        raise ValueError(f"Unknown gradient direction: {direction}")
+    return t[..., None]
+
+
+def gradient_array(width: int, height: int, color1: Color, color2: Color, direction: str = 'vertical') -> np.ndarray:
+    """Float32 H x W x 3 linear gradient from color1 to color2"""
+    c1 = np.asarray(color1[:3], dtype=np.float32)
+    c2 = np.asarray(color2[:3], dtype=np.float32)
+    return c1 + (c2 - c1) * _ramp(width, height, direction)
+
+
+def linear_gradient(width: int, height: int, color1: Color, color2: Color, direction: str = 'vertical') -> Image.Image:
+    """RGB gradient image"""
+    return to_image(gradient_array(width, height, color1, color2, direction))
+
+
+def blend(base: np.ndarray, color: Color, alpha: np.ndarray) -> np.ndarray:
+    """
+    Composite a solid color over an RGB array
+
+    Args:
+        base: H x W x 3 array
+        color: Overlay color
+        alpha: Opacity 0-1, broadcastable to H x W (e.g. H x 1 for a per-row fade)
+    """
+    alpha = np.asarray(alpha, dtype=np.float32)
+    if alpha.ndim == 2:
+        alpha = alpha[..., None]
+    return base * (1 - alpha) + np.asarray(color[:3], dtype=np.float32) * alpha
+
+
+def overlay_gradient(img: Image.Image, color: Color, alpha_from: float, alpha_to: float) -> Image.Image:
+    """Fade a color over img from top (alpha_from) to bottom (alpha_to), alpha in 0-1"""
+    width, height = img.size
+    alpha = np.linspace(alpha_from, alpha_to, height, endpoint=False, dtype=np.float32)[:, None]
+    return to_image(blend(np.asarray(img.convert('RGB'), dtype=np.float32), color, alpha))
+
+
+def dot_pattern(base: np.ndarray, spacing: int, radius: int, color: Color, opacity: float) -> np.ndarray:
+    """Grid of soft dots (one per spacing x spacing cell, top-left aligned) over an RGB array"""
+    height, width = base.shape[:2]
+    y = (np.arange(height) % spacing)[:, None] - radius
+    x = (np.arange(width) % spacing)[None, :] - radius
+    inside = (x * x + y * y) <= radius * radius
+    return blend(base, color, inside * np.float32(opacity))
+
+
+def text_shadow(
+    img: Image.Image,
+    text: str,
+    position: Tuple[int, int],
+    font: ImageFont.ImageFont,
+    offset: int = 3,
+    opacity: float = 0.7,
+    blur: int = 0,
+    color: Color = (0, 0, 0)
+) -> Image.Image:
+    """
+    Drop shadow for text (draw the text itself on top afterwards)
+
+    The glyph mask is rendered once, shifted, optionally blurred, and
+    composited with numpy.
+    """
+    mask = Image.new('L', img.size, 0)
+    ImageDraw.Draw(mask).text((position[0] + offset, position[1] + offset), text, font=font, fill=255)
+    if blur:
+        mask = mask.filter(ImageFilter.GaussianBlur(blur))
+    alpha = np.asarray(mask, dtype=np.float32) * (opacity / 255.0)
+    base = np.asarray(img.convert('RGB'), dtype=np.float32)
+    return to_image(blend(base, color, alpha))
+
+
+def centered_x(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, width: int) -> int:
+    """X position that centers text in width"""
+    bbox = draw.textbbox((0, 0), text, font=font)
+    return (width - (bbox[2] - bbox[0])) // 2
+
+
+@dataclass
+class RenderTask:
+    """One image to render in a batch (fn must be a module-level function so it pickles)"""
+    label: str
+    fn: Callable
+    args: tuple = ()
+    kwargs: Dict = field(default_factory=dict)
+
+
+def _run_task(task: RenderTask) -> Dict:
+    started = time.monotonic()
+    try:
+        output = task.fn(*task.args, **task.kwargs)
+        ok = output is not False and output is not None
+        error = None if ok else 'render returned no output'
+    except Exception as e:
+        output, ok, error = None, False, str(e)
+    return {
+        'label': task.label,
+        'success': ok,
+        'output': output,
+        'error': error,
+        'seconds': round(time.monotonic() - started, 3),
+    }
+
+
+def render_batch(tasks: Sequence[RenderTask], workers: Optional[int] = None) -> List[Dict]:
+    """
+    Render many images on a process pool
+
+    Args:
+        tasks: Render tasks
+        workers: Pool size (default: CPU count; 1 = render inline)
+
+    Returns:
+        One result dict per task (label, success, output, error, seconds), in task order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return [_run_task(t) for t in tasks]
+
+    results: List[Optional[Dict]] = [None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = {pool.submit(_run_task, t): i for i, t in enumerate(tasks)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Bulk PostgreSQL helpers - COPY rows into staging tables for set-based merges
+
+Loading hundreds of rows one INSERT at a time pays a round-trip per row.
+These helpers stream rows through a single COPY into a temp staging table so
+callers can merge them into the live table with set-based statements.
+
+apply_table_delta() is the shared delta engine for full-snapshot refreshes
+(companies imports): only inserted/changed/removed rows touch the live table.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# NULL marker used in the CSV stream (same as psql's text format)
+COPY_NULL = r'\N'
+
+
+def _copy_value(value: Any) -> str:
+    """Convert a Python value to its COPY CSV representation"""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def create_staging_table(cursor, name: str, columns: Sequence[Tuple[str, str]]):
+    """
+    Create a temp staging table that is dropped at the end of the transaction
+
+    Args:
+        cursor: psycopg2 cursor (inside an open transaction)
+        name: Staging table name
+        columns: List of (column_name, sql_type) tuples
+    """
+    column_sql = ',\n    '.join(f"{col} {sql_type}" for col, sql_type in columns)
+    cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {name} (
+            {column_sql}
+        ) ON COMMIT DROP;
+    """)
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """
+    Stream rows into a table with a single COPY ... FROM STDIN
+
+    Args:
+        cursor: psycopg2 cursor
+        table: Target table (usually a staging table)
+        columns: Column names, in the same order as each row
+        rows: Iterable of row tuples (dict/list values are JSON-encoded)
+
+    Returns:
+        Number of rows copied
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow([_copy_value(value) for value in row])
+        count += 1
+
+    if count == 0:
+        return 0
+
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer
+    )
+    return count
+
+
+def staging_columns(columns: Sequence[Tuple[str, str]]) -> List[str]:
+    """Return just the column names from a (name, type) column spec"""
+    return [col for col, _ in columns]
+
+
+def apply_table_delta(
+    cursor,
+    table: str,
+    columns: Sequence[Tuple[str, str]],
+    key: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    delete_missing: bool = True,
+    touch_column: str = 'updated_at'
+) -> Dict[str, int]:
+    """
+    Make a live table match a full snapshot, applying only the changed rows
+
+    The snapshot is COPY'd into a temp staging table, then set operations compute:
+    - deletes: live rows whose key is not in the snapshot (if delete_missing)
+    - updates: rows whose key matches but any column differs (IS DISTINCT FROM)
+    - inserts: snapshot rows whose key is not in the live table
+
+    Runs inside the caller's transaction - commit once to apply everything atomically.
+
+    Args:
+        cursor: psycopg2 cursor
+        table: Live table (e.g. 'markethawkeye.companies')
+        columns: (column_name, sql_type) for every snapshot column, key included
+        key: Key column names identifying a row
+        rows: Snapshot rows in column order (duplicate keys: last one wins)
+        delete_missing: Delete live rows that are missing from the snapshot
+        touch_column: Column set to NOW() on updated rows (None to disable)
+
+    Returns:
+        Dict with 'inserted', 'updated', 'deleted', 'unchanged' counts
+    """
+    names = staging_columns(columns)
+    key_idx = [names.index(k) for k in key]
+    value_cols = [c for c in names if c not in key]
+
+    # Deduplicate by key in Python (last row wins) so the merge is deterministic
+    snapshot = {}
+    for row in rows:
+        snapshot[tuple(row[i] for i in key_idx)] = row
+
+    staging = f"{table.split('.')[-1]}_delta_staging"
+    create_staging_table(cursor, staging, columns)
+    copy_rows(cursor, staging, names, snapshot.values())
+
+    key_match = ' AND '.join(f"t.{k} = s.{k}" for k in key)
+
+    deleted = 0
+    if delete_missing:
+        cursor.execute(f"""
+            DELETE FROM {table} t
+            WHERE NOT EXISTS (SELECT 1 FROM {staging} s WHERE {key_match});
+        """)
+        deleted = cursor.rowcount
+
+    updated = 0
+    if value_cols:
+        set_sql = ', '.join(f"{c} = s.{c}" for c in value_cols)
+        if touch_column:
+            set_sql += f", {touch_column} = NOW()"
+        live_values = ', '.join(f"t.{c}" for c in value_cols)
+        new_values = ', '.join(f"s.{c}" for c in value_cols)
+        cursor.execute(f"""
+            UPDATE {table} t
+            SET {set_sql}
+            FROM {staging} s
+            WHERE {key_match}
+              AND ROW({live_values}) IS DISTINCT FROM ROW({new_values});
+        """)
+        updated = cursor.rowcount
+
+    cursor.execute(f"""
+        INSERT INTO {table} ({', '.join(names)})
+        SELECT {', '.join(f's.{c}' for c in names)}
+        FROM {staging} s
+        WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {key_match});
+    """)
+    inserted = cursor.rowcount
+
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'deleted': deleted,
+        'unchanged': len(snapshot) - inserted - updated,
+    }
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Download cache - managed store for downloaded sources
+
+Downloads live in /var/markethawk/_downloads/<video_id>/ (source.mp4 or an
+audio-only source.m4a, metadata.json).
+Instead of copying hundreds of MB into every job directory, cached files are
+linked into the job:
+
+    reflink (copy-on-write clone) -> hardlink -> symlink -> copy
+
+An index (SQLite, DOWNLOAD_CACHE_INDEX, default ~/.markethawk/download_cache.db)
+tracks size and last access per entry plus hit/miss counters. gc() evicts
+least-recently-used entries until the cache fits DOWNLOAD_CACHE_MAX_GB.
+Entries still referenced by a job through a symlink are never evicted: each
+symlink leaves a pin in <entry>/.pins on the cache volume itself, so hosts
+sharing the cache over SMB see each other's links (the index is per machine).
+
+Environment:
+    DOWNLOAD_CACHE_DIR     Cache root (default: /var/markethawk/_downloads)
+    DOWNLOAD_CACHE_MAX_GB  Byte budget for gc (default: 200)
+    DOWNLOAD_CACHE_INDEX   Index database path
+    DOWNLOAD_CACHE_LINK    auto (default), reflink, hardlink, symlink or copy
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .sqlite_store import connect, init_schema
+
+GB = 1024 ** 3
+
+DEFAULT_CACHE_DIR = Path('/var/markethawk/_downloads')
+DEFAULT_INDEX = Path.home() / '.markethawk' / 'download_cache.db'
+DEFAULT_MAX_GB = 200
+
+# Linux FICLONE ioctl (btrfs, xfs with reflink=1, ...)
+FICLONE = 0x40049409
+
+LINK_METHODS = ('reflink', 'hardlink', 'symlink', 'copy')
+
+# Per-entry directory of symlink pins (one file per linked job path)
+PIN_DIR = '.pins'
+
+# Source media preferences: full video, or the audio stream alone (workflows
+# that never show the picture). A cached video also satisfies audio_only.
+MEDIA_PREFERENCES = ('video', 'audio_only')
+AUDIO_EXTENSIONS = ('.m4a', '.webm', '.weba', '.opus', '.mp3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    video_id TEXT PRIMARY KEY,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    created_at REAL,
+    last_access REAL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS links (
+    video_id TEXT NOT NULL,
+    dest_path TEXT NOT NULL,
+    method TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    linked_at REAL,
+    PRIMARY KEY (video_id, dest_path)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)
+"""
+
+
+def _reflink(src: Path, dest: Path):
+    if fcntl is None:
+        raise OSError("reflink not supported on this platform")
+    with open(src, 'rb') as s, open(dest, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dest.unlink()
+            raise
+
+
+def link_file(src: Path, dest: Path, method: str = 'auto') -> str:
+    """
+    Materialize src at dest without copying if the filesystem allows it
+
+    Args:
+        src: Cached file
+        dest: Destination in the job directory (replaced if it exists)
+        method: 'auto' (try reflink, hardlink, symlink, copy in order) or one method
+
+    Returns:
+        Method that succeeded
+    """
+    src, dest = Path(src), Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+
+    methods = LINK_METHODS if method == 'auto' else (method,)
+    for candidate in methods:
+        try:
+            if candidate == 'reflink':
+                _reflink(src, dest)
+            elif candidate == 'hardlink':
+                os.link(src, dest)
+            elif candidate == 'symlink':
+                os.symlink(src.resolve(), dest)
+            else:
+                shutil.copy2(src, dest)
+            return candidate
+        except OSError:
+            if candidate == methods[-1]:
+                raise
+    raise ValueError(f"Unknown link method: {method}")
+
+
+class DownloadCache:
+    """Size-capped LRU store for downloaded sources"""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        index_path: Optional[Path] = None,
+        link_method: Optional[str] = None
+    ):
+        """
+        Args:
+            root: Cache root (default: DOWNLOAD_CACHE_DIR or /var/markethawk/_downloads)
+            max_bytes: Byte budget for gc (default: DOWNLOAD_CACHE_MAX_GB)
+            index_path: Index database (default: DOWNLOAD_CACHE_INDEX)
+            link_method: How files are linked into jobs (default: DOWNLOAD_CACHE_LINK or auto)
+        """
+        self.root = Path(root or os.getenv('DOWNLOAD_CACHE_DIR', DEFAULT_CACHE_DIR))
+        self.max_bytes = max_bytes or int(float(os.getenv('DOWNLOAD_CACHE_MAX_GB', DEFAULT_MAX_GB)) * GB)
+        self.index_path = Path(index_path or os.getenv('DOWNLOAD_CACHE_INDEX', DEFAULT_INDEX))
+        self.link_method = link_method or os.getenv('DOWNLOAD_CACHE_LINK', 'auto')
+        self._lock = threading.Lock()
+        init_schema(self.index_path, SCHEMA)
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute("""
+            INSERT INTO counters (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+        """, (name, amount))
+
+    def entry_dir(self, video_id: str) -> Path:
+        """Cache directory for a video"""
+        return self.root / video_id
+
+    def source_name(self, video_id: str, media: str = 'video') -> Optional[str]:
+        """
+        Cached source file name satisfying a media preference (no hit/miss counted)
+
+        Args:
+            video_id: YouTube video ID
+            media: 'video' (needs source.mp4) or 'audio_only' (audio file preferred, video accepted)
+
+        Returns:
+            File name inside the entry (e.g. 'source.m4a'), or None
+        """
+        entry = self.entry_dir(video_id)
+        if media == 'audio_only':
+            for ext in AUDIO_EXTENSIONS:
+                if (entry / f'source{ext}').exists():
+                    return f'source{ext}'
+        if (entry / 'source.mp4').exists():
+            return 'source.mp4'
+        return None
+
+    def lookup(self, video_id: str, required: Sequence[str] = ('source.mp4',)) -> Optional[Path]:
+        """
+        Check the cache for a video, counting a hit or miss
+
+        Args:
+            video_id: YouTube video ID
+            required: Files that must exist for a hit
+
+        Returns:
+            Entry directory on a hit, None on a miss
+        """
+        entry = self.entry_dir(video_id)
+        hit = all((entry / name).exists() for name in required)
+        now = time.time()
+
+        with self._lock, connect(self.index_path) as conn:
+            self._bump(conn, 'hits' if hit else 'misses')
+            if hit:
+                updated = conn.execute(
+                    "UPDATE entries SET last_access = ?, hits = hits + 1 WHERE video_id = ?", (now, video_id)
+                ).rowcount
+                if not updated:
+                    # Entry predates the index
+                    conn.execute(
+                        "INSERT INTO entries (video_id, size_bytes, created_at, last_access, hits) VALUES (?, ?, ?, ?, 1)",
+                        (video_id, self._dir_size(entry), now, now)
+                    )
+        return entry if hit else None
+
+    def register(self, video_id: str, gc: bool = True):
+        """
+        Record a freshly downloaded entry (then evict LRU entries over budget)
+
+        Args:
+            video_id: YouTube video ID
+            gc: Run eviction afterwards
+        """
+        entry = self.entry_dir(video_id)
+        now = time.time()
+        with self._lock, connect(self.index_path) as conn:
+            conn.execute("""
+                INSERT INTO entries (video_id, size_bytes, created_at, last_access)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET size_bytes = excluded.size_bytes, last_access = excluded.last_access
+            """, (video_id, self._dir_size(entry), now, now))
+            self._bump(conn, 'downloads')
+        if gc:
+            self.gc(keep=[video_id])
+
+    def link_into(self, video_id: str, files: Dict[str, Path]) -> Dict[str, str]:
+        """
+        Link cached files into a job directory
+
+        Args:
+            video_id: YouTube video ID
+            files: Cache file name -> destination path (missing cache files are skipped)
+
+        Returns:
+            Cache file name -> link method used
+        """
+        entry = self.entry_dir(video_id)
+        methods = {}
+        saved = 0
+        now = time.time()
+
+        with self._lock, connect(self.index_path) as conn:
+            for name, dest in files.items():
+                src = entry / name
+                if not src.exists():
+                    continue
+                method = link_file(src, Path(dest), self.link_method)
+                methods[name] = method
+                size = src.stat().st_size
+                if method != 'copy':
+                    saved += size
+                conn.execute("""
+                    INSERT OR REPLACE INTO links (video_id, dest_path, method, size_bytes, linked_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (video_id, str(dest), method, size, now))
+                self._bump(conn, f"link_{method}")
+                if method == 'symlink':
+                    self._pin(video_id, Path(dest))
+            self._bump(conn, 'bytes_saved', saved)
+
+        return methods
+
+    def _dir_size(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+        return sum(f.stat().st_size for f in path.rglob('*') if f.is_file() and not f.is_symlink())
+
+    def _pin(self, video_id: str, dest: Path):
+        """Record a symlink into this entry next to the entry (visible to every host)"""
+        pins = self.entry_dir(video_id) / PIN_DIR
+        pins.mkdir(exist_ok=True)
+        (pins / hashlib.sha1(str(dest).encode()).hexdigest()).write_text(f"{dest}\n")
+
+    def _pinned(self, video_id: str) -> bool:
+        """
+        True if a job on any host still reaches this entry through a symlink
+
+        Pins whose symlink is gone (or now points elsewhere) are removed. A pin
+        whose job directory is not visible from this host counts as live.
+        """
+        pins = self.entry_dir(video_id) / PIN_DIR
+        if not pins.is_dir():
+            return False
+        target = str(self.entry_dir(video_id).resolve()) + os.sep
+        live = False
+        for pin in pins.iterdir():
+            try:
+                dest = Path(pin.read_text().strip())
+            except OSError:
+                continue
+            if not dest.parent.exists():
+                live = True
+            elif dest.is_symlink() and os.readlink(dest).startswith(target):
+                live = True
+            else:
+                pin.unlink(missing_ok=True)
+        return live
+
+    def scan(self) -> int:
+        """
+        Index cache directories that are missing from the index (e.g. pre-existing downloads)
+
+        Returns:
+            Number of entries added
+        """
+        if not self.root.exists():
+            return 0
+        added = 0
+        with self._lock, connect(self.index_path) as conn:
+            known = {r['video_id'] for r in conn.execute("SELECT video_id FROM entries")}
+            for entry in self.root.iterdir():
+                if not entry.is_dir() or entry.name.startswith(('.', '_')) or entry.name in known:
+                    continue
+                mtime = entry.stat().st_mtime
+                conn.execute(
+                    "INSERT INTO entries (video_id, size_bytes, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (entry.name, self._dir_size(entry), mtime, mtime)
+                )
+                added += 1
+            # Forget entries whose directory was removed by hand
+            for video_id in known:
+                if not self.entry_dir(video_id).exists():
+                    conn.execute("DELETE FROM entries WHERE video_id = ?", (video_id,))
+        return added
+
+    def gc(self, max_bytes: Optional[int] = None, dry_run: bool = False, keep: Sequence[str] = ()) -> List[Dict]:
+        """
+        Evict least-recently-used entries until the cache fits the byte budget
+
+        Args:
+            max_bytes: Budget override
+            dry_run: Report what would be evicted without deleting
+            keep: Video IDs that must not be evicted
+
+        Returns:
+            Evicted entries (video_id, size_bytes, last_access)
+        """
+        budget = max_bytes if max_bytes is not None else self.max_bytes
+        evicted = []
+
+        with self._lock, connect(self.index_path) as conn:
+            rows = conn.execute("SELECT * FROM entries ORDER BY last_access ASC").fetchall()
+            total = sum(r['size_bytes'] for r in rows)
+
+            for row in rows:
+                if total <= budget:
+                    break
+                if row['video_id'] in keep or self._pinned(row['video_id']):
+                    continue
+                evicted.append(dict(row))
+                total -= row['size_bytes']
+                if dry_run:
+                    continue
+                shutil.rmtree(self.entry_dir(row['video_id']), ignore_errors=True)
+                conn.execute("DELETE FROM entries WHERE video_id = ?", (row['video_id'],))
+                conn.execute("DELETE FROM links WHERE video_id = ?", (row['video_id'],))
+                self._bump(conn, 'evictions')
+                self._bump(conn, 'bytes_evicted', row['size_bytes'])
+
+        return evicted
+
+    def stats(self) -> Dict:
+        """Cache size, hit rate and bytes saved by linking"""
+        with connect(self.index_path) as conn:
+            counters = {r['name']: r['value'] for r in conn.execute("SELECT * FROM counters")}
+            entries = conn.execute("SELECT COUNT(*) AS n, COALESCE(SUM(size_bytes), 0) AS size FROM entries").fetchone()
+
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        lookups = hits + misses
+        return {
+            'root': str(self.root),
+            'entries': entries['n'],
+            'size_bytes': entries['size'],
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'downloads': counters.get('downloads', 0),
+            'bytes_saved': counters.get('bytes_saved', 0),
+            'evictions': counters.get('evictions', 0),
+            'bytes_evicted': counters.get('bytes_evicted', 0),
+            'links': {m: counters[f"link_{m}"] for m in LINK_METHODS if f"link_{m}" in counters},
+        }
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Persistent download queue for cache warming
+
+Video ids queued by download_to_cache_pipeline.py live in SQLite
+(DOWNLOAD_QUEUE_DB, default ~/.markethawk/download_queue.db), so a long
+cache-warming run can be stopped and resumed, or paused on the RapidAPI daily
+quota and picked up the next day. Two runs can share the queue: a row left
+'in_progress' goes back to 'pending' only once the worker holding it is gone
+(claim leases, lib/sqlite_store; DOWNLOAD_LEASE_SECONDS).
+
+Items are claimed highest priority first (e.g. most recent quarter), then in
+the order they were added. Metadata API calls are counted per UTC day in the
+same database for the daily quota budget.
+"""
+
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .sqlite_store import claim_owner, claim_stale, connect, init_schema, lease_from_env
+
+DEFAULT_QUEUE_DB = Path.home() / '.markethawk' / 'download_queue.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    video_id TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    title TEXT,
+    size_bytes INTEGER,
+    error TEXT,
+    added_at TEXT,
+    updated_at TEXT,
+    owner_host TEXT,
+    owner_pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_downloads_claim ON downloads(status, priority DESC, seq);
+CREATE TABLE IF NOT EXISTS api_usage (
+    day TEXT PRIMARY KEY,
+    calls INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Columns added after the first release (ALTER TABLE on older queue files)
+ADDED_COLUMNS = {'owner_host': 'TEXT', 'owner_pid': 'INTEGER'}
+
+_QUARTER_RE = re.compile(r'^(\d{4})-?Q([1-4])$', re.IGNORECASE)
+_DATE_RE = re.compile(r'^(\d{4})-(\d{2})(?:-\d{2})?')
+
+
+def parse_priority(value: str) -> int:
+    """
+    Priority from a quarter or date (later = higher)
+
+    '2025-Q3' / '2025Q3' -> 20253, '2025-08-14' -> quarter of that date (20253),
+    plain integers are used as-is.
+    """
+    value = value.strip()
+    match = _QUARTER_RE.match(value)
+    if match:
+        return int(match.group(1)) * 10 + int(match.group(2))
+    match = _DATE_RE.match(value)
+    if match:
+        return int(match.group(1)) * 10 + (int(match.group(2)) - 1) // 3 + 1
+    return int(value)
+
+
+def utc_day() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+class DownloadQueue:
+    """SQLite-backed persistent download queue with daily API usage counters"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: SQLite file (defaults to DOWNLOAD_QUEUE_DB or ~/.markethawk/download_queue.db)
+        """
+        self.db_path = Path(db_path or os.getenv('DOWNLOAD_QUEUE_DB', DEFAULT_QUEUE_DB))
+        self._lock = threading.Lock()
+        init_schema(self.db_path, SCHEMA, {'downloads': ADDED_COLUMNS})
+
+    def add(self, items: Sequence[Tuple[str, int]], max_attempts: int = 3) -> int:
+        """
+        Queue video ids (already-queued ids keep their state; priority is raised if higher)
+
+        Args:
+            items: (video_id, priority) pairs, in file order
+
+        Returns:
+            Number of newly queued ids
+        """
+        now = datetime.now().isoformat()
+        with self._lock, connect(self.db_path) as conn:
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM downloads").fetchone()[0]
+            known = {r['video_id'] for r in conn.execute("SELECT video_id FROM downloads")}
+            added = 0
+            for video_id, priority in items:
+                if video_id in known:
+                    conn.execute(
+                        "UPDATE downloads SET priority = MAX(priority, ?) WHERE video_id = ?", (priority, video_id)
+                    )
+                    continue
+                seq += 1
+                conn.execute("""
+                    INSERT INTO downloads (video_id, priority, seq, max_attempts, added_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (video_id, priority, seq, max_attempts, now, now))
+                known.add(video_id)
+                added += 1
+            return added
+
+    def claim_next(self) -> Optional[Dict]:
+        """
+        Atomically claim the highest-priority pending download
+
+        Returns:
+            Row dict, or None if nothing is pending
+        """
+        with self._lock, connect(self.db_path, immediate=True) as conn:
+            row = conn.execute(
+                "SELECT * FROM downloads WHERE status = 'pending' ORDER BY priority DESC, seq LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("""
+                UPDATE downloads
+                SET status = 'in_progress', attempts = attempts + 1, updated_at = ?,
+                    owner_host = ?, owner_pid = ?
+                WHERE video_id = ?
+            """, (datetime.now().isoformat(), *claim_owner(), row['video_id']))
+            claimed = dict(row)
+            claimed['attempts'] += 1
+            return claimed
+
+    def mark(self, video_id: str, status: str, error: Optional[str] = None,
+             title: Optional[str] = None, size_bytes: Optional[int] = None):
+        """Record the outcome of a claimed download"""
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE downloads
+                SET status = ?, error = ?, title = COALESCE(?, title),
+                    size_bytes = COALESCE(?, size_bytes), updated_at = ?
+                WHERE video_id = ?
+            """, (status, error, title, size_bytes, datetime.now().isoformat(), video_id))
+
+    def retry_later(self, video_id: str, error: Optional[str] = None):
+        """Put a failed claim back to 'pending' at the back of its priority band"""
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE downloads
+                SET status = 'pending', error = ?, owner_host = NULL, owner_pid = NULL, updated_at = ?,
+                    seq = (SELECT COALESCE(MAX(seq), 0) + 1 FROM downloads)
+                WHERE video_id = ?
+            """, (error, datetime.now().isoformat(), video_id))
+
+    def requeue_stale(self, lease_seconds: Optional[float] = None) -> int:
+        """
+        Reset downloads left 'in_progress' by a dead worker back to 'pending'
+
+        Args:
+            lease_seconds: Claim lease (default: DOWNLOAD_LEASE_SECONDS or 6 h)
+
+        Returns:
+            Number of downloads put back to 'pending'
+        """
+        lease = lease_seconds if lease_seconds is not None else lease_from_env('DOWNLOAD_LEASE_SECONDS')
+        now = datetime.now()
+        with self._lock, connect(self.db_path, immediate=True) as conn:
+            rows = conn.execute(
+                "SELECT video_id, owner_host, owner_pid, updated_at FROM downloads WHERE status = 'in_progress'"
+            ).fetchall()
+            stale = [row['video_id'] for row in rows if claim_stale(row, lease, now)]
+            for video_id in stale:
+                conn.execute("""
+                    UPDATE downloads SET status = 'pending', owner_host = NULL, owner_pid = NULL, updated_at = ?
+                    WHERE video_id = ?
+                """, (now.isoformat(), video_id))
+            return len(stale)
+
+    def retry_failed(self) -> int:
+        """Put failed downloads back to 'pending' with a fresh attempt budget"""
+        with self._lock, connect(self.db_path) as conn:
+            return conn.execute(
+                "UPDATE downloads SET status = 'pending', attempts = 0, error = NULL, updated_at = ? WHERE status = 'failed'",
+                (datetime.now().isoformat(),)
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of downloads per status"""
+        with self._lock, connect(self.db_path) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM downloads GROUP BY status").fetchall()
+        return {r['status']: r['n'] for r in rows}
+
+    def failures(self, limit: int = 50) -> List[Dict]:
+        with self._lock, connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT video_id, error FROM downloads WHERE status = 'failed' ORDER BY updated_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def api_calls_today(self) -> int:
+        """Metadata API calls counted for the current UTC day"""
+        with self._lock, connect(self.db_path) as conn:
+            row = conn.execute("SELECT calls FROM api_usage WHERE day = ?", (utc_day(),)).fetchone()
+        return row['calls'] if row else 0
+
+    def record_api_call(self, count: int = 1) -> int:
+        """Count metadata API calls against today's quota; returns today's total"""
+        day = utc_day()
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO api_usage (day, calls) VALUES (?, ?)
+                ON CONFLICT (day) DO UPDATE SET calls = calls + excluded.calls
+            """, (day, count))
+            return conn.execute("SELECT calls FROM api_usage WHERE day = ?", (day,)).fetchone()['calls']
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Deferred writer for markethawkeye.earnings_calls
+
+Buffers earnings call records produced by the batch processor and flushes them
+in one transaction:
+1. COPY buffered records into a temp staging table
+2. Set-based upsert into earnings_calls (ON CONFLICT (id) DO UPDATE)
+3. One set-based is_latest recomputation per (symbol, quarter, year)
+
+The matching JSONL export lines are appended in one write after the commit.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psycopg2
+
+from .db_bulk import create_staging_table, copy_rows, staging_columns
+
+STAGING_TABLE = 'earnings_calls_staging'
+
+STAGING_COLUMNS = [
+    ('seq', 'INTEGER'),
+    ('id', 'VARCHAR(255)'),
+    ('cik_str', 'VARCHAR(20)'),
+    ('symbol', 'VARCHAR(10)'),
+    ('quarter', 'VARCHAR(10)'),
+    ('year', 'INTEGER'),
+    ('media_url', 'TEXT'),
+    ('metadata', 'JSONB'),
+    ('artifacts', 'JSONB'),
+]
+
+UPSERT_SQL = f"""
+INSERT INTO markethawkeye.earnings_calls
+  (id, cik_str, symbol, quarter, year, media_url, is_latest, metadata, artifacts)
+SELECT DISTINCT ON (id)
+  id, cik_str, symbol, quarter, year, media_url, false, metadata, artifacts
+FROM {STAGING_TABLE}
+ORDER BY id, seq DESC
+ON CONFLICT (id) DO UPDATE
+SET
+    cik_str = EXCLUDED.cik_str,
+    media_url = EXCLUDED.media_url,
+    metadata = EXCLUDED.metadata,
+    artifacts = EXCLUDED.artifacts,
+    updated_at = NOW();
+"""
+
+# Newest buffered record per (symbol, quarter, year) becomes the only is_latest row
+RECOMPUTE_LATEST_SQL = f"""
+WITH latest AS (
+    SELECT DISTINCT ON (symbol, quarter, year) id, symbol, quarter, year
+    FROM {STAGING_TABLE}
+    ORDER BY symbol, quarter, year, seq DESC
+)
+UPDATE markethawkeye.earnings_calls ec
+SET is_latest = (ec.id = latest.id)
+FROM latest
+WHERE ec.symbol = latest.symbol
+  AND ec.quarter = latest.quarter
+  AND ec.year = latest.year
+  AND ec.is_latest IS DISTINCT FROM (ec.id = latest.id);
+"""
+
+
+class EarningsCallsBuffer:
+    """Buffer earnings_calls records and flush them in a single transaction"""
+
+    def __init__(
+        self,
+        database_url: str,
+        jsonl_file: Optional[Path] = None,
+        max_records: int = 100,
+        max_age_seconds: float = 300.0
+    ):
+        """
+        Initialize buffer
+
+        Args:
+            database_url: PostgreSQL connection URL
+            jsonl_file: Optional JSONL export file (appended on each flush)
+            max_records: Flush once this many records are buffered
+            max_age_seconds: Flush once the oldest buffered record is this old
+        """
+        self.database_url = database_url
+        self.jsonl_file = jsonl_file
+        self.max_records = max_records
+        self.max_age_seconds = max_age_seconds
+
+        self.records: List[Dict] = []
+        self.first_added_at: Optional[float] = None
+        self.total_flushed = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record: Dict):
+        """
+        Buffer one record
+
+        Args:
+            record: Dict with id, cik_str, symbol, quarter, year, media_url,
+                    metadata and artifacts (same shape as the JSONL export)
+        """
+        if not self.records:
+            self.first_added_at = time.monotonic()
+        self.records.append(record)
+
+    def should_flush(self) -> bool:
+        """True when the size or age threshold has been reached"""
+        if not self.records:
+            return False
+        if len(self.records) >= self.max_records:
+            return True
+        age = time.monotonic() - self.first_added_at
+        return age >= self.max_age_seconds
+
+    def flush(self) -> List[Dict]:
+        """
+        Write all buffered records in one transaction
+
+        Returns:
+            The records that were written (buffer is cleared on success)
+
+        Raises:
+            psycopg2.Error: If the transaction fails (buffer is kept for retry)
+        """
+        if not self.records:
+            return []
+
+        records = self.records
+        rows = [
+            (
+                seq,
+                r['id'],
+                r['cik_str'],
+                r['symbol'],
+                r['quarter'],
+                r['year'],
+                r.get('media_url'),
+                r.get('metadata', {}),
+                r.get('artifacts', {}),
+            )
+            for seq, r in enumerate(records)
+        ]
+
+        conn = psycopg2.connect(self.database_url, connect_timeout=10)
+        try:
+            with conn:
+                with conn.cursor() as cursor:
+                    create_staging_table(cursor, STAGING_TABLE, STAGING_COLUMNS)
+                    copy_rows(cursor, STAGING_TABLE, staging_columns(STAGING_COLUMNS), rows)
+                    cursor.execute(UPSERT_SQL)
+                    cursor.execute(RECOMPUTE_LATEST_SQL)
+        finally:
+            conn.close()
+
+        if self.jsonl_file:
+            self.jsonl_file.parent.mkdir(parents=True, exist_ok=True, mode=0o755)
+            with open(self.jsonl_file, 'a') as f:
+                f.write(''.join(json.dumps(r) + '\n' for r in records))
+
+        self.records = []
+        self.first_added_at = None
+        self.total_flushed += len(records)
+        return records
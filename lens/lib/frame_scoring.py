@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Frame scoring - pick thumbnail frames from one decode pass
+
+Instead of one ffmpeg per fixed position (15/35/55/75%), a single ffmpeg
+decodes a downscaled stream between 10% and 90% of the video. Only keyframes
+are decoded (long calls decode quickly), and the first keyframe at least
+`interval` seconds after the previous sample becomes the next one. Keyframes
+are irregular, so each sample keeps its own pts (read from showinfo) and the
+full-resolution extraction seeks to exactly the frame that was scored. Each
+sample is scored with numpy as it arrives:
+
+    sharpness   variance of the Laplacian (blurry transitions score low)
+    contrast    luma standard deviation (flat slides score low)
+    exposure    black / white frames are rejected outright
+    faces       fraction of skin-tone pixels (YCbCr box) - speakers on camera
+    text        edge density - slides with headline numbers
+
+Near-duplicate samples (same slide or camera angle) are dropped against a
+tiny luma signature, and picks are spread across the video. Only the top-k
+timestamps are then extracted at full resolution, all by one more ffmpeg.
+"""
+
+import math
+import re
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, List, Optional, Sequence
+
+import numpy as np
+
+from lib.tracing import file_size, traced_run
+from lib.tracing import span as trace_span
+
+SAMPLE_WIDTH = 320
+SAMPLE_HEIGHT = 180
+MAX_SAMPLES = 120          # Samples per video (interval = span / MAX_SAMPLES)
+MIN_INTERVAL = 2.0         # Seconds between samples for short videos
+SKIP_EDGES = 0.10          # Ignore the first/last 10% (intro cards, end screens)
+DUPLICATE_THRESHOLD = 0.06  # Mean abs difference of signatures (0-1) below which frames are the same shot
+
+# Score weights (each feature is normalized to roughly 0-1)
+WEIGHTS = {
+    'sharpness': 0.30,
+    'contrast': 0.25,
+    'faces': 0.30,
+    'text': 0.15,
+}
+
+
+@dataclass
+class FrameCandidate:
+    """One sampled frame"""
+    timestamp: float
+    score: float
+    sharpness: float
+    contrast: float
+    faces: float
+    text: float
+    signature: np.ndarray
+
+
+def score_frame(rgb: np.ndarray) -> Optional[dict]:
+    """
+    Score one RGB frame (H x W x 3, uint8)
+
+    Returns:
+        Dict of features plus 'score', or None for black/blown-out frames
+    """
+    rgb = rgb.astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    luma = 0.299 * r + 0.587 * g + 0.114 * b
+
+    mean = float(luma.mean())
+    if mean < 18 or mean > 240:
+        return None
+
+    # Laplacian (4-neighbour) over the interior
+    lap = (luma[1:-1, :-2] + luma[1:-1, 2:] + luma[:-2, 1:-1] + luma[2:, 1:-1]
+           - 4 * luma[1:-1, 1:-1])
+    sharpness = min(float(lap.var()) / 1000.0, 1.0)
+
+    contrast = min(float(luma.std()) / 64.0, 1.0)
+    if contrast < 0.05:
+        return None  # Flat color card
+
+    # Skin tones in YCbCr (Chai & Ngan box), ideal when it covers ~5-30% of the frame
+    cb = 128 - 0.168736 * r - 0.331264 * g + 0.5 * b
+    cr = 128 + 0.5 * r - 0.418688 * g - 0.081312 * b
+    skin = float(((cb >= 77) & (cb <= 127) & (cr >= 133) & (cr <= 173)).mean())
+    faces = min(skin / 0.15, 1.0) if skin <= 0.30 else max(0.0, 1.0 - (skin - 0.30) * 2)
+
+    # Edge density (strong horizontal/vertical gradients: text and charts)
+    gx = np.abs(np.diff(luma, axis=1))[:-1, :]
+    gy = np.abs(np.diff(luma, axis=0))[:, :-1]
+    edges = float(((gx + gy) > 60).mean())
+    text = min(edges / 0.08, 1.0)
+
+    features = {'sharpness': sharpness, 'contrast': contrast, 'faces': faces, 'text': text}
+    features['score'] = sum(WEIGHTS[k] * v for k, v in features.items())
+    return features
+
+
+def signature(rgb: np.ndarray) -> np.ndarray:
+    """16x9 mean luma grid (0-1), for near-duplicate detection"""
+    luma = rgb.astype(np.float32).mean(axis=2)
+    h, w = luma.shape
+    grid = luma[: h - h % 9, : w - w % 16].reshape(9, h // 9, 16, w // 16).mean(axis=(1, 3))
+    return grid / 255.0
+
+
+_PTS_TIME = re.compile(rb'Parsed_showinfo.*?pts_time:\s*(-?[\d.]+)')
+
+
+def _read_pts(stream: IO[bytes], pts_times: List[float]):
+    """Collect showinfo pts_time values (one per frame leaving the filter) from ffmpeg's stderr"""
+    for line in stream:
+        match = _PTS_TIME.search(line)
+        if match:
+            pts_times.append(float(match.group(1)))
+
+
+def sample_candidates(video_path: str, duration: float, max_samples: int = MAX_SAMPLES) -> List[FrameCandidate]:
+    """
+    Decode one downscaled pass of the video and score every sample
+
+    Args:
+        video_path: Video file
+        duration: Duration in seconds
+        max_samples: Upper bound on sampled frames
+
+    Returns:
+        Scored candidates (black/flat frames excluded), in time order
+    """
+    start = duration * SKIP_EDGES
+    span = duration * (1 - 2 * SKIP_EDGES)
+    interval = max(span / max_samples, MIN_INTERVAL)
+
+    # Keyframes are decoded as-is (no fps filter, which would repeat the last
+    # keyframe at made-up times); showinfo reports each sample's real pts,
+    # relative to the seek point
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats', '-v', 'info',
+        '-skip_frame', 'nokey',            # Decode keyframes only
+        '-ss', f"{start:.3f}",
+        '-t', f"{span:.3f}",
+        '-i', str(video_path),
+        '-an', '-sn', '-dn',
+        '-vf', (f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{interval:.3f})',"
+                f"showinfo,"
+                f"scale={SAMPLE_WIDTH}:{SAMPLE_HEIGHT}:force_original_aspect_ratio=decrease,"
+                f"pad={SAMPLE_WIDTH}:{SAMPLE_HEIGHT}:(ow-iw)/2:(oh-ih)/2"),
+        '-vsync', 'passthrough',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'
+    ]
+    frame_bytes = SAMPLE_WIDTH * SAMPLE_HEIGHT * 3
+
+    scored = []  # (sample index, features, signature)
+    pts_times: List[float] = []
+    with trace_span('ffmpeg', cat='subprocess', cmd=' '.join(cmd), input_bytes=file_size(video_path)) as traced:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        reader = threading.Thread(target=_read_pts, args=(proc.stderr, pts_times), daemon=True)
+        reader.start()
+        index = 0
+        try:
+            while True:
+                buf = proc.stdout.read(frame_bytes)
+                if len(buf) < frame_bytes:
+                    break
+                rgb = np.frombuffer(buf, dtype=np.uint8).reshape(SAMPLE_HEIGHT, SAMPLE_WIDTH, 3)
+                features = score_frame(rgb)
+                if features is not None:
+                    scored.append((index, features, signature(rgb)))
+                index += 1
+        finally:
+            proc.stdout.close()
+            proc.wait()
+            reader.join()
+            proc.stderr.close()
+
+        # Samples and showinfo lines are in the same order; a sample without a pts is dropped
+        candidates = [
+            FrameCandidate(timestamp=start + pts_times[i], signature=sig, **features)
+            for i, features, sig in scored if i < len(pts_times)
+        ]
+        traced.set(samples=index, candidates=len(candidates))
+    return candidates
+
+
+def select_top(candidates: Sequence[FrameCandidate], k: int, duration: float) -> List[FrameCandidate]:
+    """
+    Best k candidates, skipping near-duplicates and frames too close in time
+
+    Returns:
+        Picks in time order
+    """
+    min_gap = duration / (k * 3) if k else 0
+    picked: List[FrameCandidate] = []
+    for cand in sorted(candidates, key=lambda c: c.score, reverse=True):
+        if len(picked) == k:
+            break
+        if any(abs(cand.timestamp - p.timestamp) < min_gap for p in picked):
+            continue
+        if any(float(np.abs(cand.signature - p.signature).mean()) < DUPLICATE_THRESHOLD for p in picked):
+            continue
+        picked.append(cand)
+    return sorted(picked, key=lambda c: c.timestamp)
+
+
+def extract_full_frames(video_path: str, timestamps: Sequence[float], output_paths: Sequence[str]) -> List[str]:
+    """
+    Write full-resolution frames at timestamps with a single ffmpeg (one seeking input per frame)
+
+    Timestamps are sample pts from sample_candidates; each seek is rounded down
+    to the millisecond so it lands on that keyframe rather than the frame after.
+
+    Returns:
+        Output paths that were written
+    """
+    if not timestamps:
+        return []
+    cmd = ['ffmpeg', '-v', 'error']
+    for ts in timestamps:
+        cmd += ['-ss', f"{math.floor(ts * 1000) / 1000:.3f}", '-i', str(video_path)]
+    for i, path in enumerate(output_paths):
+        cmd += ['-map', f"{i}:v:0", '-frames:v', '1', '-q:v', '2', '-y', str(path)]
+    traced_run(cmd, capture_output=True)
+    return [p for p in output_paths if Path(p).exists()]
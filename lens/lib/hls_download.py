@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+HLS downloader - parallel segment fetch with resume, one local remux
+
+Instead of handing the .m3u8 to ffmpeg (one segment at a time, no resume),
+the playlist is parsed here:
+
+    master playlist -> pick rendition (lowest-bitrate audio for audio_only,
+                       highest-bandwidth variant for video)
+    media playlist  -> fetch segments on a bounded thread pool with retries
+                       into <output>.hls/<track>/<sequence>.<ext>
+    remux           -> join segments (TS/fMP4 are byte-concatenable) and run
+                       a single local `ffmpeg -c copy`
+
+Completed segments stay on disk (written to .part, renamed when complete), so
+an interrupted download resumes with only the missing segments. Live playlists
+(no #EXT-X-ENDLIST) are re-polled every target duration until the stream ends
+or stops producing segments.
+
+Encrypted (EXT-X-KEY) or byte-range playlists are handed to ffmpeg unchanged.
+"""
+
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from lib.ranged_download import MB, get_session
+from lib.tracing import traced_run
+
+DEFAULT_WORKERS = 8
+SEGMENT_ATTEMPTS = 4
+LIVE_IDLE_TIMEOUT = 120  # Seconds without a new live segment before giving up
+
+# Codec prefixes that mean a variant carries video
+VIDEO_CODECS = ('avc', 'hvc', 'hev', 'vp0', 'vp9', 'av01')
+
+_ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_attributes(line: str) -> Dict[str, str]:
+    """#EXT-X-STREAM-INF:BANDWIDTH=1280000,CODECS="mp4a.40.2" -> {'BANDWIDTH': '1280000', ...}"""
+    _, _, attrs = line.partition(':')
+    return {key: value.strip('"') for key, value in _ATTRIBUTE_RE.findall(attrs)}
+
+
+@dataclass
+class Rendition:
+    """One playable stream from a master playlist"""
+    uri: str
+    bandwidth: int = 0
+    codecs: str = ''
+    audio_group: Optional[str] = None  # AUDIO group whose rendition carries the audio
+    audio_only: bool = False
+
+
+@dataclass
+class Segment:
+    sequence: int
+    uri: str
+    duration: float
+
+
+@dataclass
+class MediaPlaylist:
+    segments: List[Segment] = field(default_factory=list)
+    target_duration: float = 6
+    init_uri: Optional[str] = None  # EXT-X-MAP (fMP4)
+    ended: bool = False
+    encrypted: bool = False
+    byte_ranges: bool = False
+
+
+def parse_master(text: str, base_url: str) -> Tuple[List[Rendition], Dict[str, List[Rendition]]]:
+    """
+    Parse a master playlist
+
+    Returns:
+        (variants, audio renditions by GROUP-ID)
+    """
+    variants = []
+    audio_groups: Dict[str, List[Rendition]] = {}
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+
+    for i, line in enumerate(lines):
+        if line.startswith('#EXT-X-MEDIA:'):
+            attrs = parse_attributes(line)
+            if attrs.get('TYPE') == 'AUDIO' and attrs.get('URI'):
+                rendition = Rendition(
+                    uri=urljoin(base_url, attrs['URI']),
+                    bandwidth=int(attrs.get('BANDWIDTH', 0) or 0),
+                    codecs=attrs.get('CODECS', ''),
+                    audio_only=True
+                )
+                audio_groups.setdefault(attrs.get('GROUP-ID', ''), []).append(rendition)
+
+        elif line.startswith('#EXT-X-STREAM-INF:') and i + 1 < len(lines):
+            attrs = parse_attributes(line)
+            codecs = attrs.get('CODECS', '')
+            has_video = 'RESOLUTION' in attrs or any(c.strip().startswith(VIDEO_CODECS) for c in codecs.split(','))
+            variants.append(Rendition(
+                uri=urljoin(base_url, lines[i + 1]),
+                bandwidth=int(attrs.get('BANDWIDTH', 0) or 0),
+                codecs=codecs,
+                audio_group=attrs.get('AUDIO'),
+                audio_only=bool(codecs) and not has_video
+            ))
+
+    return variants, audio_groups
+
+
+def parse_media(text: str, base_url: str) -> MediaPlaylist:
+    """Parse a media playlist into numbered segments"""
+    playlist = MediaPlaylist()
+    sequence = 0
+    duration = 0.0
+
+    for line in (l.strip() for l in text.splitlines()):
+        if not line:
+            continue
+        if line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            sequence = int(line.split(':', 1)[1])
+        elif line.startswith('#EXT-X-TARGETDURATION:'):
+            playlist.target_duration = float(line.split(':', 1)[1])
+        elif line.startswith('#EXTINF:'):
+            duration = float(line.split(':', 1)[1].split(',')[0] or 0)
+        elif line.startswith('#EXT-X-MAP:'):
+            attrs = parse_attributes(line)
+            if playlist.init_uri is None and attrs.get('URI'):
+                playlist.init_uri = urljoin(base_url, attrs['URI'])
+            if 'BYTERANGE' in attrs:
+                playlist.byte_ranges = True
+        elif line.startswith('#EXT-X-KEY:'):
+            if parse_attributes(line).get('METHOD', 'NONE') != 'NONE':
+                playlist.encrypted = True
+        elif line.startswith('#EXT-X-BYTERANGE'):
+            playlist.byte_ranges = True
+        elif line.startswith('#EXT-X-ENDLIST'):
+            playlist.ended = True
+        elif not line.startswith('#'):
+            playlist.segments.append(Segment(sequence, urljoin(base_url, line), duration))
+            sequence += 1
+            duration = 0.0
+
+    return playlist
+
+
+def _extension(uri: str, default: str = '.ts') -> str:
+    suffix = Path(urlparse(uri).path).suffix
+    return suffix if suffix else default
+
+
+class HLSDownloader:
+    """Download an HLS stream with parallel segment fetches and resume"""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        media: str = 'video',
+        session: Optional[requests.Session] = None,
+        timeout: float = 30,
+        live_idle_timeout: float = LIVE_IDLE_TIMEOUT
+    ):
+        """
+        Args:
+            workers: Segments fetched in parallel
+            media: 'video' (best variant) or 'audio_only' (lowest-bitrate audio rendition)
+            session: requests.Session (default: shared pooled session)
+            timeout: Per-request timeout in seconds
+            live_idle_timeout: Stop polling a live playlist after this long without new segments
+        """
+        self.workers = max(1, workers)
+        self.media = media
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.live_idle_timeout = live_idle_timeout
+        self._progress_lock = threading.Lock()
+
+    def _get_text(self, url: str) -> str:
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def select_tracks(self, url: str) -> Dict[str, str]:
+        """
+        Resolve a (master or media) playlist URL to the media playlists to fetch
+
+        Returns:
+            Track name ('main', 'audio') -> media playlist URL
+        """
+        text = self._get_text(url)
+        if '#EXT-X-STREAM-INF' not in text:
+            return {'main': url}
+
+        variants, audio_groups = parse_master(text, url)
+        if not variants:
+            raise ValueError(f"No variants in master playlist: {url}")
+
+        if self.media == 'audio_only':
+            # Lowest-bitrate dedicated audio rendition, then an audio-only variant,
+            # then the smallest muxed variant (video is dropped at remux)
+            renditions = [r for group in audio_groups.values() for r in group]
+            if renditions:
+                return {'main': min(renditions, key=lambda r: r.bandwidth).uri}
+            audio_variants = [v for v in variants if v.audio_only]
+            pool = audio_variants or variants
+            return {'main': min(pool, key=lambda v: v.bandwidth).uri}
+
+        best = max(variants, key=lambda v: v.bandwidth)
+        tracks = {'main': best.uri}
+        if best.audio_group and audio_groups.get(best.audio_group):
+            # Demuxed audio: fetch the group's best rendition alongside the video
+            tracks['audio'] = max(audio_groups[best.audio_group], key=lambda r: r.bandwidth).uri
+        return tracks
+
+    def download(self, url: str, output_path: Path) -> Dict:
+        """
+        Download url to output_path (resuming from segments kept on disk)
+
+        Returns:
+            Dict with size_bytes, seconds, segments, resumed_segments, live, native
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        work_dir = output_path.with_name(output_path.name + '.hls')
+        started = time.monotonic()
+
+        tracks = self.select_tracks(url)
+        joined = {}
+        totals = {'segments': 0, 'resumed_segments': 0, 'live': False}
+
+        for name, playlist_url in tracks.items():
+            result = self._fetch_track(playlist_url, work_dir / name, name)
+            if result is None:
+                # Encrypted/byte-range playlist: let ffmpeg handle the original URL
+                print(f"  ⚠️  Playlist uses encryption or byte ranges, falling back to ffmpeg")
+                self._ffmpeg_remux([url], output_path)
+                return self._result(output_path, started, native=False, **totals)
+            joined[name] = result['joined']
+            totals['segments'] += result['segments']
+            totals['resumed_segments'] += result['resumed']
+            totals['live'] = totals['live'] or result['live']
+
+        self._ffmpeg_remux([joined['main']] + ([joined['audio']] if 'audio' in joined else []), output_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return self._result(output_path, started, native=True, **totals)
+
+    def _result(self, output_path: Path, started: float, native: bool, **totals) -> Dict:
+        return {
+            'size_bytes': output_path.stat().st_size,
+            'seconds': round(time.monotonic() - started, 2),
+            'native': native,
+            **totals,
+        }
+
+    def _fetch_track(self, playlist_url: str, seg_dir: Path, name: str) -> Optional[Dict]:
+        """Fetch all segments of one media playlist (polling while live) and join them"""
+        seg_dir.mkdir(parents=True, exist_ok=True)
+        playlist = parse_media(self._get_text(playlist_url), playlist_url)
+        if playlist.encrypted or playlist.byte_ranges:
+            return None
+
+        live = not playlist.ended
+        ext = _extension(playlist.segments[0].uri) if playlist.segments else '.ts'
+        init_path = None
+        if playlist.init_uri:
+            init_path = seg_dir / f"init{_extension(playlist.init_uri, '.mp4')}"
+            if not init_path.exists():
+                self._fetch_segment(playlist.init_uri, init_path)
+
+        known: Dict[int, Path] = {}
+        futures: List[Future] = []
+        resumed = 0
+        self._done = 0
+        self._bytes = 0
+        self._started = time.monotonic()
+        if live:
+            print(f"  🔴 Live playlist ({name}), polling every {playlist.target_duration:.0f}s")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            last_new = time.monotonic()
+            while True:
+                new = [s for s in playlist.segments if s.sequence not in known]
+                for segment in new:
+                    path = seg_dir / f"{segment.sequence:08d}{ext}"
+                    known[segment.sequence] = path
+                    if path.exists():
+                        resumed += 1
+                        continue
+                    futures.append(executor.submit(self._fetch_segment, segment.uri, path))
+
+                if playlist.ended or not live:
+                    break
+                if new:
+                    last_new = time.monotonic()
+                elif time.monotonic() - last_new > self.live_idle_timeout:
+                    print(f"\n  ⚠️  No new live segments for {self.live_idle_timeout:.0f}s, stopping")
+                    break
+
+                time.sleep(playlist.target_duration)
+                try:
+                    playlist = parse_media(self._get_text(playlist_url), playlist_url)
+                except requests.RequestException as e:
+                    print(f"\n  ⚠️  Playlist refresh failed ({e}), retrying")
+
+            errors = []
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+        print()
+
+        if errors:
+            raise IOError(
+                f"HLS download incomplete ({len(known) - len(errors)}/{len(known)} segments saved, "
+                f"re-run to resume): {errors[0]}"
+            )
+        if resumed:
+            print(f"  Resumed: {resumed} of {len(known)} segments already on disk")
+
+        # TS and fMP4 segments are byte-concatenable; ffmpeg then reads one local file
+        joined = seg_dir / f"joined{_extension(playlist.init_uri, '.mp4') if init_path else ext}"
+        with open(joined, 'wb') as out:
+            for path in ([init_path] if init_path else []) + [known[s] for s in sorted(known)]:
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, out, length=4 * MB)
+
+        return {'joined': joined, 'segments': len(known), 'resumed': resumed, 'live': live}
+
+    def _fetch_segment(self, uri: str, path: Path):
+        """Fetch one segment to path (atomic rename, retrying on failure)"""
+        part = path.with_name(path.name + '.part')
+        for attempt in range(1, SEGMENT_ATTEMPTS + 1):
+            try:
+                response = self.session.get(uri, timeout=self.timeout)
+                response.raise_for_status()
+                part.write_bytes(response.content)
+                part.replace(path)
+                self._report(len(response.content))
+                return
+            except (requests.RequestException, IOError):
+                if attempt == SEGMENT_ATTEMPTS:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _report(self, size: int):
+        with self._progress_lock:
+            self._done += 1
+            self._bytes += size
+            elapsed = max(time.monotonic() - self._started, 1e-6)
+            print(f"\r  Segments: {self._done} ({self._bytes / MB:.1f} MB, {self._bytes / MB / elapsed:.1f} MB/s)", end="")
+
+    def _ffmpeg_remux(self, inputs: List, output_path: Path):
+        """Single local stream-copy remux (video dropped for audio_only)"""
+        cmd = ['ffmpeg']
+        for path in inputs:
+            cmd += ['-i', str(path)]
+        if len(inputs) > 1:
+            cmd += ['-map', '0:v:0', '-map', '1:a:0']
+        elif self.media == 'audio_only':
+            cmd += ['-vn']
+        cmd += ['-c', 'copy', '-bsf:a', 'aac_adtstoasc', '-y', str(output_path)]
+
+        result = traced_run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg remux failed: {result.stderr}")
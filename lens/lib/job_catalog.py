@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Job catalog - SQLite index of every job.yaml for fast list/status queries
+
+/var/markethawk/jobs is an SMB mount; `job.py list` used to open and parse
+every job.yaml on it. The catalog keeps one row per job (workflow, ticker,
+quarter, year, status, timestamps, artifact bytes) plus one row per step,
+and is updated whenever JobManager (or the batch processor) saves a job, so
+listing is a local query:
+
+    jobs        job_id, job_dir, workflow, company, ticker, quarter, year,
+                status, created_at, updated_at, failed_step, youtube_url,
+                full_video, notes, artifact_bytes, yaml_mtime
+    steps       job_id, step, status, started_at, completed_at, failed_at, error
+    artifacts   job_id, path (relative to the job dir), size_bytes
+
+Each machine keeps its own index (SQLite must not live on SMB). Jobs saved
+by another machine show up after `job.py reindex`, which only re-parses
+job.yaml files whose mtime changed (--full re-parses everything).
+
+Environment:
+    JOB_CATALOG_INDEX   Index database path (default: ~/.markethawk/job_catalog.db)
+    JOB_CATALOG         0 = don't update the index on save
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from .sqlite_store import connect, init_schema
+
+DEFAULT_INDEX = Path.home() / '.markethawk' / 'job_catalog.db'
+
+# Job subdirectories whose files count as artifacts (source/ is the batch layout)
+ARTIFACT_DIRS = ('input', 'source', 'audio', 'transcripts', 'renders', 'thumbnails', 'shorts')
+
+# Artifacts at the job root (batch jobs write audio.mp3 next to job.yaml)
+ARTIFACT_FILES = ('audio.mp3',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    job_dir TEXT NOT NULL,
+    workflow TEXT,
+    company TEXT,
+    ticker TEXT,
+    quarter TEXT,
+    year INTEGER,
+    status TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    failed_step TEXT,
+    youtube_url TEXT,
+    full_video TEXT,
+    notes TEXT,
+    artifact_bytes INTEGER,
+    yaml_mtime REAL,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    job_id TEXT NOT NULL,
+    step TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    failed_at TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, step)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    job_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, path)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_ticker ON jobs(ticker);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
+CREATE INDEX IF NOT EXISTS idx_steps_status ON steps(status, step)
+"""
+
+
+def catalog_enabled() -> bool:
+    return os.getenv('JOB_CATALOG', '1').lower() not in ('0', 'false', 'no')
+
+
+def job_fields(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Catalog columns from a job dict (workflow jobs and batch-processor jobs)"""
+    company = job.get('company') or {}
+    insights = job.get('insights') or {}
+    # confirmed lives in the step's sidecar (lib/step_payloads); dict.get (and
+    # no truthiness test on the step) sees it only once loaded, never forcing a read
+    step = (job.get('processing') or {}).get('confirm_metadata')
+    confirmed = (dict.get(step, 'confirmed') if isinstance(step, dict) else None) or {}
+    outputs = job.get('outputs') or {}
+
+    year = company.get('year') or insights.get('year') or confirmed.get('year')
+    try:
+        year = int(year) if year else None
+    except (TypeError, ValueError):
+        year = None
+    ticker = company.get('ticker') or company.get('symbol') or insights.get('company_ticker') or confirmed.get('ticker')
+
+    return {
+        'workflow': job.get('workflow') or job.get('pipeline_type'),
+        'company': company.get('name') or insights.get('company_name') or confirmed.get('company'),
+        'ticker': ticker.upper() if ticker else None,
+        'quarter': company.get('quarter') or insights.get('quarter') or confirmed.get('quarter'),
+        'year': year,
+        'status': job.get('status'),
+        'created_at': job.get('created_at'),
+        'youtube_url': outputs.get('youtube_url'),
+        'full_video': outputs.get('full_video'),
+        'notes': job.get('notes'),
+    }
+
+
+def step_rows(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One row per processing step (batch jobs store the status string directly)"""
+    rows = []
+    for position, (step, data) in enumerate((job.get('processing') or {}).items()):
+        if not isinstance(data, dict):
+            data = {'status': data}
+        error = data.get('error')
+        rows.append({
+            'step': step,
+            'position': position,
+            'status': data.get('status', 'pending'),
+            'started_at': data.get('started_at'),
+            'completed_at': data.get('completed_at'),
+            'failed_at': data.get('failed_at'),
+            'error': str(error)[:1000] if error else None,
+        })
+    return rows
+
+
+def scan_artifacts(job_dir: Path) -> Dict[str, int]:
+    """Sizes of the files in the job's artifact directories (one scandir per directory)"""
+    sizes = {}
+    for name in ARTIFACT_DIRS:
+        try:
+            with os.scandir(job_dir / name) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        sizes[f"{name}/{entry.name}"] = entry.stat().st_size
+        except OSError:
+            continue
+    for name in ARTIFACT_FILES:
+        try:
+            sizes[name] = (job_dir / name).stat().st_size
+        except OSError:
+            continue
+    return sizes
+
+
+class JobCatalog:
+    """SQLite index of job.yaml files"""
+
+    def __init__(self, index_path: Optional[Path] = None):
+        """
+        Args:
+            index_path: Index database (default: JOB_CATALOG_INDEX or ~/.markethawk/job_catalog.db)
+        """
+        self.index_path = Path(index_path or os.getenv('JOB_CATALOG_INDEX', DEFAULT_INDEX))
+        self._lock = threading.Lock()
+        init_schema(self.index_path, SCHEMA)
+
+    def _write(self, conn: sqlite3.Connection, job: Dict[str, Any], job_dir: Path,
+               yaml_mtime: Optional[float], artifacts: Optional[Dict[str, int]]):
+        job_id = job.get('job_id') or job_dir.name
+        steps = step_rows(job)
+        failed = [s['step'] for s in steps if s['status'] == 'failed']
+        fields = job_fields(job)
+        if not fields['status']:
+            # Batch jobs have no overall status - derive it from the steps
+            statuses = {s['status'] for s in steps}
+            fields['status'] = ('failed' if failed else
+                                'completed' if statuses and statuses <= {'completed', 'skipped'} else
+                                'processing' if statuses - {'pending'} else 'pending')
+
+        if artifacts is None:
+            # Keep the last scanned sizes
+            row = conn.execute("SELECT artifact_bytes FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            artifact_bytes = row['artifact_bytes'] if row else None
+        else:
+            artifact_bytes = sum(artifacts.values())
+            conn.execute("DELETE FROM artifacts WHERE job_id = ?", (job_id,))
+            conn.executemany(
+                "INSERT INTO artifacts (job_id, path, size_bytes) VALUES (?, ?, ?)",
+                [(job_id, path, size) for path, size in artifacts.items()]
+            )
+
+        conn.execute("""
+            INSERT OR REPLACE INTO jobs (job_id, job_dir, workflow, company, ticker, quarter, year, status,
+                created_at, updated_at, failed_step, youtube_url, full_video, notes, artifact_bytes,
+                yaml_mtime, indexed_at)
+            VALUES (:job_id, :job_dir, :workflow, :company, :ticker, :quarter, :year, :status,
+                :created_at, :updated_at, :failed_step, :youtube_url, :full_video, :notes, :artifact_bytes,
+                :yaml_mtime, :indexed_at)
+        """, {
+            **fields,
+            'job_id': job_id,
+            'job_dir': str(job_dir),
+            'created_at': str(fields['created_at']) if fields['created_at'] else None,
+            'updated_at': datetime.fromtimestamp(yaml_mtime).isoformat() if yaml_mtime else datetime.now().isoformat(),
+            'failed_step': failed[-1] if failed else None,
+            'artifact_bytes': artifact_bytes,
+            'yaml_mtime': yaml_mtime,
+            'indexed_at': time.time(),
+        })
+        conn.execute("DELETE FROM steps WHERE job_id = ?", (job_id,))
+        conn.executemany("""
+            INSERT INTO steps (job_id, step, position, status, started_at, completed_at, failed_at, error)
+            VALUES (:job_id, :step, :position, :status, :started_at, :completed_at, :failed_at, :error)
+        """, [{**s, 'job_id': job_id} for s in steps])
+
+    def index_job(self, job: Dict[str, Any], job_dir: Path, scan: bool = False):
+        """
+        Upsert one job (called after every save)
+
+        Args:
+            job: Job dict as saved
+            job_dir: Job directory (job.yaml lives inside)
+            scan: Also re-measure artifact sizes (done when a step finishes)
+        """
+        job_dir = Path(job_dir)
+        try:
+            yaml_mtime = (job_dir / 'job.yaml').stat().st_mtime
+        except OSError:
+            yaml_mtime = None
+        artifacts = scan_artifacts(job_dir) if scan else None
+        with self._lock, connect(self.index_path) as conn:
+            self._write(conn, job, job_dir, yaml_mtime, artifacts)
+
+    def remove(self, job_id: str):
+        with self._lock, connect(self.index_path) as conn:
+            for table in ('jobs', 'steps', 'artifacts'):
+                conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+
+    def reindex(self, jobs_dir: Path, full: bool = False) -> Dict[str, int]:
+        """
+        Bring the index in line with the job directories on disk
+
+        Args:
+            jobs_dir: Root with one directory per job
+            full: Re-parse every job.yaml (default: only those whose mtime changed)
+
+        Returns:
+            Counts: indexed, unchanged, removed, errors
+        """
+        with connect(self.index_path) as conn:
+            known = {r['job_dir']: (r['job_id'], r['yaml_mtime'])
+                     for r in conn.execute("SELECT job_id, job_dir, yaml_mtime FROM jobs")}
+
+        counts = {'indexed': 0, 'unchanged': 0, 'removed': 0, 'errors': 0}
+        seen = set()
+        with os.scandir(jobs_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                job_file = Path(entry.path) / 'job.yaml'
+                try:
+                    mtime = job_file.stat().st_mtime
+                except OSError:
+                    continue
+                seen.add(entry.path)
+                previous = known.get(entry.path)
+                if not full and previous and previous[1] == mtime:
+                    counts['unchanged'] += 1
+                    continue
+                try:
+                    with open(job_file) as f:
+                        job = yaml.safe_load(f) or {}
+                    with self._lock, connect(self.index_path) as conn:
+                        self._write(conn, job, Path(entry.path), mtime, scan_artifacts(Path(entry.path)))
+                    counts['indexed'] += 1
+                except (OSError, yaml.YAMLError) as e:
+                    print(f"  ⚠️  {job_file}: {e}")
+                    counts['errors'] += 1
+
+        jobs_root = str(Path(jobs_dir))
+        for job_dir, (job_id, _) in known.items():
+            if job_dir not in seen and str(Path(job_dir).parent) == jobs_root:
+                self.remove(job_id)
+                counts['removed'] += 1
+        return counts
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        ticker: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        failed_step: Optional[str] = None,
+        workflow: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Jobs matching all given filters, newest first
+
+        Args:
+            status: Job status (pending, processing, completed, failed)
+            ticker: Ticker symbol (case-insensitive)
+            since: Created on or after (ISO date or datetime)
+            until: Created on or before (ISO date - the whole day is included)
+            failed_step: Jobs whose step of this name failed
+            workflow: Workflow name
+            limit: Maximum rows
+        """
+        where, params = [], []
+        if status:
+            where.append("j.status = ?")
+            params.append(status)
+        if ticker:
+            where.append("j.ticker = ?")
+            params.append(ticker.upper())
+        if since:
+            where.append("j.created_at >= ?")
+            params.append(since)
+        if until:
+            where.append("j.created_at <= ?")
+            params.append(until if 'T' in until else f"{until}T23:59:59.999999")
+        if failed_step:
+            where.append("EXISTS (SELECT 1 FROM steps s WHERE s.job_id = j.job_id AND s.step = ? AND s.status = 'failed')")
+            params.append(failed_step)
+        if workflow:
+            where.append("j.workflow = ?")
+            params.append(workflow)
+
+        sql = "SELECT j.* FROM jobs j"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY j.created_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with connect(self.index_path) as conn:
+            return [dict(r) for r in conn.execute(sql, params)]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """One job with its steps (in job.yaml order) and artifacts, or None if not indexed"""
+        with connect(self.index_path) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            job['steps'] = [dict(r) for r in conn.execute(
+                "SELECT * FROM steps WHERE job_id = ? ORDER BY position", (job_id,))]
+            job['artifacts'] = [dict(r) for r in conn.execute(
+                "SELECT path, size_bytes FROM artifacts WHERE job_id = ? ORDER BY path", (job_id,))]
+        return job
+
+
+_catalog: Optional[JobCatalog] = None
+
+
+def get_catalog() -> JobCatalog:
+    """Process-wide catalog (opened once)"""
+    global _catalog
+    if _catalog is None:
+        _catalog = JobCatalog()
+    return _catalog
+
+
+def index_saved_job(job: Dict[str, Any], job_dir: Path, scan: bool = False):
+    """Update the catalog after a save - never fails the save itself"""
+    if not catalog_enabled():
+        return
+    try:
+        get_catalog().index_job(job, job_dir, scan=scan)
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️  Job catalog not updated: {e}")
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Job staging - run a job on local scratch, sync to the shared job dir in bulk
+
+/var/markethawk is an SMB mount: reading the source for transcription,
+writing renders and rewriting job.yaml after every state change all go over
+the network. A staged run copies the job directory to local scratch
+(JOB_SCRATCH_DIR/<job>/), runs every step there, and writes results back to
+the shared directory in one pass at checkpoints and at the end of the run:
+
+    stage_in    copy the job (inputs copied, or symlinked with inputs=link);
+                absolute paths in job.yaml and step sidecars are rewritten to
+                the scratch directory
+    sync        copy files changed since the last sync, delete files that
+                were removed, then write job.yaml last (atomically) with the
+                paths rewritten back to the shared directory
+    finish      final sync; scratch is removed after a successful run
+
+Which files were synced (with their scratch mtime/size) is recorded in
+.staging.json in the scratch directory, so a sync never lists or stats the
+shared directory. The manifest also records the shared job.yaml as written
+by the last sync. If the worker dies, the next staged run of the job resumes
+from scratch when the shared job.yaml is unchanged since then (the work of
+completed steps after the last checkpoint is kept), and re-stages from the
+shared directory - the last checkpoint - otherwise. A manifest held by a
+live process on this host is never taken over.
+
+Input files that download steps link from the download cache are copied to
+scratch as well (localize_inputs), so steps read them locally; the shared
+directory keeps its link to the cache.
+
+Environment:
+    JOB_SCRATCH_DIR   Local scratch root (default: ~/.markethawk/scratch)
+"""
+
+import json
+import os
+import re
+import shutil
+import socket
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from lib.sqlite_store import pid_alive
+from lib.tracing import span
+
+DEFAULT_SCRATCH_DIR = Path.home() / '.markethawk' / 'scratch'
+MANIFEST = '.staging.json'
+INPUT_MODES = ('copy', 'link')
+TMP_SUFFIX = '.staging-tmp'
+
+# Files whose contents hold absolute job paths (rewritten in both directions)
+TRANSLATED = ('job.yaml',)
+TRANSLATED_DIRS = ('steps',)
+
+
+def get_scratch_root() -> Path:
+    """Local scratch root for staged jobs"""
+    return Path(os.getenv('JOB_SCRATCH_DIR', DEFAULT_SCRATCH_DIR))
+
+
+def _signature(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _atomic_copy(src: Path, dest: Path):
+    """Copy via a temp file so a dead worker never leaves a partial file behind"""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + TMP_SUFFIX)
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+def _atomic_write(dest: Path, text: str):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + TMP_SUFFIX)
+    tmp.write_text(text)
+    os.replace(tmp, dest)
+
+
+def _is_translated(rel: str) -> bool:
+    parts = Path(rel).parts
+    return rel in TRANSLATED or (len(parts) == 2 and parts[0] in TRANSLATED_DIRS and rel.endswith('.json'))
+
+
+def _walk(root: Path) -> Dict[str, Path]:
+    """Relative path -> path for every file and symlink under root (manifest/temp files excluded)"""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        base = Path(dirpath)
+        # Symlinked directories are entries, not something to descend into
+        for name in list(dirnames):
+            if (base / name).is_symlink():
+                dirnames.remove(name)
+                filenames.append(name)
+        for name in filenames:
+            if name == MANIFEST or name.endswith(TMP_SUFFIX):
+                continue
+            path = base / name
+            files[path.relative_to(root).as_posix()] = path
+    return files
+
+
+class JobStage:
+    """A job directory mirrored on local scratch"""
+
+    def __init__(self, shared_dir: Path, scratch_root: Optional[Path] = None, inputs: str = 'copy'):
+        """
+        Args:
+            shared_dir: Job directory on the shared mount
+            scratch_root: Local scratch root (default: JOB_SCRATCH_DIR)
+            inputs: 'copy' input files to scratch or 'link' them (symlinks to the shared files)
+        """
+        if inputs not in INPUT_MODES:
+            raise ValueError(f"Unknown staging inputs mode: {inputs} (use {' or '.join(INPUT_MODES)})")
+        self.shared_dir = Path(shared_dir).absolute()
+        self.scratch_dir = (scratch_root or get_scratch_root()).absolute() / self.shared_dir.name
+        self.inputs = inputs
+        self.manifest: Dict = {}
+        self.last_sync = time.monotonic()
+
+    @property
+    def job_file(self) -> Path:
+        """job.yaml the staged run works on"""
+        return self.scratch_dir / 'job.yaml'
+
+    def _prefixes(self, to_scratch: bool) -> List[Tuple[str, str]]:
+        shared = {str(self.shared_dir), str(self.shared_dir.resolve())}
+        if to_scratch:
+            return [(prefix, str(self.scratch_dir)) for prefix in sorted(shared, key=len, reverse=True)]
+        return [(str(self.scratch_dir), str(self.shared_dir))]
+
+    def _translate(self, text: str, to_scratch: bool) -> str:
+        for old, new in self._prefixes(to_scratch):
+            # Only whole path components (job_x must not match job_x2)
+            text = re.sub(re.escape(old) + r'(?=[/"\'\s,\]}]|$)', lambda _: new, text, flags=re.M)
+        return text
+
+    def _manifest_path(self) -> Path:
+        return self.scratch_dir / MANIFEST
+
+    def _write_manifest(self):
+        _atomic_write(self._manifest_path(), json.dumps(self.manifest, indent=2))
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            return json.loads(self._manifest_path().read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _can_resume(self, manifest: Dict) -> bool:
+        """Scratch holds the newest state: shared job.yaml untouched since our last sync"""
+        if manifest.get('shared_dir') != str(self.shared_dir):
+            return False
+        if _signature(self.shared_dir / 'job.yaml') != manifest.get('shared_signature'):
+            return False
+        try:
+            with open(self.job_file) as f:
+                return isinstance(yaml.safe_load(f), dict)
+        except (OSError, yaml.YAMLError):
+            return False  # Died mid-save
+
+    @staticmethod
+    def _entry_signature(path: Path) -> List:
+        if path.is_symlink():
+            return ['link', os.readlink(path)]
+        return _signature(path)
+
+    def stage_in(self) -> Path:
+        """
+        Prepare scratch for a run (resuming an interrupted staged run if it is safe)
+
+        Returns:
+            Path to the scratch job.yaml
+        """
+        with span('stage_in', cat='io', job=self.shared_dir.name, inputs=self.inputs):
+            return self._stage_in()
+
+    def _stage_in(self) -> Path:
+        manifest = self._read_manifest()
+        if manifest:
+            pid = manifest.get('pid')
+            if manifest.get('host') == socket.gethostname() and pid != os.getpid() and pid and pid_alive(pid):
+                raise RuntimeError(f"Job is staged by a running worker (pid {pid}): {self.scratch_dir}")
+            if self._can_resume(manifest):
+                self.manifest = manifest
+                self.manifest.update(pid=os.getpid(), resumed_at=datetime.now().isoformat())
+                self._write_manifest()
+                print(f"♻️  Resuming staged job from scratch: {self.scratch_dir}")
+                print(f"   (last sync: {manifest.get('last_sync', 'never')})")
+                return self.job_file
+            print(f"🧹 Discarding stale scratch copy (shared job changed since it was staged)")
+            shutil.rmtree(self.scratch_dir)
+        elif self.scratch_dir.exists():
+            shutil.rmtree(self.scratch_dir)  # Died before the first manifest write
+
+        start = time.monotonic()
+        self.scratch_dir.mkdir(parents=True, exist_ok=True)
+        synced, localized, total_bytes = {}, {}, 0
+
+        for rel, src in _walk(self.shared_dir).items():
+            dest = self.scratch_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if rel.startswith('input/'):
+                # Inputs never sync back: the shared directory already has them
+                if self.inputs == 'link' or not src.is_file():
+                    os.symlink(src.absolute(), dest)
+                else:
+                    shutil.copy2(src, dest)  # Follows cache symlinks
+                    total_bytes += dest.stat().st_size
+                localized[rel] = [None, self._entry_signature(dest)]
+                continue
+            if _is_translated(rel):
+                dest.write_text(self._translate(src.read_text(), to_scratch=True))
+            elif src.is_symlink():
+                os.symlink(os.readlink(src), dest)
+            else:
+                shutil.copy2(src, dest)
+                total_bytes += dest.stat().st_size
+            synced[rel] = self._entry_signature(dest)
+
+        self.manifest = {
+            'shared_dir': str(self.shared_dir),
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'inputs': self.inputs,
+            'staged_at': datetime.now().isoformat(),
+            'last_sync': None,
+            'shared_signature': _signature(self.shared_dir / 'job.yaml'),
+            'synced': synced,
+            'localized': localized,
+        }
+        self._write_manifest()
+        self.last_sync = time.monotonic()
+
+        print(f"📥 Staged job to scratch: {self.scratch_dir}")
+        print(f"   {len(synced) + len(localized)} file(s), {total_bytes / 1024 / 1024:.1f} MB "
+              f"in {time.monotonic() - start:.1f}s (inputs: {self.inputs})")
+        return self.job_file
+
+    def localize_inputs(self) -> int:
+        """
+        Copy input files that link outside scratch (e.g. into the download cache) to scratch
+
+        Returns:
+            Number of files copied
+        """
+        if self.inputs == 'link':
+            return 0
+        input_dir = self.scratch_dir / 'input'
+        if not input_dir.is_dir():
+            return 0
+
+        copied = 0
+        for path in sorted(input_dir.iterdir()):
+            rel = path.relative_to(self.scratch_dir).as_posix()
+            if not path.is_symlink() or rel in self.manifest['localized']:
+                continue
+            target = os.readlink(path)
+            resolved = path.resolve()
+            if not resolved.is_file() or resolved.is_relative_to(self.scratch_dir):
+                continue
+            _atomic_copy(resolved, path.with_name(path.name + '.local'))
+            os.replace(path.with_name(path.name + '.local'), path)
+            # The shared job gets the original link on the next sync
+            self.manifest['localized'][rel] = [target, self._entry_signature(path)]
+            copied += 1
+        if copied:
+            self._write_manifest()
+            print(f"📥 Copied {copied} linked input file(s) to scratch")
+        return copied
+
+    def sync(self, reason: str = 'checkpoint') -> Dict:
+        """
+        Write everything changed on scratch since the last sync to the shared job dir
+
+        Args:
+            reason: Shown in the log ('checkpoint', 'final', ...)
+
+        Returns:
+            Stats: files, bytes, deleted, seconds
+        """
+        with span('staging_sync', cat='io', job=self.shared_dir.name, reason=reason) as traced:
+            stats = self._sync(reason)
+            traced.set(**stats)
+            return stats
+
+    def _sync(self, reason: str) -> Dict:
+        start = time.monotonic()
+        previous = self.manifest['synced']
+        localized = self.manifest['localized']
+        current = _walk(self.scratch_dir)
+        synced, translated = {}, []
+        copied = copied_bytes = 0
+
+        for rel, path in current.items():
+            signature = self._entry_signature(path)
+            if rel in localized:
+                if localized[rel][1] == signature:
+                    continue
+                del localized[rel]  # Rewritten by a step: sync it like any other file
+            synced[rel] = signature
+            if previous.get(rel) == signature:
+                continue
+            if _is_translated(rel):
+                translated.append(rel)
+                continue
+            dest = self.shared_dir / rel
+            if path.is_symlink():
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                if dest.is_symlink() or dest.exists():
+                    dest.unlink()
+                os.symlink(signature[1], dest)
+            else:
+                _atomic_copy(path, dest)
+                copied_bytes += signature[1]
+            copied += 1
+
+        # Links the download steps made on scratch (copied locally since)
+        for rel, (target, _) in localized.items():
+            dest = self.shared_dir / rel
+            if target and not (dest.exists() or dest.is_symlink()):
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.symlink(target, dest)
+                copied += 1
+
+        deleted = 0
+        for rel in previous:
+            if rel not in synced and rel not in localized:
+                dest = self.shared_dir / rel
+                if dest.exists() or dest.is_symlink():
+                    dest.unlink()
+                    deleted += 1
+
+        # Sidecars before job.yaml, job.yaml last: the shared job never points at missing data
+        for rel in sorted(translated, key=lambda r: r in TRANSLATED):
+            _atomic_write(self.shared_dir / rel, self._translate(current[rel].read_text(), to_scratch=False))
+            copied += 1
+
+        self.manifest.update(
+            synced=synced,
+            last_sync=datetime.now().isoformat(),
+            shared_signature=_signature(self.shared_dir / 'job.yaml'),
+        )
+        self._write_manifest()
+        self.last_sync = time.monotonic()
+
+        elapsed = time.monotonic() - start
+        print(f"🔄 Synced to {self.shared_dir} ({reason}): {copied} file(s), "
+              f"{copied_bytes / 1024 / 1024:.1f} MB, {deleted} deleted in {elapsed:.1f}s")
+        return {'files': copied, 'bytes': copied_bytes, 'deleted': deleted, 'seconds': round(elapsed, 2)}
+
+    def seconds_since_sync(self) -> float:
+        return time.monotonic() - self.last_sync
+
+    def finish(self, keep_scratch: bool = False) -> Dict:
+        """
+        Final sync; scratch is removed unless keep_scratch
+
+        Args:
+            keep_scratch: Keep the scratch copy (e.g. after a failed run, for a fast re-run)
+
+        Returns:
+            Stats of the final sync
+        """
+        stats = self.sync(reason='final')
+        if keep_scratch:
+            print(f"   Scratch kept: {self.scratch_dir}")
+        else:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+        return stats
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Media probe - one memoized ffprobe per file
+
+Every caller (thumbnail generator, banner renders, audio policy, transcribe,
+pipeline) used to spawn its own ffprobe for one field of the same file.
+probe(path) runs a single
+
+    ffprobe -show_streams -show_format -of json <path>
+
+and caches the parsed result keyed by (path, size, mtime):
+
+    memory   process-wide, for repeated calls within a run
+    sidecar  <job_dir>/.probe_cache.json, for later steps and re-runs
+             (job_dir = nearest parent with a job.yaml, or passed explicitly)
+
+A replaced or re-rendered file has a new size/mtime and is probed again.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lib.tracing import traced_run
+
+SIDECAR_NAME = '.probe_cache.json'
+
+_memory: Dict[Tuple[str, int, int], 'MediaInfo'] = {}
+_lock = threading.Lock()
+
+
+class ProbeError(Exception):
+    """ffprobe could not read the file"""
+
+
+@dataclass
+class MediaInfo:
+    """Parsed ffprobe output for one file"""
+    path: str
+    streams: List[Dict] = field(default_factory=list)
+    format: Dict = field(default_factory=dict)
+
+    def streams_of(self, kind: str) -> List[Dict]:
+        """Streams of one codec_type ('video', 'audio', 'subtitle', 'data')"""
+        return [s for s in self.streams if s.get('codec_type') == kind]
+
+    def stream(self, kind: str, index: int = 0) -> Optional[Dict]:
+        streams = self.streams_of(kind)
+        return streams[index] if index < len(streams) else None
+
+    def codec(self, kind: str) -> Optional[str]:
+        """codec_name of the first stream of a kind"""
+        stream = self.stream(kind)
+        return stream.get('codec_name') if stream else None
+
+    @property
+    def has_video(self) -> bool:
+        """Real video track (cover art attached to audio files doesn't count)"""
+        return any(
+            not s.get('disposition', {}).get('attached_pic')
+            for s in self.streams_of('video')
+        )
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.streams_of('audio'))
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Container duration in seconds (first stream's if the container has none)"""
+        value = self.format.get('duration')
+        if value is None and self.streams:
+            value = self.streams[0].get('duration')
+        return float(value) if value not in (None, 'N/A') else None
+
+    @property
+    def bit_rate(self) -> Optional[int]:
+        value = self.format.get('bit_rate')
+        return int(value) if value not in (None, 'N/A') else None
+
+    @property
+    def size_bytes(self) -> Optional[int]:
+        value = self.format.get('size')
+        return int(value) if value else None
+
+    @property
+    def resolution(self) -> Optional[str]:
+        stream = self.stream('video')
+        if not stream or not stream.get('width'):
+            return None
+        return f"{stream['width']}x{stream['height']}"
+
+    def audio_info(self) -> Dict:
+        """First audio stream as codec_name, bit_rate, sample_rate, channels, duration (empty if none)"""
+        stream = self.stream('audio')
+        if stream is None:
+            return {}
+        info = {k: stream.get(k) for k in ('codec_name', 'bit_rate', 'sample_rate', 'channels')}
+        # Stream bit_rate is missing for some containers (e.g. webm); use the container's for audio-only files
+        if not info['bit_rate'] and len(self.streams) == 1:
+            info['bit_rate'] = self.format.get('bit_rate')
+        info['duration'] = self.duration
+        return info
+
+
+def find_job_dir(path: Path) -> Optional[Path]:
+    """Nearest parent directory holding a job.yaml (job media lives at most a few levels down)"""
+    for parent in list(path.parents)[:3]:
+        if (parent / 'job.yaml').exists():
+            return parent
+    return None
+
+
+def _read_sidecar(sidecar: Path) -> Dict:
+    try:
+        return json.loads(sidecar.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_sidecar(sidecar: Path, key: str, entry: Dict):
+    """Merge one entry into the sidecar (atomic replace)"""
+    with _lock:
+        cache = _read_sidecar(sidecar)
+        cache[key] = entry
+        tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(cache, indent=2))
+            tmp.replace(sidecar)
+        except OSError:
+            pass  # Read-only job dir - the memory cache still applies
+
+
+def _run_ffprobe(path: Path) -> Dict:
+    cmd = ['ffprobe', '-v', 'error', '-show_streams', '-show_format', '-of', 'json', str(path)]
+    try:
+        result = traced_run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise ProbeError("ffprobe not found. Please install ffmpeg.")
+    if result.returncode != 0:
+        raise ProbeError(f"ffprobe failed for {path}: {result.stderr.strip()}")
+    return json.loads(result.stdout or '{}')
+
+
+def probe(path: Path, job_dir: Optional[Path] = None) -> MediaInfo:
+    """
+    Probe a media file (memoized)
+
+    Args:
+        path: Media file
+        job_dir: Job directory for the sidecar cache (default: found from path)
+
+    Returns:
+        MediaInfo
+
+    Raises:
+        ProbeError: file missing or unreadable by ffprobe
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+        resolved = str(path.resolve())
+    except OSError as e:
+        raise ProbeError(f"Cannot probe {path}: {e}")
+
+    key = (resolved, stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        info = _memory.get(key)
+    if info is not None:
+        return info
+
+    job_dir = job_dir or find_job_dir(path.resolve())
+    sidecar = job_dir / SIDECAR_NAME if job_dir else None
+    if sidecar is not None:
+        entry = _read_sidecar(sidecar).get(resolved)
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            info = MediaInfo(resolved, entry.get('streams', []), entry.get('format', {}))
+
+    if info is None:
+        data = _run_ffprobe(path)
+        info = MediaInfo(resolved, data.get('streams', []), data.get('format', {}))
+        if sidecar is not None:
+            _write_sidecar(sidecar, resolved, {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'streams': info.streams,
+                'format': info.format,
+            })
+
+    with _lock:
+        _memory[key] = info
+    return info
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+R2 uploader - in-process S3-compatible uploads to Cloudflare R2
+
+Replaces one `rclone copyto` process per file with a pooled boto3 client:
+- Large media files use concurrent multipart parts
+- Many small artifacts upload concurrently over the same connection pool
+- Objects whose size and ETag (or stored md5) already match are skipped
+
+Environment:
+    R2_ACCOUNT_ID         Cloudflare account (endpoint https://<id>.r2.cloudflarestorage.com)
+    R2_ACCESS_KEY_ID      Access key
+    R2_SECRET_ACCESS_KEY  Secret key
+    R2_ENDPOINT_URL       Optional endpoint override (e.g. local MinIO: http://localhost:9000)
+    R2_BUCKET_NAME        Default bucket
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+MB = 1024 * 1024
+
+# Multipart settings (parts are uploaded concurrently)
+DEFAULT_MULTIPART_THRESHOLD = 64 * MB
+DEFAULT_PART_SIZE = 16 * MB
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class UploadResult:
+    """Result of a single object upload"""
+    local_path: str
+    bucket: str
+    key: str
+    status: str  # 'uploaded', 'skipped' (already up to date), 'queued' (background), 'failed'
+    size_bytes: int = 0
+    etag: Optional[str] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+    extra: Dict = field(default_factory=dict)
+    upload_id: Optional[int] = None  # Upload queue id when status is 'queued'
+
+    @property
+    def ok(self) -> bool:
+        return self.status != 'failed'
+
+    @property
+    def r2_url(self) -> str:
+        """r2:// URL format (signed URL generated on-demand by the web app)"""
+        return f"r2://{self.bucket}/{self.key}"
+
+    @property
+    def mb_per_second(self) -> float:
+        if self.status != 'uploaded' or self.seconds <= 0:
+            return 0.0
+        return self.size_bytes / MB / self.seconds
+
+
+def _file_digests(path: Path, part_size: int) -> Tuple[str, str]:
+    """
+    Compute md5 hex and the S3-style multipart ETag in one pass
+
+    Returns:
+        (md5_hex, multipart_etag) - multipart_etag is md5-of-part-md5s + '-<parts>'
+    """
+    full = hashlib.md5()
+    part_digests = []
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(part_size)
+            if not chunk:
+                break
+            full.update(chunk)
+            part_digests.append(hashlib.md5(chunk).digest())
+    combined = hashlib.md5(b''.join(part_digests)).hexdigest()
+    return full.hexdigest(), f"{combined}-{len(part_digests)}"
+
+
+class R2Uploader:
+    """Pooled S3-compatible uploader for R2"""
+
+    def __init__(
+        self,
+        bucket: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        part_size: int = DEFAULT_PART_SIZE,
+        endpoint_url: Optional[str] = None
+    ):
+        """
+        Initialize uploader
+
+        Args:
+            bucket: Default bucket (falls back to R2_BUCKET_NAME)
+            max_workers: Concurrent object uploads and multipart parts per object
+            multipart_threshold: Files at or above this size use multipart upload
+            part_size: Multipart part size in bytes
+            endpoint_url: S3 endpoint (falls back to R2_ENDPOINT_URL / R2_ACCOUNT_ID)
+        """
+        self.bucket = bucket or os.getenv('R2_BUCKET_NAME')
+        if not self.bucket:
+            raise ValueError("R2 bucket not set (pass bucket= or set R2_BUCKET_NAME)")
+
+        self.max_workers = max_workers
+        self.part_size = part_size
+        self.multipart_threshold = multipart_threshold
+
+        if not endpoint_url:
+            endpoint_url = os.getenv('R2_ENDPOINT_URL')
+        if not endpoint_url:
+            account_id = os.getenv('R2_ACCOUNT_ID')
+            if not account_id:
+                raise ValueError("R2 endpoint not set (set R2_ENDPOINT_URL or R2_ACCOUNT_ID)")
+            endpoint_url = f"https://{account_id}.r2.cloudflarestorage.com"
+
+        # One client, one connection pool: sized for concurrent objects x concurrent parts
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            aws_access_key_id=os.getenv('R2_ACCESS_KEY_ID'),
+            aws_secret_access_key=os.getenv('R2_SECRET_ACCESS_KEY'),
+            region_name='auto',
+            config=Config(
+                max_pool_connections=max_workers * 4,
+                retries={'max_attempts': 5, 'mode': 'adaptive'},
+                s3={'addressing_style': 'path'}
+            )
+        )
+
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=part_size,
+            max_concurrency=max_workers,
+            use_threads=True
+        )
+
+    def _remote_matches(self, bucket: str, key: str, path: Path, size: int) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Check whether the remote object already matches the local file
+
+        The file is only hashed once HEAD shows an object of the same size, so
+        new or changed files are uploaded without an extra full read.
+
+        Returns:
+            (matches, remote_etag, local_md5) - local_md5 is None if the file wasn't hashed
+        """
+        try:
+            head = self.client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False, None, None
+            raise
+
+        remote_etag = head.get('ETag', '').strip('"')
+        if head.get('ContentLength') != size:
+            return False, remote_etag, None
+
+        md5_hex, multipart_etag = _file_digests(path, self.part_size)
+        remote_md5 = head.get('Metadata', {}).get('md5')
+        matches = remote_md5 == md5_hex or remote_etag in (md5_hex, multipart_etag)
+        return matches, remote_etag, md5_hex
+
+    def upload_file(
+        self,
+        local_path: Path,
+        key: str,
+        bucket: Optional[str] = None,
+        content_type: Optional[str] = None,
+        extra_args: Optional[Dict] = None,
+        skip_unchanged: bool = True
+    ) -> UploadResult:
+        """
+        Upload one file (multipart with concurrent parts above the threshold)
+
+        Args:
+            local_path: File to upload
+            key: Object key (R2 path without bucket)
+            bucket: Bucket override
+            content_type: Content-Type (guessed from extension if omitted)
+            extra_args: Extra boto3 ExtraArgs (e.g. ContentEncoding, CacheControl)
+            skip_unchanged: Skip when remote size and ETag/md5 already match
+
+        Returns:
+            UploadResult (status 'failed' with error instead of raising)
+        """
+        local_path = Path(local_path)
+        bucket = bucket or self.bucket
+        started = time.monotonic()
+
+        try:
+            size = local_path.stat().st_size
+
+            md5_hex = None
+            if skip_unchanged:
+                matches, remote_etag, md5_hex = self._remote_matches(bucket, key, local_path, size)
+                if matches:
+                    return UploadResult(
+                        local_path=str(local_path), bucket=bucket, key=key, status='skipped',
+                        size_bytes=size, etag=remote_etag, seconds=time.monotonic() - started
+                    )
+
+            args = dict(extra_args or {})
+            args.setdefault('ContentType', content_type or mimetypes.guess_type(local_path.name)[0] or 'application/octet-stream')
+            if md5_hex:
+                args.setdefault('Metadata', {})['md5'] = md5_hex
+
+            self.client.upload_file(str(local_path), bucket, key, ExtraArgs=args, Config=self.transfer_config)
+
+            head = self.client.head_object(Bucket=bucket, Key=key)
+            return UploadResult(
+                local_path=str(local_path), bucket=bucket, key=key, status='uploaded',
+                size_bytes=size, etag=head.get('ETag', '').strip('"'),
+                seconds=time.monotonic() - started
+            )
+
+        except Exception as e:
+            return UploadResult(
+                local_path=str(local_path), bucket=bucket, key=key, status='failed',
+                seconds=time.monotonic() - started, error=str(e)
+            )
+
+    def upload_many(self, items: Sequence[Dict]) -> List[UploadResult]:
+        """
+        Upload several files concurrently over the shared connection pool
+
+        Args:
+            items: Dicts with 'local_path' and 'key' plus optional upload_file kwargs
+                   (bucket, content_type, extra_args, skip_unchanged)
+
+        Returns:
+            UploadResults in the same order as items
+        """
+        if not items:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            futures = [executor.submit(self.upload_file, **item) for item in items]
+            return [future.result() for future in futures]
+
+
+_default_uploaders: Dict[str, R2Uploader] = {}
+_default_lock = threading.Lock()
+
+
+def get_uploader(bucket: Optional[str] = None) -> R2Uploader:
+    """
+    Get process-wide uploader for a bucket (client and connection pool are reused)
+
+    Args:
+        bucket: Bucket name (defaults to R2_BUCKET_NAME)
+    """
+    bucket = bucket or os.getenv('R2_BUCKET_NAME')
+    with _default_lock:
+        if bucket not in _default_uploaders:
+            _default_uploaders[bucket] = R2Uploader(bucket=bucket)
+        return _default_uploaders[bucket]
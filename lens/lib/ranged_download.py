@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Ranged downloader - parallel byte-range downloads with resume
+
+Large source files (hundreds of MB) are fetched as fixed-size byte ranges over
+a pooled requests.Session, several ranges at a time, written in place into a
+preallocated `<file>.part`. Completed ranges are recorded in a sidecar journal
+(`<file>.part.json`), so an interrupted download resumes with only the missing
+ranges - even with a fresh (re-signed) URL, as long as the size matches.
+
+Servers without Range support fall back to a single streamed request.
+The final file is only renamed into place after its length is verified.
+
+An optional on_bytes callback replaces the progress line (e.g. for a shared
+ByteRateLimiter across concurrent downloads).
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+MB = 1024 * 1024
+
+DEFAULT_CONNECTIONS = 4
+DEFAULT_PART_SIZE = 8 * MB
+CHUNK_SIZE = 1 * MB
+PART_ATTEMPTS = 4
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide session with a connection pool sized for parallel ranges"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                                  allowed_methods=('GET', 'HEAD'))
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+class ByteRateLimiter:
+    """Thread-safe token bucket capping combined throughput (bytes/second)"""
+
+    def __init__(self, bytes_per_second: float, burst_seconds: float = 1.0):
+        self.rate = bytes_per_second
+        self.capacity = bytes_per_second * burst_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int):
+        """Block the calling thread until amount bytes fit under the rate"""
+        if amount <= 0 or self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class RangedDownloader:
+    """Download one URL with parallel byte ranges and a resumable journal"""
+
+    def __init__(
+        self,
+        connections: int = DEFAULT_CONNECTIONS,
+        part_size: int = DEFAULT_PART_SIZE,
+        session: Optional[requests.Session] = None,
+        timeout: float = 60,
+        on_bytes: Optional[Callable[[int], None]] = None
+    ):
+        """
+        Args:
+            connections: Ranges fetched in parallel
+            part_size: Bytes per range (the resume granularity)
+            session: requests.Session (default: shared pooled session)
+            timeout: Per-request connect/read timeout in seconds
+            on_bytes: Called with each chunk size (negative when a failed range is rolled back)
+                      instead of printing progress; may block to throttle
+        """
+        self.connections = max(1, connections)
+        self.part_size = part_size
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.on_bytes = on_bytes
+        self._journal_lock = threading.Lock()
+        self._progress_lock = threading.Lock()
+
+    def probe(self, url: str) -> Tuple[Optional[int], bool]:
+        """
+        Probe total size and Range support with a 1-byte ranged GET
+
+        Returns:
+            (total_size or None, supports_ranges)
+        """
+        response = self.session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=self.timeout)
+        try:
+            response.raise_for_status()
+            if response.status_code == 206:
+                content_range = response.headers.get('Content-Range', '')  # bytes 0-0/12345
+                total = content_range.rsplit('/', 1)[-1]
+                if total.isdigit():
+                    return int(total), True
+            length = response.headers.get('Content-Length')
+            return (int(length) if length and length.isdigit() else None), False
+        finally:
+            response.close()
+
+    def download(self, url: str, output_path: Path) -> Dict:
+        """
+        Download url to output_path (resuming a previous partial download)
+
+        Returns:
+            Dict with size_bytes, seconds, resumed_bytes, connections, ranged
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = output_path.with_name(output_path.name + '.part')
+        journal_path = output_path.with_name(output_path.name + '.part.json')
+
+        started = time.monotonic()
+        total, ranged = self.probe(url)
+
+        if not ranged or not total:
+            print("  Server does not support ranges, single-stream download")
+            size = self._download_single(url, part_path, total)
+            resumed = 0
+        else:
+            size = total
+            resumed = self._download_ranges(url, part_path, journal_path, total)
+
+        actual = part_path.stat().st_size
+        if total and actual != total:
+            raise IOError(f"Download incomplete: {actual} of {total} bytes")
+
+        part_path.replace(output_path)
+        if journal_path.exists():
+            journal_path.unlink()
+
+        seconds = time.monotonic() - started
+        return {
+            'size_bytes': size,
+            'seconds': round(seconds, 2),
+            'resumed_bytes': resumed,
+            'connections': self.connections if ranged else 1,
+            'ranged': ranged,
+        }
+
+    def _load_journal(self, journal_path: Path, part_path: Path, total: int) -> List[int]:
+        """Completed part indices from a previous run (empty if it doesn't match)"""
+        if not journal_path.exists() or not part_path.exists():
+            return []
+        try:
+            with open(journal_path, 'r') as f:
+                journal = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return []
+        if journal.get('size') != total or journal.get('part_size') != self.part_size:
+            return []
+        if part_path.stat().st_size != total:
+            return []
+        return journal.get('done', [])
+
+    def _save_journal(self, journal_path: Path, total: int, done: List[int]):
+        tmp = journal_path.with_name(journal_path.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'size': total, 'part_size': self.part_size, 'done': sorted(done)}, f)
+        tmp.replace(journal_path)
+
+    def _download_ranges(self, url: str, part_path: Path, journal_path: Path, total: int) -> int:
+        """Fetch missing ranges in parallel; returns bytes already present from a previous run"""
+        parts = [(i, start, min(start + self.part_size, total) - 1)
+                 for i, start in enumerate(range(0, total, self.part_size))]
+
+        done = self._load_journal(journal_path, part_path, total)
+        if not done:
+            # Preallocate so every range can be written in place
+            with open(part_path, 'wb') as f:
+                f.truncate(total)
+            self._save_journal(journal_path, total, [])
+
+        done_set = set(done)
+        resumed = sum(end - start + 1 for i, start, end in parts if i in done_set)
+        if resumed:
+            print(f"  Resuming: {resumed / MB:.1f} of {total / MB:.1f} MB already downloaded")
+
+        pending = [p for p in parts if p[0] not in done_set]
+        self._downloaded = resumed
+        self._resumed = resumed
+        self._total = total
+        self._started = time.monotonic()
+
+        error = None
+        with ThreadPoolExecutor(max_workers=min(self.connections, max(1, len(pending)))) as executor:
+            futures = {executor.submit(self._fetch_part, url, part_path, start, end): i
+                       for i, start, end in pending}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    error = error or e  # Keep journaling the parts that did finish
+                    continue
+                with self._journal_lock:
+                    done_set.add(futures[future])
+                    self._save_journal(journal_path, total, list(done_set))
+        if not self.on_bytes:
+            print()
+
+        if error:
+            raise IOError(f"Download interrupted ({len(done_set)}/{len(parts)} parts saved, re-run to resume): {error}")
+        return resumed
+
+    def _fetch_part(self, url: str, part_path: Path, start: int, end: int):
+        """Fetch one byte range into its place in the part file (retrying on failure)"""
+        for attempt in range(1, PART_ATTEMPTS + 1):
+            written = 0
+            response = None
+            try:
+                response = self.session.get(
+                    url, headers={'Range': f'bytes={start}-{end}'}, stream=True, timeout=self.timeout
+                )
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise IOError(f"Expected 206 for range {start}-{end}, got {response.status_code}")
+
+                with open(part_path, 'r+b') as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                        written += len(chunk)
+                        self._report(len(chunk))
+
+                if written != end - start + 1:
+                    raise IOError(f"Short range {start}-{end}: {written} bytes")
+                return
+
+            except (requests.RequestException, IOError):
+                self._report(-written)
+                if attempt == PART_ATTEMPTS:
+                    raise
+                time.sleep(2 ** attempt)
+            finally:
+                if response is not None:
+                    response.close()  # Return the connection to the pool
+
+    def _report(self, delta: int):
+        if self.on_bytes:
+            self.on_bytes(delta)
+            return
+        with self._progress_lock:
+            self._downloaded += delta
+            elapsed = max(time.monotonic() - self._started, 1e-6)
+            percent = self._downloaded / self._total * 100
+            rate = (self._downloaded - self._resumed) / MB / elapsed
+            print(
+                f"\r  Progress: {percent:.1f}% ({self._downloaded / MB:.1f} MB, {rate:.1f} MB/s)",
+                end="",
+            )
+
+    def _download_single(self, url: str, part_path: Path, total: Optional[int]) -> int:
+        """Single streamed request (no resume)"""
+        response = self.session.get(url, stream=True, timeout=self.timeout)
+        response.raise_for_status()
+
+        downloaded = 0
+        with open(part_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                downloaded += len(chunk)
+                if self.on_bytes:
+                    self.on_bytes(len(chunk))
+                elif total:
+                    print(f"\r  Progress: {downloaded / total * 100:.1f}% ({downloaded / MB:.1f} MB)", end="")
+        if not self.on_bytes:
+            print()
+        return downloaded
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Remotion render - frame-range-chunked parallel renders of long compositions
+
+A single `npx remotion render` of a 30-60 minute composition takes 20-30
+minutes and leaves most of the machine idle. This orchestrator:
+
+    bundle    bundles the studio once (every chunk renders from the same bundle)
+    split     cuts the composition into frame ranges (--frames=start-end)
+    render    runs N Remotion processes at once, N sized to CPU cores and free
+              memory, each with its share of cores as --concurrency
+    audio     renders the composition's audio once (--codec=aac), so there are
+              no AAC priming gaps at chunk boundaries
+    join      concatenates the muted H.264 chunks + audio with the ffmpeg
+              concat demuxer (-c copy, lossless)
+
+Failed chunks are retried on their own. Finished chunks are recorded in
+<output dir>/.chunks_<name>/manifest.json, so re-running a crashed render
+only renders the missing ranges. The manifest is keyed on a fingerprint of
+the bundle (or studio sources), the props file and the job files passed as
+`inputs`, so editing any of them re-renders every chunk.
+
+Environment:
+    REMOTION_RENDER_WORKERS        Concurrent Remotion processes (default: from cores/memory)
+    REMOTION_RENDER_CHUNKS         Frame ranges to split into (default: 2 per worker)
+    REMOTION_MEMORY_PER_WORKER_GB  Memory budget per process for sizing (default: 3)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.media_probe import ProbeError, probe
+from lib.tracing import traced_run
+
+DEFAULT_FPS = 30
+MIN_CHUNK_FRAMES = 900      # 30 s at 30 fps - below this, process startup dominates
+CHUNKS_PER_WORKER = 2       # Smaller ranges balance load and make retries cheap
+MAX_WORKERS = 8
+RETRIES = 2                 # Extra attempts per chunk
+ENTRY_POINT = 'src/index.ts'
+SKIP_DIRS = {'node_modules', '.git'}
+
+
+@dataclass
+class Chunk:
+    """One frame range of the composition (inclusive)"""
+    index: int
+    start: int
+    end: int
+    file: Path
+
+    @property
+    def frames(self) -> int:
+        return self.end - self.start + 1
+
+
+def available_memory_gb() -> float:
+    """Free memory (MemAvailable), 0 if unknown"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / (1024 * 1024)
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 ** 3)
+    except (ValueError, OSError, AttributeError):
+        return 0.0
+
+
+def plan_workers(total_frames: int, workers: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Concurrent processes and per-process --concurrency for this machine
+
+    Returns:
+        (workers, concurrency)
+    """
+    cpus = os.cpu_count() or 2
+    workers = workers or int(os.getenv('REMOTION_RENDER_WORKERS', 0))
+    if not workers:
+        per_worker_gb = float(os.getenv('REMOTION_MEMORY_PER_WORKER_GB', 3))
+        memory = available_memory_gb()
+        by_memory = int(memory // per_worker_gb) if memory else MAX_WORKERS
+        # Each process gets at least 2 cores (Chromium tabs + encoder)
+        workers = max(1, min(cpus // 2, by_memory, MAX_WORKERS))
+    workers = max(1, min(workers, max(1, total_frames // MIN_CHUNK_FRAMES)))
+    return workers, max(1, cpus // workers)
+
+
+def split_frames(total_frames: int, count: int) -> List[Tuple[int, int]]:
+    """Split 0..total_frames-1 into count contiguous inclusive ranges"""
+    count = max(1, min(count, total_frames))
+    size, extra = divmod(total_frames, count)
+    ranges, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0) - 1
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def composition_frames(composition_id: str, studio_dir: Path, serve_url: str = ENTRY_POINT) -> Optional[Tuple[int, int]]:
+    """
+    Frame count and fps of a composition from `npx remotion compositions`
+
+    Returns:
+        (duration_in_frames, fps), or None if it can't be determined
+    """
+    result = traced_run(
+        ['npx', 'remotion', 'compositions', serve_url],
+        cwd=studio_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    # ID  FPS  DIMENSIONS  DURATION  e.g. "NVDA-Q3-2025   30   1920x1080   138000 (76:40.00)"
+    pattern = re.compile(rf"^\s*{re.escape(composition_id)}\s+(\d+(?:\.\d+)?)\s+\d+x\d+\s+(\d+)", re.MULTILINE)
+    match = pattern.search(result.stdout)
+    if not match:
+        return None
+    return int(match.group(2)), int(float(match.group(1)))
+
+
+def bundle(studio_dir: Path, out_dir: Path) -> Optional[str]:
+    """Bundle the studio once for all chunks (None if this Remotion has no `bundle` command)"""
+    result = traced_run(
+        ['npx', 'remotion', 'bundle', ENTRY_POINT, '--out-dir', str(out_dir)],
+        cwd=studio_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0 or not (out_dir / 'index.html').exists():
+        return None
+    return str(out_dir)
+
+
+def _render(cmd: List[str], studio_dir: Path, retries: int) -> Tuple[bool, int, str]:
+    """Run a Remotion command, retrying on failure. Returns (ok, attempts, error)"""
+    error = ''
+    for attempt in range(1, retries + 2):
+        result = traced_run(cmd, cwd=studio_dir, capture_output=True, text=True)
+        if result.returncode == 0:
+            return True, attempt, ''
+        error = (result.stderr or result.stdout).strip()[-2000:]
+    return False, retries + 1, error
+
+
+def _chunk_valid(chunk: Chunk, fps: int) -> bool:
+    """Chunk file decodes and is as long as its frame range (within 2 frames)"""
+    if not chunk.file.exists() or chunk.file.stat().st_size == 0:
+        return False
+    try:
+        info = probe(chunk.file)
+    except ProbeError:
+        return False
+    return info.has_video and info.duration is not None and abs(info.duration - chunk.frames / fps) <= 2 / fps
+
+
+def render_chunk(
+    chunk: Chunk,
+    composition_id: str,
+    serve_url: str,
+    studio_dir: Path,
+    fps: int,
+    concurrency: int,
+    props: Optional[Path] = None,
+    retries: int = RETRIES
+) -> Dict:
+    """Render one frame range (muted H.264), retrying it on its own"""
+    started = time.monotonic()
+    cmd = [
+        'npx', 'remotion', 'render', serve_url, composition_id, str(chunk.file),
+        f"--frames={chunk.start}-{chunk.end}",
+        '--codec=h264', '--muted', f"--concurrency={concurrency}", '--overwrite'
+    ]
+    if props:
+        cmd.append(f"--props={props}")
+
+    ok, attempts, error = _render(cmd, studio_dir, retries)
+    if ok and not _chunk_valid(chunk, fps):
+        ok, error = False, 'rendered chunk is incomplete'
+    seconds = time.monotonic() - started
+    return {
+        'index': chunk.index,
+        'frames': f"{chunk.start}-{chunk.end}",
+        'success': ok,
+        'attempts': attempts,
+        'seconds': round(seconds, 2),
+        'fps': round(chunk.frames / seconds, 2) if ok and seconds else 0,
+        'error': error or None,
+    }
+
+
+def concat(chunks: List[Chunk], audio: Optional[Path], output: Path):
+    """Join chunks (and the audio track) without re-encoding"""
+    list_file = chunks[0].file.parent / 'concat.txt'
+    list_file.write_text(''.join(f"file '{c.file.name}'\n" for c in chunks))
+    cmd = ['ffmpeg', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', str(list_file)]
+    if audio:
+        cmd += ['-i', str(audio), '-map', '0:v:0', '-map', '1:a:0', '-shortest']
+    cmd += ['-c', 'copy', '-movflags', '+faststart', '-y', str(output)]
+    result = traced_run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Chunk concat failed: {result.stderr.strip()[-2000:]}")
+
+
+def _hash_tree(digest, root: Path, contents: bool):
+    """Add every file under root to digest: relative path plus contents, or size and mtime"""
+    if not root.is_dir():
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and d != 'public')
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            digest.update(str(path.relative_to(root)).encode())
+            if contents:
+                digest.update(path.read_bytes())
+            else:
+                stat = path.stat()
+                digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+
+def fingerprint(studio_dir: Path, bundle_dir: Optional[Path], files: Sequence[Path] = ()) -> str:
+    """
+    Content hash of everything the rendered frames depend on
+
+    Args:
+        studio_dir: Remotion project directory
+        bundle_dir: Bundle the chunks render from (None: hash studio src/ instead)
+        files: Props and job files the composition reads
+
+    Returns:
+        Hex digest (media under public/ is hashed by size and mtime, not contents)
+    """
+    digest = hashlib.sha256()
+    _hash_tree(digest, bundle_dir if bundle_dir else Path(studio_dir) / 'src', contents=True)
+    _hash_tree(digest, Path(studio_dir) / 'public', contents=False)
+    for path in files:
+        path = Path(path)
+        digest.update(str(path).encode())
+        digest.update(path.read_bytes() if path.is_file() else b'<missing>')
+    return digest.hexdigest()
+
+
+def _load_manifest(path: Path, key: Dict) -> Dict:
+    """Completed chunks of a previous run of the same render (empty if anything changed)"""
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return manifest.get('completed', {}) if manifest.get('key') == key else {}
+
+
+def render_chunked(
+    composition_id: str,
+    output: Path,
+    studio_dir: Path,
+    total_frames: Optional[int] = None,
+    fps: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunks: Optional[int] = None,
+    props: Optional[Path] = None,
+    retries: int = RETRIES,
+    keep_chunks: bool = False,
+    duration_seconds: Optional[float] = None,
+    inputs: Sequence[Path] = ()
+) -> Dict:
+    """
+    Render a composition as parallel frame-range chunks and join them
+
+    Args:
+        composition_id: Remotion composition ID
+        output: Final MP4
+        studio_dir: Remotion project directory
+        total_frames: Composition length (default: from `remotion compositions`)
+        fps: Composition fps (default: from `remotion compositions`, else 30)
+        workers: Concurrent Remotion processes (default: from cores/memory)
+        chunks: Frame ranges (default: CHUNKS_PER_WORKER per worker)
+        props: Input props JSON file
+        retries: Extra attempts per failed chunk
+        keep_chunks: Keep the chunk directory after a successful join
+        duration_seconds: Expected length, used only if the frame count can't be detected
+        inputs: Job files the composition reads (job.yaml, insights); a change re-renders all chunks
+
+    Returns:
+        Stats dict (total_frames, workers, chunks, render_seconds, render_fps, chunk results)
+
+    Raises:
+        RuntimeError: If the length is unknown, a chunk keeps failing, or the join fails
+    """
+    started = time.monotonic()
+    output = Path(output)
+    work_dir = output.parent / f".chunks_{output.stem}"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    bundle_dir = bundle(studio_dir, work_dir / 'bundle')
+    serve_url = bundle_dir or ENTRY_POINT
+
+    if total_frames is None or fps is None:
+        detected = composition_frames(composition_id, studio_dir, serve_url)
+        if detected:
+            total_frames = total_frames or detected[0]
+            fps = fps or detected[1]
+    fps = fps or DEFAULT_FPS
+    if not total_frames and duration_seconds:
+        total_frames = int(round(duration_seconds * fps))
+    if not total_frames:
+        raise RuntimeError(f"Cannot determine frame count of composition {composition_id}")
+
+    workers, concurrency = plan_workers(total_frames, workers)
+    count = chunks or int(os.getenv('REMOTION_RENDER_CHUNKS', 0)) or workers * CHUNKS_PER_WORKER
+    count = max(1, min(count, total_frames // MIN_CHUNK_FRAMES or 1))
+    ranges = split_frames(total_frames, count)
+    plan = [Chunk(i, start, end, work_dir / f"chunk_{i:04d}.mp4") for i, (start, end) in enumerate(ranges)]
+
+    # Resume: keep chunks a previous run of the same render finished
+    # (key holds lists, not tuples, so it compares equal after the JSON round-trip)
+    manifest_file = work_dir / 'manifest.json'
+    sources = ([props] if props else []) + list(inputs)
+    key = {'composition_id': composition_id, 'total_frames': total_frames, 'fps': fps,
+           'ranges': [list(r) for r in ranges], 'props': str(props) if props else None,
+           'fingerprint': fingerprint(studio_dir, Path(bundle_dir) if bundle_dir else None, sources)}
+    completed = _load_manifest(manifest_file, key)
+    pending = [c for c in plan if not (str(c.index) in completed and _chunk_valid(c, fps))]
+    reused = len(plan) - len(pending)
+
+    audio = work_dir / 'audio.aac'
+    audio_cmd = ['npx', 'remotion', 'render', serve_url, composition_id, str(audio), '--codec=aac', '--overwrite']
+    if props:
+        audio_cmd.append(f"--props={props}")
+
+    print(f"  Rendering {total_frames} frames @ {fps} fps in {len(plan)} chunks "
+          f"({workers} processes x concurrency {concurrency})"
+          + (f", {reused} chunks reused" if reused else ""))
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers + 1) as pool:
+        audio_future = pool.submit(_render, audio_cmd, studio_dir, retries)
+        futures = [
+            pool.submit(render_chunk, c, composition_id, serve_url, studio_dir, fps, concurrency, props, retries)
+            for c in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['success']:
+                completed[str(result['index'])] = result['frames']
+                manifest_file.write_text(json.dumps({'key': key, 'completed': completed}, indent=2))
+                print(f"  ✓ Chunk {result['index'] + 1}/{len(plan)} frames {result['frames']} "
+                      f"({result['seconds']:.0f}s, {result['fps']:.1f} fps"
+                      + (f", {result['attempts']} attempts" if result['attempts'] > 1 else "") + ")")
+            else:
+                print(f"  ✗ Chunk {result['index'] + 1}/{len(plan)} frames {result['frames']} failed")
+        audio_ok, _, audio_error = audio_future.result()
+
+    failed = [r for r in results if not r['success']]
+    if failed:
+        details = '; '.join(f"chunk {r['index']} ({r['frames']}): {r['error']}" for r in failed)
+        raise RuntimeError(f"{len(failed)} of {len(plan)} chunks failed after {retries + 1} attempts: {details}")
+    if not audio_ok:
+        raise RuntimeError(f"Audio render failed: {audio_error}")
+
+    has_audio = audio.exists() and audio.stat().st_size > 0
+    concat(plan, audio if has_audio else None, output)
+
+    seconds = time.monotonic() - started
+    if not keep_chunks:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'total_frames': total_frames,
+        'fps': fps,
+        'workers': workers,
+        'concurrency': concurrency,
+        'chunks': len(plan),
+        'chunks_reused': reused,
+        'retried_chunks': sum(1 for r in results if r['attempts'] > 1),
+        'render_seconds': round(seconds, 2),
+        'render_fps': round(total_frames / seconds, 2) if seconds else 0,
+        'chunk_results': sorted(results, key=lambda r: r['index']),
+    }
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Shorts renderer - FFmpeg-native vertical shorts from generate_shorts props
+
+The Remotion EarningsShort composition needs Node + Chromium and takes
+minutes per clip. This backend renders the same props (short_N.json or
+short_N_props.json) with one ffmpeg per short:
+
+    audio     cut from the job's source media at word boundaries
+              (first word - 0.15 s .. last word + 0.35 s)
+    video     1080x1920 @ 30 fps: a still background drawn once with Pillow
+              (speaker photo, company/ticker, @markethawkeye) plus a live
+              waveform of the clip (showwaves)
+    captions  TikTok-style ASS subtitles burned in: current word in gold,
+              next two words in white, same position as the Remotion captions
+
+All shorts of a job render concurrently (ffmpeg threads split between them).
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from PIL import Image, ImageDraw
+
+from lib.compositing import (
+    centered_x, gradient_array, get_font, load_asset, text_shadow, to_image
+)
+from lib.tracing import traced_run
+
+WIDTH, HEIGHT, FPS = 1080, 1920, 30
+LEAD_IN = 0.15      # Seconds of audio kept before the first word
+TAIL = 0.35         # ... and after the last word
+VISIBLE_WORDS = 3   # Current word + next two, as in TikTokCaption.tsx
+
+RENDERERS = ('ffmpeg', 'remotion')
+
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: {width}
+PlayResY: {height}
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Caption,DejaVu Sans,64,&H00FFFFFF,&H00FFFFFF,&H40000000,&H40000000,-1,0,0,0,100,100,0,0,3,14,0,2,60,60,800,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+ACTIVE_COLOR = r'{\c&H00D7FF&}'   # #FFD700 (ASS colors are BGR)
+WORD_COLOR = r'{\c&HFFFFFF&}'
+
+
+@dataclass
+class ShortClip:
+    """One short, normalized from either props format"""
+    index: int
+    props_file: Path
+    start: float            # Cut start in the source (seconds)
+    duration: float
+    words: List[Dict]       # {word, start, end}, relative to the cut start
+    speaker: str
+    company: str
+    ticker: str
+    photo: Optional[Path]
+
+
+def find_props(shorts_dir: Path) -> List[Path]:
+    """Props files written by steps/generate_shorts.py (short_N.json) or scripts/generate_shorts.py (short_N_props.json)"""
+    files = sorted(shorts_dir.glob('short_*_props.json')) or sorted(shorts_dir.glob('short_*.json'))
+    return sorted(files, key=lambda p: int(p.stem.split('_')[1]))
+
+
+def load_clip(props_file: Path) -> Optional[ShortClip]:
+    """
+    Cut a short at its word boundaries
+
+    Returns:
+        ShortClip, or None if the props have no words
+    """
+    props = json.loads(props_file.read_text())
+    highlight = props.get('highlight', {})
+    words = [w for w in props.get('words', []) if str(w.get('word', '')).strip()]
+    if not words:
+        return None
+
+    base = float(props.get('audioStartTime', highlight.get('timestamp', 0)))
+    first = min(w['start'] for w in words)
+    last = max(w['end'] for w in words)
+    start = max(base + first - LEAD_IN, 0.0)
+    offset = start - base
+
+    index = int(props_file.stem.split('_')[1])
+    photo = props_file.parent / f"speaker_{index}.jpg"
+    return ShortClip(
+        index=index,
+        props_file=props_file,
+        start=start,
+        duration=(base + last + TAIL) - start,
+        words=[{'word': str(w['word']).strip(), 'start': w['start'] - offset, 'end': w['end'] - offset} for w in words],
+        speaker=highlight.get('speaker', ''),
+        company=props.get('companyName', ''),
+        ticker=props.get('ticker', ''),
+        photo=photo if photo.exists() else None,
+    )
+
+
+def _ass_time(seconds: float) -> str:
+    seconds = max(seconds, 0.0)
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{int(hours)}:{int(minutes):02d}:{secs:05.2f}"
+
+
+def _ass_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('{', '(').replace('}', ')')
+
+
+def build_ass(words: Sequence[Dict], width: int = WIDTH, height: int = HEIGHT) -> str:
+    """ASS captions: one event per word, showing it (gold) with the next words (white)"""
+    lines = [ASS_HEADER.format(width=width, height=height)]
+    for i, word in enumerate(words):
+        # Hold each word until the next one starts (no flicker in pauses shorter than 1 s)
+        end = word['end']
+        if i + 1 < len(words) and words[i + 1]['start'] - word['end'] < 1.0:
+            end = words[i + 1]['start']
+        end = max(end, word['start'] + 0.05)
+        visible = words[i:i + VISIBLE_WORDS]
+        text = ACTIVE_COLOR + _ass_escape(visible[0]['word'])
+        if len(visible) > 1:
+            text += WORD_COLOR + ' ' + ' '.join(_ass_escape(w['word']) for w in visible[1:])
+        lines.append(f"Dialogue: 0,{_ass_time(word['start'])},{_ass_time(end)},Caption,,0,0,0,,{text}")
+    return '\n'.join(lines) + '\n'
+
+
+def draw_background(clip: ShortClip, output: Path) -> Path:
+    """Still 1080x1920 frame: dark gradient, speaker photo + name, company/ticker watermark"""
+    img = to_image(gradient_array(WIDTH, HEIGHT, (0, 0, 0), (15, 23, 42)))
+    draw = ImageDraw.Draw(img)
+
+    if clip.photo:
+        size = 520
+        photo = load_asset(str(clip.photo), (size, size)).convert('RGB')
+        mask = Image.new('L', (size, size), 0)
+        ImageDraw.Draw(mask).ellipse([0, 0, size, size], fill=255)
+        x, y = (WIDTH - size) // 2, 260
+        draw.ellipse([x - 8, y - 8, x + size + 8, y + size + 8], fill=(255, 215, 0))
+        img.paste(photo, (x, y), mask)
+        name_y = y + size + 40
+    else:
+        name_y = 420
+
+    if clip.speaker:
+        font = get_font(54, bold=True)
+        x = centered_x(draw, clip.speaker, font, WIDTH)
+        img = text_shadow(img, clip.speaker, (x, name_y), font, offset=3, opacity=0.8)
+        ImageDraw.Draw(img).text((x, name_y), clip.speaker, font=font, fill=(255, 255, 255))
+
+    # Watermark (bottom), as in Watermark.tsx
+    draw = ImageDraw.Draw(img)
+    company_text = f"{clip.company} ({clip.ticker})" if clip.ticker else clip.company
+    font_company = get_font(44, bold=True)
+    font_brand = get_font(34, bold=True)
+    for text, font, y, color in (
+        (company_text, font_company, HEIGHT - 200, (255, 255, 255)),
+        ('@markethawkeye', font_brand, HEIGHT - 140, (255, 215, 0)),
+    ):
+        x = centered_x(draw, text, font, WIDTH)
+        img = text_shadow(img, text, (x, y), font, offset=2, opacity=0.8)
+        draw = ImageDraw.Draw(img)
+        draw.text((x, y), text, font=font, fill=color)
+
+    img.save(output)
+    return output
+
+
+def ffmpeg_command(clip: ShortClip, source: Path, background: Path, ass_file: Path, output: Path, threads: int) -> List[str]:
+    """ffmpeg command for one short (run with cwd = shorts dir so the ASS path needs no escaping)"""
+    filters = (
+        f"[1:a]showwaves=s={WIDTH}x240:mode=cline:rate={FPS}:colors=0xFFD700,format=rgba,"
+        f"colorchannelmixer=aa=0.8[wave];"
+        f"[0:v][wave]overlay=0:1180:shortest=1,ass={ass_file.name},format=yuv420p[v]"
+    )
+    return [
+        'ffmpeg', '-v', 'error',
+        '-loop', '1', '-framerate', str(FPS), '-i', background.name,
+        '-ss', f"{clip.start:.3f}", '-t', f"{clip.duration:.3f}", '-i', str(source.resolve()),
+        '-filter_complex', filters,
+        '-map', '[v]', '-map', '1:a:0',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-r', str(FPS),
+        '-c:a', 'aac', '-b:a', '160k',
+        '-threads', str(threads),
+        '-t', f"{clip.duration:.3f}",
+        '-movflags', '+faststart',
+        '-y', output.name
+    ]
+
+
+def render_clip(clip: ShortClip, source: Path, shorts_dir: Path, threads: int = 2) -> Dict:
+    """Render one short to shorts/short_N.mp4"""
+    started = time.monotonic()
+    stem = f"short_{clip.index}"
+    background = draw_background(clip, shorts_dir / f".{stem}_background.png")
+    ass_file = shorts_dir / f".{stem}.ass"
+    ass_file.write_text(build_ass(clip.words), encoding='utf-8')
+    output = shorts_dir / f"{stem}.mp4"
+
+    result = traced_run(
+        ffmpeg_command(clip, source, background, ass_file, output, threads),
+        cwd=shorts_dir, capture_output=True, text=True
+    )
+    for tmp in (background, ass_file):
+        tmp.unlink(missing_ok=True)
+    if result.returncode != 0:
+        return {'index': clip.index, 'success': False, 'error': result.stderr.strip()[-2000:]}
+    return {
+        'index': clip.index,
+        'success': True,
+        'file': str(output),
+        'start': round(clip.start, 2),
+        'duration': round(clip.duration, 2),
+        'words': len(clip.words),
+        'render_seconds': round(time.monotonic() - started, 2),
+    }
+
+
+def render_remotion(props_file: Path, studio_dir: Path) -> Dict:
+    """Render one short through the Remotion EarningsShort composition"""
+    started = time.monotonic()
+    index = int(props_file.stem.split('_')[1])
+    output = props_file.parent / f"short_{index}.mp4"
+    cmd = ['npx', 'remotion', 'render', 'EarningsShort', str(output), '--props', str(props_file)]
+    result = traced_run(cmd, cwd=studio_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'index': index, 'success': False, 'error': (result.stderr or result.stdout).strip()[-2000:]}
+    return {'index': index, 'success': True, 'file': str(output), 'render_seconds': round(time.monotonic() - started, 2)}
+
+
+def render_shorts(
+    shorts_dir: Path,
+    source: Path,
+    renderer: str = 'ffmpeg',
+    max_parallel: Optional[int] = None,
+    studio_dir: Optional[Path] = None
+) -> List[Dict]:
+    """
+    Render every short of a job concurrently
+
+    Args:
+        shorts_dir: Job shorts/ directory with props files
+        source: Media the transcript timestamps refer to (input/source.*)
+        renderer: 'ffmpeg' or 'remotion'
+        max_parallel: Concurrent renders (default: ffmpeg CPU/2, remotion 1)
+        studio_dir: Remotion project (remotion renderer only)
+
+    Returns:
+        One result dict per short (index, success, file, render_seconds or error)
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown shorts renderer: {renderer} (use {' or '.join(RENDERERS)})")
+    props_files = find_props(shorts_dir)
+
+    if renderer == 'remotion':
+        with ThreadPoolExecutor(max_workers=max_parallel or 1) as pool:
+            return list(pool.map(lambda p: render_remotion(p, studio_dir), props_files))
+
+    clips = []
+    results = []
+    for props_file in props_files:
+        clip = load_clip(props_file)
+        if clip is None:
+            results.append({'index': int(props_file.stem.split('_')[1]), 'success': False, 'error': 'no words'})
+        else:
+            clips.append(clip)
+    if not clips:
+        return results
+
+    cpus = os.cpu_count() or 2
+    workers = max_parallel or max(1, min(len(clips), cpus // 2))
+    threads = max(1, cpus // workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results += list(pool.map(lambda c: render_clip(c, source, shorts_dir, threads), clips))
+    return sorted(results, key=lambda r: r['index'])
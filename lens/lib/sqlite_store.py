@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+SQLite store - connection, schema and claim-lease helpers for local state files
+
+The upload/download queues, download cache index, channel state and job
+catalog each keep their state in a SQLite file on local disk. They share:
+
+    connect()       one transaction per connection (WAL, committed and closed
+                    on exit; immediate=True takes the write lock up front so a
+                    claim is atomic across processes sharing the file)
+    init_schema()   CREATE ... IF NOT EXISTS script plus ALTER TABLE for
+                    columns added after a file was first created
+
+Claim leases (the queues): a claimed row records the worker's host and pid
+(claim_owner). A row left 'in_progress' is stale - and safe to put back to
+'pending' - only if its worker is gone: same host, the pid no longer exists;
+another host or no recorded owner, the claim is older than the lease
+(default 6 h, overridable per queue). So concurrent runs never redo work a
+live worker still holds.
+"""
+
+import os
+import socket
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+DEFAULT_LEASE_SECONDS = 6 * 3600
+
+
+@contextmanager
+def connect(db_path: Path, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Open a connection for one transaction (committed and closed on exit)
+
+    Args:
+        db_path: SQLite file
+        immediate: Take the write lock up front (BEGIN IMMEDIATE)
+    """
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        yield conn
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+
+def init_schema(db_path: Path, schema: str, added_columns: Optional[Dict[str, Dict[str, str]]] = None):
+    """
+    Create tables and indexes, then add columns missing from older files
+
+    Args:
+        db_path: SQLite file (parent directory is created)
+        schema: SQL script of CREATE ... IF NOT EXISTS statements
+        added_columns: {table: {column: type}} added after the first release
+    """
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(schema)
+        for table, columns in (added_columns or {}).items():
+            existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+            for column, kind in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def claim_owner() -> Tuple[str, int]:
+    """(host, pid) recorded on a row this process claims"""
+    return socket.gethostname(), os.getpid()
+
+
+def lease_from_env(env_var: str) -> float:
+    """Claim lease from env_var (default: DEFAULT_LEASE_SECONDS)"""
+    return float(os.getenv(env_var, DEFAULT_LEASE_SECONDS))
+
+
+def claim_stale(row: sqlite3.Row, lease: float, now: Optional[datetime] = None) -> bool:
+    """
+    Whether an 'in_progress' row's worker is gone (see module docstring)
+
+    Args:
+        row: Row with owner_host, owner_pid and updated_at (ISO timestamp)
+        lease: Seconds a claim from another host (or without an owner) is trusted
+        now: Reference time (default: now)
+    """
+    host, pid = claim_owner()
+    if row['owner_host'] == host and row['owner_pid']:
+        return row['owner_pid'] != pid and not pid_alive(row['owner_pid'])
+    now = now or datetime.now()
+    return (now - datetime.fromisoformat(row['updated_at'])).total_seconds() > lease
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Static render - audio + still banner image to MP4, fast
+
+The original render loops the banner PNG through libx264 at 25 fps for the
+whole call (60-90 minutes of identical frames) and re-encodes the audio.
+The fast mode instead:
+
+    video  encodes the banner at 1 fps with a long GOP (a keyframe every
+           10 s) - a few thousand tiny frames instead of ~100k
+    audio  stream-copies AAC sources; anything else is encoded to AAC once
+           per job via lib/audio_policy (reused on re-render)
+    mux    +faststart so playback starts before the file is fully loaded
+
+Environment:
+    FFMPEG_RENDER_MODE   fast (default) or legacy (the original 25 fps path)
+    RENDER_BENCHMARK     1 = also time the legacy path and record the speedup
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.audio_policy import AAC_RENDER, AUDIO_CACHE_DIR, prepare_audio, probe_audio, satisfies
+from lib.tracing import traced_run
+
+FAST_FPS = 1
+GOP_SECONDS = 10
+
+
+def get_render_mode() -> str:
+    """Configured render mode: 'fast' or 'legacy'"""
+    mode = os.getenv('FFMPEG_RENDER_MODE', 'fast').lower()
+    if mode not in ('fast', 'legacy'):
+        raise ValueError(f"Unsupported FFMPEG_RENDER_MODE: {mode} (use fast or legacy)")
+    return mode
+
+
+def benchmark_enabled() -> bool:
+    return os.getenv('RENDER_BENCHMARK', '').lower() in ('1', 'true', 'yes')
+
+
+def _run(cmd: List[str]) -> float:
+    """Run ffmpeg, returning wall seconds"""
+    started = time.monotonic()
+    result = traced_run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"FFmpeg render failed: {result.stderr}")
+    return time.monotonic() - started
+
+
+def legacy_command(banner: Path, audio: Path, output: Path, video_filter: Optional[str]) -> List[str]:
+    """The original render: banner looped at the default 25 fps, audio re-encoded to AAC 192k"""
+    cmd = ['ffmpeg', '-loop', '1', '-i', str(banner), '-i', str(audio)]
+    if video_filter:
+        cmd += ['-vf', video_filter]
+    cmd += [
+        '-c:v', 'libx264',
+        '-tune', 'stillimage',
+        '-c:a', 'aac',
+        '-b:a', AAC_RENDER.bitrate,
+        '-pix_fmt', 'yuv420p',
+        '-map', '0:v:0',
+        '-map', '1:a:0',
+        '-shortest',
+        '-movflags', '+faststart',
+        '-y', str(output)
+    ]
+    return cmd
+
+
+def fast_command(
+    banner: Path,
+    audio: Path,
+    output: Path,
+    video_filter: Optional[str],
+    duration: Optional[float]
+) -> List[str]:
+    """Banner at 1 fps with a long GOP, AAC audio stream-copied"""
+    cmd = ['ffmpeg', '-loop', '1', '-framerate', str(FAST_FPS), '-i', str(banner), '-i', str(audio)]
+    if video_filter:
+        cmd += ['-vf', video_filter]
+    cmd += [
+        '-c:v', 'libx264',
+        '-preset', 'veryfast',
+        '-tune', 'stillimage',
+        '-r', str(FAST_FPS),
+        '-g', str(FAST_FPS * GOP_SECONDS),
+        '-pix_fmt', 'yuv420p',
+        '-map', '0:v:0',
+        '-map', '1:a:0',
+        '-c:a', 'copy',
+    ]
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]  # Exact audio length (the looped image never ends)
+    cmd += ['-shortest', '-movflags', '+faststart', '-y', str(output)]
+    return cmd
+
+
+def render_static(
+    banner: Path,
+    audio_source: Path,
+    output: Path,
+    video_filter: Optional[str] = None,
+    mode: Optional[str] = None,
+    benchmark: Optional[bool] = None,
+    cache_dir: Optional[Path] = None
+) -> Dict:
+    """
+    Render banner + audio to output
+
+    Args:
+        banner: Banner image (PNG)
+        audio_source: File whose first audio stream is used (audio file or source video)
+        output: Output MP4
+        video_filter: Optional -vf chain (e.g. scale/crop to 1920x1080)
+        mode: 'fast' or 'legacy' (default: FFMPEG_RENDER_MODE)
+        benchmark: Also time the legacy path (default: RENDER_BENCHMARK)
+        cache_dir: Job audio cache (default: .audio_cache next to the output)
+
+    Returns:
+        Dict with render_mode, audio_mode, render_seconds, realtime_factor, fps
+        and (when benchmarking) benchmark {fast_seconds, legacy_seconds, speedup}
+    """
+    mode = mode or get_render_mode()
+    benchmark = benchmark_enabled() if benchmark is None else benchmark
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    info = probe_audio(audio_source)
+    duration = info.get('duration')
+
+    if mode == 'legacy':
+        seconds = _run(legacy_command(banner, audio_source, output, video_filter))
+        stats = {'render_mode': 'legacy', 'audio_mode': 'encoded', 'fps': 25}
+    else:
+        audio = audio_source
+        audio_mode = 'copy'
+        started = time.monotonic()
+        if not satisfies(info, AAC_RENDER):
+            audio, audio_mode = prepare_audio(
+                audio_source, AAC_RENDER, cache_dir or output.parent / AUDIO_CACHE_DIR, info
+            )
+        seconds = time.monotonic() - started
+        seconds += _run(fast_command(banner, audio, output, video_filter, duration))
+        stats = {'render_mode': 'fast', 'audio_mode': audio_mode, 'fps': FAST_FPS}
+
+    stats['render_seconds'] = round(seconds, 2)
+    if duration:
+        stats['realtime_factor'] = round(duration / max(seconds, 0.01), 1)
+    print(f"   Render: {stats['render_mode']} ({seconds:.1f}s, audio {stats['audio_mode']}"
+          + (f", {stats['realtime_factor']}x realtime)" if duration else ")"))
+
+    if benchmark and mode == 'fast':
+        legacy_output = output.with_name(output.stem + '.legacy_benchmark.mp4')
+        print(f"   Benchmarking legacy render...")
+        try:
+            legacy_seconds = _run(legacy_command(banner, audio_source, legacy_output, video_filter))
+        finally:
+            if legacy_output.exists():
+                legacy_output.unlink()
+        stats['benchmark'] = {
+            'fast_seconds': round(seconds, 2),
+            'legacy_seconds': round(legacy_seconds, 2),
+            'speedup': round(legacy_seconds / max(seconds, 0.01), 1),
+        }
+        print(f"   Legacy: {legacy_seconds:.1f}s -> {stats['benchmark']['speedup']}x faster")
+
+    return stats
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Step payloads - keep large step results out of job.yaml
+
+Handlers return result dicts that are merged into job['processing'][step];
+insights, artifact maps and metadata made job.yaml hundreds of KB, and it is
+re-serialized on every update. When the non-scalar part of a step's data
+serializes to more than the threshold, it is written to a sidecar and
+job.yaml keeps the scalars plus a reference:
+
+    processing:
+      extract_insights:
+        status: completed
+        insights_file: /var/markethawk/jobs/<job>/insights.json
+        sidecar:
+          file: steps/extract_insights.json
+          keys: [data, metrics]
+          bytes: 182311
+
+Loaded jobs hold such steps as LazyStep dicts: the scalars are there
+immediately, and the sidecar is only read the first time one of its keys is
+accessed (status checks and skip_if never touch it). Code that reads job.yaml
+itself should use load_job_file().
+
+Environment:
+    JOB_SIDECAR_THRESHOLD_KB   Externalize step payloads larger than this (default: 16, 0 = never)
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import yaml
+
+SIDECAR_DIR = 'steps'
+SIDECAR_KEY = 'sidecar'
+DEFAULT_THRESHOLD_KB = 16
+MAX_INLINE_STRING = 200  # Longer strings count as payload
+
+
+def get_threshold() -> Optional[int]:
+    """Payload bytes above which a step is externalized (None = disabled)"""
+    kb = float(os.getenv('JOB_SIDECAR_THRESHOLD_KB', DEFAULT_THRESHOLD_KB))
+    return int(kb * 1024) if kb > 0 else None
+
+
+def is_inline(value: Any) -> bool:
+    """Scalars stay in job.yaml (readable, and what status checks/skip_if use)"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return True
+    return isinstance(value, str) and len(value) <= MAX_INLINE_STRING
+
+
+class LazyStep(dict):
+    """
+    Step data whose payload lives in a sidecar, loaded on first access
+
+    Reads of inline keys never touch the sidecar. Any read of a sidecar key,
+    iteration, or mutation loads it first, so the object behaves like the
+    full dict.
+    """
+
+    def __init__(self, inline: Dict[str, Any], sidecar_file: Path, keys: Iterable[str], ref: Dict[str, Any]):
+        super().__init__(inline)
+        self.sidecar_file = Path(sidecar_file)
+        self.sidecar_keys = frozenset(keys)
+        self.ref = ref
+        self.loaded = False
+        self.modified = False
+
+    def load(self) -> 'LazyStep':
+        if not self.loaded:
+            self.loaded = True
+            with open(self.sidecar_file) as f:
+                payload = json.load(f)
+            for key, value in payload.items():
+                dict.setdefault(self, key, value)
+        return self
+
+    def stub(self) -> Dict[str, Any]:
+        """What job.yaml holds for this step while the sidecar is unchanged"""
+        inline = {k: v for k, v in dict.items(self) if k not in self.sidecar_keys}
+        return {**inline, SIDECAR_KEY: self.ref}
+
+    # Reads
+    def __getitem__(self, key):
+        if key in self.sidecar_keys:
+            self.load()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key in self.sidecar_keys:
+            self.load()
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or (not self.loaded and key in self.sidecar_keys)
+
+    def __iter__(self):
+        return dict.__iter__(self.load())
+
+    def __len__(self):
+        return dict.__len__(self.load())
+
+    def keys(self):
+        return dict.keys(self.load())
+
+    def values(self):
+        return dict.values(self.load())
+
+    def items(self):
+        return dict.items(self.load())
+
+    def copy(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        return dict.__eq__(self.load(), other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return dict.__repr__(self.load())
+
+    def __reduce__(self):
+        return (dict, (dict(self.items()),))
+
+    # Writes (payload changes load first so the sidecar is rewritten complete;
+    # scalar updates like status don't touch it)
+    def __setitem__(self, key, value):
+        if key not in self.sidecar_keys and is_inline(value):
+            dict.__setitem__(self, key, value)
+            return
+        self.load()
+        self.modified = True
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.load()
+        self.modified = True
+        dict.__delitem__(self, key)
+
+    def setdefault(self, key, default=None):
+        self.load()
+        if not dict.__contains__(self, key):
+            self.modified = True
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        self.load()
+        self.modified = True
+        return dict.pop(self, key, *default)
+
+    def update(self, *args, **kwargs):
+        self.load()
+        self.modified = True
+        dict.update(self, *args, **kwargs)
+
+
+def sidecar_path(job_dir: Path, step: str) -> Path:
+    return Path(job_dir) / SIDECAR_DIR / f"{step}.json"
+
+
+def attach_sidecars(job: Dict[str, Any], job_dir: Path) -> Dict[str, Any]:
+    """Replace step stubs that reference a sidecar with LazyStep dicts (in place)"""
+    processing = job.get('processing') or {}
+    for step, data in processing.items():
+        if isinstance(data, dict) and isinstance(data.get(SIDECAR_KEY), dict):
+            ref = data[SIDECAR_KEY]
+            inline = {k: v for k, v in data.items() if k != SIDECAR_KEY}
+            processing[step] = LazyStep(inline, Path(job_dir) / ref['file'], ref.get('keys', []), ref)
+    return job
+
+
+def resolve_sidecars(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain dict copy of a job with every sidecar loaded (for JSON export)"""
+    resolved = dict(job)
+    if isinstance(job.get('processing'), dict):
+        resolved['processing'] = {
+            step: dict(data.items()) if isinstance(data, dict) else data
+            for step, data in job['processing'].items()
+        }
+    return resolved
+
+
+def load_job_file(job_file: Path, resolve: bool = False) -> Dict[str, Any]:
+    """
+    Read a job.yaml, with large step payloads loaded from their sidecars on access
+
+    Args:
+        job_file: Path to job.yaml
+        resolve: Load every sidecar now and return plain dicts
+
+    Returns:
+        Job dict
+    """
+    job_file = Path(job_file)
+    with open(job_file) as f:
+        job = yaml.safe_load(f) or {}
+    attach_sidecars(job, job_file.parent)
+    return resolve_sidecars(job) if resolve else job
+
+
+def externalize(job_dir: Path, step: str, data: Dict[str, Any], threshold: Optional[int]) -> Dict[str, Any]:
+    """
+    Decide how a step is stored, writing its sidecar if the payload is large
+
+    Args:
+        job_dir: Job directory
+        step: Step name
+        data: Full step data
+        threshold: Payload bytes above which to externalize (None = never)
+
+    Returns:
+        The dict to put in job.yaml (data itself, or inline scalars + sidecar reference)
+    """
+    data = dict(data.items())
+    data.pop(SIDECAR_KEY, None)
+    path = sidecar_path(job_dir, step)
+    payload = {k: v for k, v in data.items() if not is_inline(v)}
+
+    encoded = json.dumps(payload, indent=2, default=str) if payload and threshold is not None else ''
+    if not encoded or len(encoded) <= threshold:
+        if path.exists():
+            path.unlink()
+        return data
+
+    # Write-then-rename so a crash never leaves job.yaml pointing at a partial sidecar
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.json.tmp')
+    tmp.write_text(encoded)
+    os.replace(tmp, path)
+
+    inline = {k: v for k, v in data.items() if k not in payload}
+    return {**inline, SIDECAR_KEY: {'file': f"{SIDECAR_DIR}/{step}.json", 'keys': list(payload), 'bytes': len(encoded)}}
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Trim detection - find where a call starts from the head of its audio only
+
+Trim points used to come from silencedetect over the whole file (to read the
+first silence_end) or from the first transcript segment (so trimming had to
+wait for WhisperX). Only the first minutes matter, so this decodes the head
+of the audio in growing windows (30 s, 60 s, 120 s, ... up to max_seconds),
+each as 16 kHz mono float samples from one bounded ffmpeg, and analyses
+30 ms frames with numpy:
+
+    rms     frame level in dBFS - the first frame above silence_db ends the
+            leading silence
+    vad     a frame is voiced when it is above the adaptive noise floor,
+            most of its energy is in the speech band (100-4000 Hz) and its
+            zero-crossing rate is in the range of voiced speech
+    speech  first sustained speech: SUSTAIN_SECONDS where most frames are
+            voiced and the level keeps modulating (syllables and pauses,
+            unlike hold music which is steady)
+
+Decoding stops at the first sustained speech, so a call that starts after
+a 2 minute music intro decodes ~2.5 minutes of audio instead of the whole
+file, and needs no transcript.
+"""
+
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from lib.tracing import traced_run
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+FIRST_WINDOW = 30.0        # Seconds decoded first; each further window doubles
+MAX_SECONDS = 600.0        # Give up looking for speech after 10 minutes
+PRE_ROLL = 5.0             # Keep 5 s before first speech (title card + music)
+
+SPEECH_BAND = (100.0, 4000.0)
+BAND_RATIO = 0.6           # Share of frame energy in the speech band
+ZCR_RANGE = (0.02, 0.35)   # Zero crossings per sample for voiced speech
+FLOOR_MARGIN_DB = 10.0     # Voiced frames are this far above the noise floor
+SPEECH_MIN_DB = -45.0      # ... and at least this loud
+SUSTAIN_SECONDS = 2.0      # Length of speech that counts as "sustained"
+SUSTAIN_RATIO = 0.4        # Voiced share of the sustain window
+MODULATION_DB = 4.0        # Level standard deviation within the window (speech rhythm)
+
+
+@dataclass
+class TrimPoint:
+    """Where a call starts"""
+    silence_end: float                 # End of leading silence (0 if sound starts immediately)
+    first_speech_at: Optional[float]   # Start of the first sustained speech (None if not found)
+    trim_start_seconds: float          # first_speech_at - pre_roll, clamped at 0
+    decoded_seconds: float             # How much audio was decoded
+    method: str = 'audio_vad'
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def parse_db(threshold) -> float:
+    """'-50dB' / '-50' / -50 -> -50.0"""
+    return float(str(threshold).lower().replace('db', '').strip())
+
+
+def decode_audio(path: Path, start: float, duration: float) -> np.ndarray:
+    """Mono float32 samples of [start, start + duration) - audio stream only"""
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-ss', f"{start:.3f}", '-t', f"{duration:.3f}",
+        '-i', str(path),
+        '-vn', '-sn', '-dn',
+        '-ac', '1', '-ar', str(SAMPLE_RATE),
+        '-f', 'f32le', '-'
+    ]
+    result = traced_run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Audio decode failed: {result.stderr.decode(errors='replace').strip()[-500:]}")
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+
+def analyse_frames(samples: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-frame features of a block of samples
+
+    Returns:
+        Dict of equal-length arrays: db (RMS level), band (speech-band energy share), zcr
+    """
+    size = int(SAMPLE_RATE * FRAME_SECONDS)
+    count = len(samples) // size
+    frames = samples[:count * size].reshape(count, size).astype(np.float64)
+
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(size), axis=1)) ** 2
+    freqs = np.fft.rfftfreq(size, 1 / SAMPLE_RATE)
+    in_band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+    band = spectrum[:, in_band].sum(axis=1) / np.maximum(spectrum.sum(axis=1), 1e-20)
+
+    zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+    return {'db': db, 'band': band, 'zcr': zcr}
+
+
+def noise_floor(db: np.ndarray) -> float:
+    """Level of the quietest audible frames (digital silence excluded)"""
+    audible = db[db > -90]
+    return float(np.percentile(audible, 10)) if len(audible) else -90.0
+
+
+def voiced_frames(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Boolean VAD per frame"""
+    db = features['db']
+    threshold = max(noise_floor(db) + FLOOR_MARGIN_DB, SPEECH_MIN_DB)
+    return (
+        (db > threshold)
+        & (features['band'] >= BAND_RATIO)
+        & (features['zcr'] >= ZCR_RANGE[0]) & (features['zcr'] <= ZCR_RANGE[1])
+    )
+
+
+def first_sustained_speech(features: Dict[str, np.ndarray], voiced: np.ndarray) -> Optional[int]:
+    """Index of the first voiced frame of the first sustained-speech window"""
+    window = int(SUSTAIN_SECONDS / FRAME_SECONDS)
+    if len(voiced) < window:
+        return None
+    # Voiced frames in every window (moving sum)
+    counts = np.convolve(voiced.astype(np.float32), np.ones(window, dtype=np.float32), mode='valid')
+    floor = noise_floor(features['db'])
+    for start in np.flatnonzero(counts >= SUSTAIN_RATIO * window):
+        # The level must keep varying (steady music doesn't); frames at the noise
+        # floor are left out so a silence -> music edge doesn't count as rhythm
+        levels = features['db'][start:start + window]
+        levels = levels[levels > floor + 3]
+        if len(levels) and levels.std() >= MODULATION_DB:
+            return int(start + np.argmax(voiced[start:start + window]))
+    return None
+
+
+def detect_trim(
+    path: Path,
+    pre_roll: float = PRE_ROLL,
+    silence_db: float = -50.0,
+    min_silence: float = 0.5,
+    max_seconds: float = MAX_SECONDS,
+    find_speech: bool = True
+) -> TrimPoint:
+    """
+    Find the end of leading silence and the first sustained speech
+
+    Args:
+        path: Audio or video file
+        pre_roll: Seconds kept before the first speech
+        silence_db: Level (dBFS) below which audio counts as silence
+        min_silence: Leading silence shorter than this is ignored (as silencedetect's d=)
+        max_seconds: Stop decoding after this much audio
+        find_speech: False = stop as soon as the leading silence ends
+
+    Returns:
+        TrimPoint (trim_start_seconds is 0 if no speech was found)
+    """
+    samples = np.zeros(0, dtype=np.float32)
+    window = FIRST_WINDOW
+    silence_end = None
+    first_speech = None
+
+    while True:
+        # Decode only what's new; the growing buffer is re-analysed so windows
+        # spanning block boundaries are seen whole
+        decoded = len(samples) / SAMPLE_RATE
+        block = decode_audio(path, decoded, min(window, max_seconds) - decoded)
+        samples = np.concatenate([samples, block])
+        end_of_file = len(block) < (min(window, max_seconds) - decoded) * SAMPLE_RATE * 0.99
+
+        features = analyse_frames(samples)
+        if silence_end is None:
+            loud = np.flatnonzero(features['db'] > silence_db)
+            if len(loud):
+                silence_end = loud[0] * FRAME_SECONDS
+        if not find_speech:
+            if silence_end is not None:
+                break
+        else:
+            index = first_sustained_speech(features, voiced_frames(features))
+            if index is not None:
+                first_speech = index * FRAME_SECONDS
+                break
+        if end_of_file or window >= max_seconds:
+            break
+        window *= 2
+
+    decoded = len(samples) / SAMPLE_RATE
+    if silence_end is None:
+        silence_end = decoded  # Silent throughout the decoded head
+    if silence_end < min_silence:
+        silence_end = 0.0
+
+    return TrimPoint(
+        silence_end=round(float(silence_end), 3),
+        first_speech_at=round(first_speech, 3) if first_speech is not None else None,
+        trim_start_seconds=round(max(0.0, first_speech - pre_roll), 3) if first_speech is not None else 0.0,
+        decoded_seconds=round(decoded, 1),
+        method='audio_vad' if find_speech else 'audio_rms',
+    )
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Durable R2 upload queue with a background uploader
+
+Upload steps enqueue artifacts and return immediately; a BackgroundUploader
+drains the queue with bounded parallelism while the workflow keeps computing.
+Steps that need the uploaded objects (update_database) wait only on the
+upload ids they depend on.
+
+Queue state lives in SQLite (UPLOAD_QUEUE_DB, default ~/.markethawk/upload_queue.db)
+on local disk, so queued or interrupted uploads survive a process restart.
+Rows left 'in_progress' go back to 'pending' on startup only once the worker
+holding them is gone (claim leases, lib/sqlite_store; UPLOAD_LEASE_SECONDS).
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .r2_uploader import UploadResult, get_uploader
+from .sqlite_store import claim_owner, claim_stale, connect, init_schema, lease_from_env
+from .tracing import span
+
+DEFAULT_QUEUE_DB = Path.home() / '.markethawk' / 'upload_queue.db'
+
+# Terminal states
+DONE_STATES = ('uploaded', 'skipped')
+FINAL_STATES = DONE_STATES + ('failed',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    artifact TEXT,
+    local_path TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    extra_args TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    size_bytes INTEGER,
+    etag TEXT,
+    error TEXT,
+    enqueued_at TEXT,
+    updated_at TEXT,
+    owner_host TEXT,
+    owner_pid INTEGER,
+    UNIQUE (bucket, key)
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_status ON uploads(status);
+CREATE INDEX IF NOT EXISTS idx_uploads_job ON uploads(job_id);
+"""
+
+# Columns added after the first release (ALTER TABLE on older queue files)
+ADDED_COLUMNS = {'owner_host': 'TEXT', 'owner_pid': 'INTEGER'}
+
+
+class UploadFailed(Exception):
+    """Raised when a waited-on upload ends in 'failed'"""
+
+
+class UploadQueue:
+    """SQLite-backed persistent upload queue"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: SQLite file (defaults to UPLOAD_QUEUE_DB or ~/.markethawk/upload_queue.db)
+        """
+        self.db_path = Path(db_path or os.getenv('UPLOAD_QUEUE_DB', DEFAULT_QUEUE_DB))
+        self._lock = threading.Lock()
+        init_schema(self.db_path, SCHEMA, {'uploads': ADDED_COLUMNS})
+
+    def enqueue(
+        self,
+        local_path: Path,
+        key: str,
+        bucket: str,
+        job_id: Optional[str] = None,
+        artifact: Optional[str] = None,
+        extra_args: Optional[Dict] = None,
+        max_attempts: int = 3
+    ) -> int:
+        """
+        Add (or re-queue) an upload
+
+        Re-enqueuing the same bucket/key resets it to 'pending' with the new source.
+
+        Returns:
+            Upload id
+        """
+        now = datetime.now().isoformat()
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO uploads
+                    (job_id, artifact, local_path, bucket, key, extra_args,
+                     status, attempts, max_attempts, enqueued_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 'pending', 0, ?, ?, ?)
+                ON CONFLICT (bucket, key) DO UPDATE SET
+                    job_id = excluded.job_id,
+                    artifact = excluded.artifact,
+                    local_path = excluded.local_path,
+                    extra_args = excluded.extra_args,
+                    status = 'pending',
+                    attempts = 0,
+                    max_attempts = excluded.max_attempts,
+                    error = NULL,
+                    enqueued_at = excluded.enqueued_at,
+                    updated_at = excluded.updated_at
+            """, (job_id, artifact, str(local_path), bucket, key,
+                  json.dumps(extra_args) if extra_args else None, max_attempts, now, now))
+            row = conn.execute(
+                "SELECT id FROM uploads WHERE bucket = ? AND key = ?", (bucket, key)
+            ).fetchone()
+            return row['id']
+
+    def claim_next(self, ids: Optional[Sequence[int]] = None) -> Optional[Dict]:
+        """
+        Atomically claim the oldest pending upload (optionally restricted to ids)
+
+        Returns:
+            Upload row dict, or None if nothing is pending
+        """
+        with self._lock, connect(self.db_path, immediate=True) as conn:
+            sql = "SELECT * FROM uploads WHERE status = 'pending'"
+            params: List = []
+            if ids is not None:
+                if not ids:
+                    return None
+                sql += f" AND id IN ({','.join('?' * len(ids))})"
+                params.extend(ids)
+            row = conn.execute(sql + " ORDER BY id LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            conn.execute("""
+                UPDATE uploads
+                SET status = 'in_progress', attempts = attempts + 1, updated_at = ?,
+                    owner_host = ?, owner_pid = ?
+                WHERE id = ?
+            """, (datetime.now().isoformat(), *claim_owner(), row['id']))
+            claimed = dict(row)
+            claimed['attempts'] += 1
+            return claimed
+
+    def mark_result(self, upload_id: int, result, retry: bool):
+        """
+        Record an UploadResult for a claimed row
+
+        Args:
+            upload_id: Upload id
+            result: lib.r2_uploader.UploadResult
+            retry: Put a failed upload back to 'pending' (attempts remaining)
+        """
+        status = result.status
+        if status == 'failed' and retry:
+            status = 'pending'
+        with self._lock, connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE uploads
+                SET status = ?, size_bytes = ?, etag = ?, error = ?, updated_at = ?
+                WHERE id = ?
+            """, (status, result.size_bytes, result.etag, result.error,
+                  datetime.now().isoformat(), upload_id))
+
+    def requeue_stale(self, lease_seconds: Optional[float] = None) -> int:
+        """
+        Reset uploads left 'in_progress' by a dead worker back to 'pending'
+
+        Args:
+            lease_seconds: Claim lease (default: UPLOAD_LEASE_SECONDS or 6 h)
+
+        Returns:
+            Number of uploads put back to 'pending'
+        """
+        lease = lease_seconds if lease_seconds is not None else lease_from_env('UPLOAD_LEASE_SECONDS')
+        now = datetime.now()
+        with self._lock, connect(self.db_path, immediate=True) as conn:
+            rows = conn.execute(
+                "SELECT id, owner_host, owner_pid, updated_at FROM uploads WHERE status = 'in_progress'"
+            ).fetchall()
+            stale = [row['id'] for row in rows if claim_stale(row, lease, now)]
+            for upload_id in stale:
+                conn.execute("""
+                    UPDATE uploads SET status = 'pending', owner_host = NULL, owner_pid = NULL, updated_at = ?
+                    WHERE id = ?
+                """, (now.isoformat(), upload_id))
+            return len(stale)
+
+    def retry_failed(self, job_id: Optional[str] = None) -> int:
+        """Put failed uploads back to 'pending' with a fresh attempt budget"""
+        sql = "UPDATE uploads SET status = 'pending', attempts = 0, error = NULL, updated_at = ? WHERE status = 'failed'"
+        params: List = [datetime.now().isoformat()]
+        if job_id:
+            sql += " AND job_id = ?"
+            params.append(job_id)
+        with self._lock, connect(self.db_path) as conn:
+            return conn.execute(sql, params).rowcount
+
+    def get(self, ids: Sequence[int]) -> List[Dict]:
+        """Fetch upload rows by id"""
+        if not ids:
+            return []
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM uploads WHERE id IN ({','.join('?' * len(ids))}) ORDER BY id", list(ids)
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of uploads per status"""
+        with connect(self.db_path) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM uploads GROUP BY status").fetchall()
+            return {r['status']: r['n'] for r in rows}
+
+    def list_uploads(self, status: Optional[str] = None, job_id: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """List uploads (newest first)"""
+        sql = "SELECT * FROM uploads WHERE 1=1"
+        params: List = []
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        if job_id:
+            sql += " AND job_id = ?"
+            params.append(job_id)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with connect(self.db_path) as conn:
+            return [dict(r) for r in conn.execute(sql, params).fetchall()]
+
+    def process_one(self, ids: Optional[Sequence[int]] = None) -> bool:
+        """
+        Claim and upload one pending item in the calling thread
+
+        Returns:
+            True if an item was processed, False if nothing was pending
+        """
+        item = self.claim_next(ids)
+        if item is None:
+            return False
+
+        extra_args = json.loads(item['extra_args']) if item['extra_args'] else None
+        with span('r2_upload', cat='upload', key=item['key'], attempt=item['attempts']) as traced:
+            result = get_uploader(item['bucket']).upload_file(
+                Path(item['local_path']), item['key'], extra_args=extra_args
+            )
+            traced.set(status=result.status, size_bytes=result.size_bytes)
+        retry = result.status == 'failed' and item['attempts'] < item['max_attempts']
+        self.mark_result(item['id'], result, retry=retry)
+
+        if result.ok:
+            print(f"📤 [upload-queue] {result.status}: {item['key']} ({result.seconds:.1f}s)")
+        else:
+            print(f"⚠️  [upload-queue] attempt {item['attempts']}/{item['max_attempts']} failed: {item['key']}: {result.error}")
+        return True
+
+    def wait_for(self, ids: Sequence[int], timeout: Optional[float] = None, poll_interval: float = 1.0) -> List[Dict]:
+        """
+        Block until the given uploads finish
+
+        If no BackgroundUploader is running in this process, the pending ids are
+        uploaded inline so a standalone step (e.g. `--step update_database`) still works.
+
+        Args:
+            ids: Upload ids to wait for
+            timeout: Seconds before giving up (None = wait forever)
+            poll_interval: Seconds between status checks
+
+        Returns:
+            Final upload rows
+
+        Raises:
+            UploadFailed: If any upload ended in 'failed'
+            TimeoutError: If the timeout expires first
+        """
+        ids = list(ids)
+        deadline = time.monotonic() + timeout if timeout else None
+
+        while True:
+            rows = self.get(ids)
+            failed = [r for r in rows if r['status'] == 'failed']
+            if failed:
+                raise UploadFailed(
+                    "Upload failed: " + ', '.join(f"{r['key']} ({r['error']})" for r in failed)
+                )
+            if all(r['status'] in DONE_STATES for r in rows):
+                return rows
+
+            if deadline and time.monotonic() > deadline:
+                pending = [r['key'] for r in rows if r['status'] not in FINAL_STATES]
+                raise TimeoutError(f"Timed out waiting for uploads: {', '.join(pending)}")
+
+            # No worker in this process - upload what we depend on ourselves
+            if not BackgroundUploader.is_running() and self.process_one(ids):
+                continue
+            time.sleep(poll_interval)
+
+
+class BackgroundUploader:
+    """Drain an UploadQueue with bounded parallelism in background threads"""
+
+    _running = 0
+    _running_lock = threading.Lock()
+
+    def __init__(self, queue: UploadQueue, max_parallel: int = 4, idle_sleep: float = 0.5):
+        """
+        Args:
+            queue: UploadQueue to drain
+            max_parallel: Concurrent uploads
+            idle_sleep: Seconds a worker sleeps when the queue is empty
+        """
+        self.queue = queue
+        self.max_parallel = max_parallel
+        self.idle_sleep = idle_sleep
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """True if any BackgroundUploader is active in this process"""
+        return cls._running > 0
+
+    def start(self):
+        """Recover interrupted uploads and start worker threads"""
+        recovered = self.queue.requeue_stale()
+        if recovered:
+            print(f"🔁 [upload-queue] Recovered {recovered} interrupted upload(s)")
+
+        with BackgroundUploader._running_lock:
+            BackgroundUploader._running += 1
+
+        for i in range(self.max_parallel):
+            thread = threading.Thread(target=self._worker, name=f"r2-upload-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                if not self.queue.process_one():
+                    self._stop.wait(self.idle_sleep)
+            except Exception as e:
+                print(f"⚠️  [upload-queue] worker error: {e}")
+                self._stop.wait(self.idle_sleep)
+
+    def drain(self, timeout: Optional[float] = None):
+        """Wait until nothing is pending or in progress"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            counts = self.queue.counts()
+            if not counts.get('pending') and not counts.get('in_progress'):
+                return
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"Upload queue not drained: {counts}")
+            time.sleep(self.idle_sleep)
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None):
+        """
+        Stop worker threads
+
+        Args:
+            drain: Wait for the queue to empty first
+            timeout: Max seconds to wait for the drain
+        """
+        try:
+            if drain:
+                self.drain(timeout)
+        finally:
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+            with BackgroundUploader._running_lock:
+                BackgroundUploader._running -= 1
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Drain on normal exit; on error leave the rest queued (durable) for the next run
+        self.stop(drain=exc_type is None)
+
+
+_active_queue: Optional[UploadQueue] = None
+
+
+def set_active_queue(queue: Optional[UploadQueue]):
+    """
+    Enable background uploads for this process
+
+    While a queue is active, upload steps enqueue instead of uploading inline.
+    """
+    global _active_queue
+    _active_queue = queue
+
+
+def get_active_queue() -> Optional[UploadQueue]:
+    """Active queue (None = upload inline)"""
+    return _active_queue
+
+
+def submit_upload(
+    local_path: Path,
+    key: str,
+    bucket: str,
+    job_id: Optional[str] = None,
+    artifact: Optional[str] = None,
+    extra_args: Optional[Dict] = None
+) -> UploadResult:
+    """
+    Upload now, or enqueue when background uploads are active
+
+    Returns:
+        UploadResult - status 'queued' with upload_id when enqueued
+    """
+    queue = get_active_queue()
+    if queue is None:
+        return get_uploader(bucket).upload_file(Path(local_path), key, extra_args=extra_args)
+
+    upload_id = queue.enqueue(local_path, key, bucket, job_id=job_id, artifact=artifact, extra_args=extra_args)
+    return UploadResult(
+        local_path=str(local_path), bucket=bucket, key=key, status='queued',
+        size_bytes=Path(local_path).stat().st_size, upload_id=upload_id
+    )
+
+
+def submit_uploads(items: Sequence[Dict], bucket: str, job_id: Optional[str] = None) -> List[UploadResult]:
+    """
+    Upload several files concurrently now, or enqueue them all
+
+    Args:
+        items: Dicts with 'local_path', 'key' and optional 'artifact', 'extra_args'
+        bucket: Bucket name
+        job_id: Job the uploads belong to
+
+    Returns:
+        UploadResults in the same order as items
+    """
+    if get_active_queue() is None:
+        return get_uploader(bucket).upload_many([
+            {'local_path': item['local_path'], 'key': item['key'], 'extra_args': item.get('extra_args')}
+            for item in items
+        ])
+    return [
+        submit_upload(item['local_path'], item['key'], bucket, job_id=job_id,
+                      artifact=item.get('artifact'), extra_args=item.get('extra_args'))
+        for item in items
+    ]
+
+
+def wait_for_uploads(upload_ids: Sequence[int], timeout: Optional[float] = None) -> List[Dict]:
+    """
+    Wait for queued uploads a step depends on (no-op for an empty list)
+
+    Raises:
+        UploadFailed: If any of the uploads failed
+    """
+    upload_ids = [i for i in upload_ids if i is not None]
+    if not upload_ids:
+        return []
+    queue = get_active_queue() or UploadQueue()
+    print(f"⏳ Waiting for {len(upload_ids)} queued upload(s)...")
+    rows = queue.wait_for(upload_ids, timeout=timeout)
+    print(f"✅ Uploads ready")
+    return rows
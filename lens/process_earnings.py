@@ -62,6 +62,10 @@ from download_source import download_video
 from parse_metadata import parse_video_metadata
 from remove_silence import remove_silence as remove_silence_func
 
+sys.path.insert(0, str(PIPELINE_DIR))
+from lib.remotion_render import render_chunked
+from lib.trim_detect import detect_trim
+
 # Data directories
 DOWNLOADS_DIR = Path(os.getenv("DOWNLOADS_DIR", "/var/markethawk/_downloads"))
 ORGANIZED_DIR = Path(os.getenv("ORGANIZED_DIR", "/var/markethawk"))
@@ -337,35 +341,25 @@ class EarningsProcessor:
             self.logger.info("Already trimmed, skipping")
             return
 
-        # Read transcript to find first speech
         video_dir = DOWNLOADS_DIR / self.video_id
-        transcript_file = video_dir / "transcript.json"
+        source_file = video_dir / "source.mp4"
 
-        if not transcript_file.exists():
-            raise FileNotFoundError("Transcript not found. Run transcribe step first.")
-
-        with open(transcript_file) as f:
-            transcript = json.load(f)
-
-        # Find first segment with actual speech (not music/silence)
-        first_speech_time = None
-        for segment in transcript.get('segments', []):
-            text = segment.get('text', '').strip()
-            # Skip if text is empty or just music/filler
-            if text and len(text) > 10:  # At least 10 characters
-                first_speech_time = segment.get('start', 0)
-                self.logger.info(f"First speech detected at: {first_speech_time:.2f}s")
-                self.logger.info(f"Text: '{text[:60]}...'")
-                break
+        if not source_file.exists():
+            raise FileNotFoundError("Video file not found. Run download step first.")
 
+        # Find first sustained speech from the head of the audio (music/silence
+        # skipped by VAD) - no transcript needed
+        trim = detect_trim(source_file, pre_roll=5)
+        first_speech_time = trim.first_speech_at
         if first_speech_time is None:
-            self.logger.warning("Could not detect first speech, trimming from start")
+            self.logger.warning(f"Could not detect first speech in the first {trim.decoded_seconds:.0f}s, trimming from start")
             first_speech_time = 0
+        else:
+            self.logger.info(f"First speech detected at: {first_speech_time:.2f}s (decoded {trim.decoded_seconds:.0f}s of audio)")
 
         # Cut 5 seconds before first speech (for title card + music)
-        cut_start = max(0, first_speech_time - 5)
+        cut_start = trim.trim_start_seconds
 
-        source_file = video_dir / "source.mp4"
         trimmed_file = video_dir / "source.trimmed.mp4"
 
         self.logger.info(f"Cutting from {cut_start:.2f}s onwards (5s before first speech)")
@@ -506,13 +500,27 @@ class EarningsProcessor:
         quarter = self.state.get_data("parse", "quarter")
         company_dir = ORGANIZED_DIR / ticker / quarter
         output_file = company_dir / "take1" / "final.mp4"
-
-        script = PIPELINE_DIR / "scripts" / "render-video.js"
-        subprocess.run(["node", str(script), str(company_dir), str(output_file)], check=True)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Parallel frame-range chunks, joined losslessly (lib/remotion_render);
+        # insights are hashed so re-extracted data doesn't reuse stale chunks
+        insights = self.state.get_data("insights", "insights")
+        stats = render_chunked(
+            f"{ticker}-{quarter}",
+            output_file,
+            PROJECT_ROOT / "studio",
+            inputs=[Path(insights)] if insights else []
+        )
 
         self.state.update_state("render", "completed", {
-            "video": str(output_file)
+            "video": str(output_file),
+            "total_frames": stats["total_frames"],
+            "chunks": stats["chunks"],
+            "render_seconds": stats["render_seconds"],
+            "render_fps": stats["render_fps"]
         })
+        self.logger.info(f"{stats['total_frames']} frames in {stats['render_seconds']:.0f}s "
+                         f"({stats['render_fps']:.1f} fps, {stats['chunks']} chunks)")
         self.logger.success("Video rendered")
 
     def step_upload(self):
@@ -30,7 +30,6 @@ warnings.warn(
 
 import sys
 import os
-import subprocess
 import json
 from pathlib import Path
 from datetime import datetime
@@ -52,6 +51,10 @@ from download_hls import download_hls_stream
 from transcribe_whisperx import transcribe_earnings_call
 from extract_insights_structured import extract_earnings_insights
 from refine_timestamps import refine_job_timestamps
+from lib.artifact_io import artifact_exists
+from lib.media_probe import ProbeError, probe
+from lib.remotion_render import render_chunked
+from lib.trim_detect import detect_trim
 
 # Directories
 DOWNLOADS_DIR = Path(os.getenv("DOWNLOADS_DIR", "/var/markethawk/_downloads"))
@@ -75,8 +78,8 @@ class JobPipeline:
         try:
             self.step_download()
             self.step_parse()
-            self.step_transcribe()
             self.step_detect_trim()
+            self.step_transcribe()
             self.step_insights()
             self.step_refine_timestamps()
             # Note: render and upload are manual for now
@@ -121,7 +124,7 @@ class JobPipeline:
 
     def run_from_step(self, step_name: str):
         """Run from specific step onwards"""
-        all_steps = ["download", "parse", "transcribe", "detect_trim", "insights", "refine_timestamps"]
+        all_steps = ["download", "parse", "detect_trim", "transcribe", "insights", "refine_timestamps"]
 
         try:
             start_idx = all_steps.index(step_name)
@@ -131,6 +134,16 @@ class JobPipeline:
         for step in all_steps[start_idx:]:
             self.run_step(step)
 
+    def _source_file(self) -> Path:
+        """Media the download step wrote (source.mp4, or source.m4a for audio-only jobs)"""
+        recorded = self.job.get_step("download").get('file')
+        if recorded and Path(recorded).exists():
+            return Path(recorded)
+        sources = sorted((self.job_dir / "input").glob("source.*"))
+        if not sources:
+            raise FileNotFoundError("Source media not found. Run download step first.")
+        return sources[0]
+
     def step_download(self):
         """Step 1: Download video"""
         print("\n[1/5] Downloading video...")
@@ -148,7 +161,7 @@ class JobPipeline:
         if input_type == 'youtube_url':
             # Download from YouTube to job_dir/input/
             result = download_video(input_value, str(self.job_dir / "input"))
-            video_file = self.job_dir / "input" / "source.mp4"
+            video_file = result['file_path']
 
             self.job.update_step("download", "completed",
                 file=str(video_file)
@@ -157,8 +170,8 @@ class JobPipeline:
             print(f"  ✓ Downloaded: {video_file}")
 
         elif input_type == 'hls_stream':
-            # Download HLS stream with ffmpeg to job_dir/input/
-            result = download_hls_stream(input_value, str(self.job_dir))
+            # Download HLS segments in parallel to job_dir/input/ (resumable)
+            result = download_hls_stream(input_value, str(self.job_dir), media=input_data.get('media', 'video'))
             video_file = result['file']
 
             self.job.update_step("download", "completed",
@@ -212,8 +225,8 @@ class JobPipeline:
         print(f"  ✓ Detected: {result.get('ticker')} {result.get('quarter')}")
 
     def step_transcribe(self):
-        """Step 3: Transcribe with Whisper"""
-        print("\n[3/5] Transcribing with Whisper...")
+        """Step 4: Transcribe with Whisper"""
+        print("\n[4/5] Transcribing with Whisper...")
 
         step_data = self.job.get_step("transcribe")
         if step_data.get('status') == 'completed':
@@ -222,11 +235,8 @@ class JobPipeline:
 
         self.job.update_step("transcribe", "running")
 
-        # Get video file from job directory
-        video_file = self.job_dir / "input" / "source.mp4"
-
-        if not video_file.exists():
-            raise FileNotFoundError(f"Video file not found: {video_file}")
+        # Get source media from job directory
+        video_file = self._source_file()
 
         # Run WhisperX transcription with speaker diarization
         transcripts_dir = self.job_dir / "transcripts"
@@ -244,9 +254,14 @@ class JobPipeline:
 
         transcript_file = transcripts_dir / "transcript.json"
 
-        # Get duration from segments
+        # Duration of the source media (memoized probe); last segment end if unreadable
         segments = result.get('segments', [])
-        duration = segments[-1].get('end', 0) if segments else 0
+        try:
+            duration = probe(video_file, self.job_dir).duration
+        except ProbeError:
+            duration = None
+        if not duration:
+            duration = segments[-1].get('end', 0) if segments else 0
 
         # Count words
         word_count = sum(len(seg.get('text', '').split()) for seg in segments)
@@ -262,38 +277,29 @@ class JobPipeline:
         print(f"  ✓ Transcribed: {transcript_file}")
 
     def step_detect_trim(self):
-        """Step 4: Detect trim point (no actual trimming!)"""
-        print("\n[4/5] Detecting trim point...")
+        """Step 3: Detect trim point from the head of the audio (no actual trimming!)"""
+        print("\n[3/5] Detecting trim point...")
 
         step_data = self.job.get_step("detect_trim")
         if step_data.get('status') == 'completed':
             print("  Already detected, skipping")
             return
 
-        # Get transcript from job directory
-        transcript_file = self.job_dir / "transcripts" / "transcript.json"
-
-        if not transcript_file.exists():
-            raise FileNotFoundError("Transcript not found. Run transcribe step first.")
-
-        # Find first speech
-        with open(transcript_file, 'r') as f:
-            transcript = json.load(f)
-
-        first_segment = transcript.get('segments', [{}])[0]
-        first_speech_time = first_segment.get('start', 0)
-
-        # Keep 5 seconds before first speech (for intro music)
-        pre_speech_buffer = 5.0
-        trim_start = max(0, first_speech_time - pre_speech_buffer)
+        # Decode only the first minutes until sustained speech (no transcript needed);
+        # keeps 5 seconds before first speech (for intro music)
+        trim = detect_trim(self._source_file())
+        first_speech_time = trim.first_speech_at or 0.0
+        trim_start = trim.trim_start_seconds
 
         # Update both top-level (human-editable) and processing section
         self.job.job['trim_start_seconds'] = trim_start
         self.job.update_step("detect_trim", "completed",
-            first_speech_at=first_speech_time
+            first_speech_at=first_speech_time,
+            decoded_seconds=trim.decoded_seconds
         )
 
-        print(f"  ✓ Video will start at: {trim_start:.2f}s (first speech at {first_speech_time:.2f}s)")
+        print(f"  ✓ Video will start at: {trim_start:.2f}s (first speech at {first_speech_time:.2f}s, "
+              f"decoded {trim.decoded_seconds:.0f}s of audio)")
         print(f"  ✓ Edit 'trim_start_seconds' in job.yaml to adjust")
 
     def step_insights(self):
@@ -315,7 +321,7 @@ class JobPipeline:
         # Transcript file in job directory
         transcript_file = self.job_dir / "transcripts" / "transcript.json"
 
-        if not transcript_file.exists():
+        if not artifact_exists(transcript_file):
             raise FileNotFoundError("Transcript not found. Run transcribe step first.")
 
         # Run insights extraction with OpenAI structured outputs
@@ -370,7 +376,7 @@ class JobPipeline:
         transcript_step = self.job.job.get('processing', {}).get('transcribe', {})
         transcript_file = transcript_step.get('output', {}).get('transcript_file')
 
-        if not transcript_file or not Path(transcript_file).exists():
+        if not transcript_file or not artifact_exists(Path(transcript_file)):
             self.job.update_step("refine_timestamps", "failed", error="Transcript file not found")
             raise RuntimeError("Transcript file not found for refinement")
 
@@ -379,7 +385,8 @@ class JobPipeline:
             stats = refine_job_timestamps(
                 job_yaml_path=self.job.job_file,
                 transcript_path=Path(transcript_file),
-                window_seconds=30
+                window_seconds=30,
+                job=self.job
             )
         except Exception as e:
             self.job.update_step("refine_timestamps", "failed", error=str(e))
@@ -423,33 +430,26 @@ class JobPipeline:
         studio_dir = PROJECT_ROOT / "studio"
 
         try:
-            # Run remotion render
-            cmd = [
-                "npx", "remotion", "render",
+            # Parallel frame-range chunks (lib/remotion_render), joined losslessly
+            expected = self.job.job.get('processing', {}).get('transcribe', {}).get('output', {}).get('duration_seconds')
+            render_stats = render_chunked(
                 composition_id,
-                str(output_file)
-            ]
-
-            print(f"  Running: {' '.join(cmd)}")
-            print(f"  (This may take 20-30 minutes for long videos)")
-
-            result = subprocess.run(
-                cmd,
-                cwd=studio_dir,
-                capture_output=True,
-                text=True
+                output_file,
+                studio_dir,
+                duration_seconds=expected,
+                inputs=[self.job_dir / "job.yaml", *sorted((self.job_dir / "steps").glob("*.json"))]
             )
 
-            if result.returncode != 0:
-                error_msg = result.stderr or result.stdout
-                self.job.update_step("render", "failed", error=error_msg)
-                raise RuntimeError(f"Remotion render failed: {error_msg}")
-
             # Get file size
             file_size_mb = output_file.stat().st_size / (1024 * 1024)
 
-            # Get video duration from job (from transcription)
-            duration = self.job.job.get('processing', {}).get('transcribe', {}).get('output', {}).get('duration_seconds', 0)
+            # Get video duration from the render itself, else from the job (transcription)
+            try:
+                duration = probe(output_file, self.job_dir).duration
+            except ProbeError:
+                duration = None
+            if not duration:
+                duration = self.job.job.get('processing', {}).get('transcribe', {}).get('output', {}).get('duration_seconds', 0)
 
             rendered_at = datetime.now().isoformat()
 
@@ -460,7 +460,8 @@ class JobPipeline:
                 take_name=take_name,
                 duration_seconds=duration,
                 file_size_mb=round(file_size_mb, 2),
-                rendered_at=rendered_at
+                rendered_at=rendered_at,
+                **render_stats
             )
 
             # Add to renders array (at top - latest first)
@@ -478,7 +479,8 @@ class JobPipeline:
             })
             self.job._save()
 
-            print(f"  ✓ Render completed: {file_size_mb:.1f} MB")
+            print(f"  ✓ Render completed: {file_size_mb:.1f} MB in {render_stats['render_seconds']:.0f}s "
+                  f"({render_stats['render_fps']:.1f} fps, {render_stats['chunks']} chunks)")
             print(f"  File: {output_file}")
 
         except Exception as e:
@@ -492,7 +494,7 @@ if __name__ == '__main__':
 
     parser = argparse.ArgumentParser(description="Process earnings call job through pipeline")
     parser.add_argument("job_file", help="Path to job.yaml")
-    parser.add_argument("--step", help="Run specific step (download, parse, transcribe, detect_trim, insights, refine_timestamps, render)")
+    parser.add_argument("--step", help="Run specific step (download, parse, detect_trim, transcribe, insights, refine_timestamps, render)")
     parser.add_argument("--take", default="take1", help="Render take name (default: take1)")
     parser.add_argument("--composition", help="Override composition ID (default: auto-detect from job)")
 
@@ -13,11 +13,14 @@ TODO: Improve number matching
 - Fix incorrect matches on common words
 """
 
-import json
+import copy
 import re
-import yaml
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from job import JobManager
+from lib.artifact_io import artifact_exists, load_json_artifact
+from lib.step_payloads import load_job_file
 
 
 def extract_keywords_from_metric(metric: Dict) -> List[str]:
@@ -180,36 +183,27 @@ def refine_timestamp_with_words(
     return float(llm_timestamp)
 
 
-def refine_job_timestamps(
-    job_yaml_path: Path,
-    transcript_path: Path,
+def refine_insights(
+    insights: Dict[str, Any],
+    transcript_data: Dict[str, Any],
     window_seconds: int = 30
 ) -> Dict[str, Any]:
     """
-    Refine all timestamps in a job's insights using word-level data
+    Refine the timestamps of an insights dict's metrics and highlights
+
+    Works on copies - the caller decides where the refined lists are saved.
 
     Args:
-        job_yaml_path: Path to job.yaml
-        transcript_path: Path to transcript.json
+        insights: Insights step data (financial_metrics, highlights)
+        transcript_data: Word-level transcript
         window_seconds: Search window in seconds
 
     Returns:
-        Dictionary with refinement statistics
+        Dict with refined financial_metrics and highlights, and stats
     """
     print(f"\n🔍 Refining timestamps with word-level data...")
     print(f"   Window: +{window_seconds}s from LLM suggestion\n")
 
-    # Load job.yaml
-    with open(job_yaml_path, 'r') as f:
-        job_data = yaml.safe_load(f)
-
-    # Load transcript
-    with open(transcript_path, 'r') as f:
-        transcript_data = json.load(f)
-
-    # Get insights from job
-    insights = job_data.get('processing', {}).get('insights', {})
-
     # Track statistics
     stats = {
         'metrics_refined': 0,
@@ -220,7 +214,7 @@ def refine_job_timestamps(
     }
 
     # Refine financial metrics
-    metrics = insights.get('financial_metrics', [])
+    metrics = copy.deepcopy(insights.get('financial_metrics', []))
     if metrics:
         print(f"Refining {len(metrics)} financial metrics:")
         for metric in metrics:
@@ -246,7 +240,7 @@ def refine_job_timestamps(
         print()
 
     # Refine highlights
-    highlights = insights.get('highlights', [])
+    highlights = copy.deepcopy(insights.get('highlights', []))
     if highlights:
         print(f"Refining {len(highlights)} highlights:")
         for highlight in highlights:
@@ -273,15 +267,45 @@ def refine_job_timestamps(
                 stats['highlights_unchanged'] += 1
         print()
 
-    # Save updated job.yaml
-    with open(job_yaml_path, 'w') as f:
-        yaml.safe_dump(job_data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-
     print(f"✅ Timestamp refinement complete!")
     print(f"   Metrics: {stats['metrics_refined']} refined, {stats['metrics_unchanged']} unchanged")
     print(f"   Highlights: {stats['highlights_refined']} refined, {stats['highlights_unchanged']} unchanged\n")
 
-    return stats
+    return {'financial_metrics': metrics, 'highlights': highlights, 'stats': stats}
+
+
+def refine_job_timestamps(
+    job_yaml_path: Path,
+    transcript_path: Path,
+    window_seconds: int = 30,
+    job: Optional[JobManager] = None
+) -> Dict[str, Any]:
+    """
+    Refine all timestamps in a job's insights using word-level data and save them
+
+    For standalone use. Workflow steps go through steps/refine_timestamps_step.py,
+    which returns the refined data to the orchestrator instead of saving job.yaml.
+
+    Args:
+        job_yaml_path: Path to job.yaml
+        transcript_path: Path to transcript.json
+        window_seconds: Search window in seconds
+        job: JobManager already holding the job (saves through it instead of
+             opening job.yaml a second time)
+
+    Returns:
+        Dictionary with refinement statistics
+    """
+    job = job or JobManager(Path(job_yaml_path))
+    insights = job.get_step('insights')
+    refined = refine_insights(insights, load_json_artifact(transcript_path), window_seconds)
+
+    # Insights payload goes back to its sidecar if externalized
+    if 'insights' in job.job.get('processing', {}):
+        job.update_step('insights', insights.get('status', 'completed'),
+                        financial_metrics=refined['financial_metrics'], highlights=refined['highlights'])
+
+    return refined['stats']
 
 
 if __name__ == "__main__":
@@ -301,8 +325,7 @@ if __name__ == "__main__":
         transcript_path = Path(args.transcript)
     else:
         # Load job to get transcript path
-        with open(job_yaml_path, 'r') as f:
-            job_data = yaml.safe_load(f)
+        job_data = load_job_file(job_yaml_path)
         transcript_file = job_data.get('processing', {}).get('transcribe', {}).get('output', {}).get('transcript_file')
         if not transcript_file:
             print("❌ Error: Could not find transcript path in job.yaml")
@@ -310,7 +333,7 @@ if __name__ == "__main__":
             exit(1)
         transcript_path = Path(transcript_file)
 
-    if not transcript_path.exists():
+    if not artifact_exists(transcript_path):
         print(f"❌ Error: Transcript not found: {transcript_path}")
         exit(1)
 
@@ -7,6 +7,9 @@ generates URL-friendly slugs, and outputs master CSV for database import.
 
 Usage:
     python lens/scripts/create_master_companies.py
+
+    # Also sync the result into markethawkeye.companies (diff-based, one transaction)
+    python lens/scripts/create_master_companies.py --sync-db
 """
 
 import json
@@ -14,6 +17,7 @@ import csv
 import re
 from pathlib import Path
 from collections import Counter
+import argparse
 import sys
 
 # Configuration
@@ -240,7 +244,34 @@ def save_master_csv(companies):
         sector = metadata.get('sector', 'N/A')
         print(f"   {company['symbol']:6} - {company['slug']:30} ({exchange}, {sector})")
 
+def sync_to_database(companies):
+    """Sync generated companies into the database using the shared delta engine."""
+    import psycopg2
+    from migrate_companies_db import DATABASE_URL, has_current_schema, sync_companies
+
+    db_host = DATABASE_URL.split('@')[1].split('/')[0] if '@' in DATABASE_URL else 'localhost'
+    print(f"\n🗄️  Syncing to database: {db_host}")
+
+    conn = psycopg2.connect(DATABASE_URL, connect_timeout=10)
+    try:
+        if not has_current_schema(conn):
+            print("❌ companies table has the old schema")
+            print("💡 Run: python lens/scripts/migrate_companies_db.py")
+            sys.exit(1)
+        sync_companies(conn, companies)
+    except Exception as e:
+        print(f"\n❌ Sync failed: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
 def main():
+    parser = argparse.ArgumentParser(description='Create master companies CSV with slugs')
+    parser.add_argument('--sync-db', action='store_true',
+                        help='Also sync companies into markethawkeye.companies (only changed rows)')
+    args = parser.parse_args()
+
     print("\n" + "🦅" * 35)
     print("CREATE MASTER COMPANIES CSV")
     print("🦅" * 35 + "\n")
@@ -257,6 +288,9 @@ def main():
     # Save
     save_master_csv(companies)
 
+    if args.sync_db:
+        sync_to_database(companies)
+
     print("\n" + "=" * 70)
     print("🎉 SUCCESS!")
     print("=" * 70)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Download Cache CLI - Report on and evict the shared download cache
+
+The cache (/var/markethawk/_downloads/<video_id>/) is linked into job
+directories instead of copied. This tool reports hit rate and bytes saved and
+evicts least-recently-used entries above the byte budget.
+
+Usage:
+    # Size, hit rate, bytes saved by linking
+    python lens/scripts/download_cache.py stats
+
+    # Index downloads that predate the cache index
+    python lens/scripts/download_cache.py scan
+
+    # Evict LRU entries above the budget (DOWNLOAD_CACHE_MAX_GB, default 200)
+    python lens/scripts/download_cache.py gc --max-gb 150 --dry-run
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.download_cache import GB, DownloadCache
+
+
+def print_stats(cache: DownloadCache):
+    """Print cache usage and effectiveness"""
+    stats = cache.stats()
+    lookups = stats['hits'] + stats['misses']
+
+    print(f"\n📦 Download cache: {stats['root']}")
+    print(f"   Index: {cache.index_path}")
+    print(f"   Entries: {stats['entries']}")
+    print(f"   Size: {stats['size_bytes'] / GB:.1f} GB / {stats['max_bytes'] / GB:.0f} GB budget")
+    print(f"   Hit rate: {stats['hit_rate']:.1%} ({stats['hits']} hits / {lookups} lookups)")
+    print(f"   Downloads: {stats['downloads']}")
+    print(f"   Bytes saved by linking: {stats['bytes_saved'] / GB:.1f} GB")
+    if stats['links']:
+        print(f"   Links: " + ', '.join(f"{method}={count}" for method, count in stats['links'].items()))
+    print(f"   Evicted: {stats['evictions']} entries ({stats['bytes_evicted'] / GB:.1f} GB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report on and evict the shared download cache')
+    parser.add_argument('--cache-dir', type=Path, help='Cache root (default: /var/markethawk/_downloads)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('stats', help='Show size, hit rate and bytes saved')
+    subparsers.add_parser('scan', help='Index cache directories missing from the index')
+
+    gc_parser = subparsers.add_parser('gc', help='Evict least-recently-used entries over budget')
+    gc_parser.add_argument('--max-gb', type=float, help='Byte budget in GB (default: DOWNLOAD_CACHE_MAX_GB or 200)')
+    gc_parser.add_argument('--dry-run', action='store_true', help='Only list what would be evicted')
+
+    args = parser.parse_args()
+    cache = DownloadCache(root=args.cache_dir)
+
+    if args.command == 'stats':
+        print_stats(cache)
+
+    elif args.command == 'scan':
+        added = cache.scan()
+        print(f"✅ Indexed {added} new cache entries")
+        print_stats(cache)
+
+    elif args.command == 'gc':
+        cache.scan()
+        max_bytes = int(args.max_gb * GB) if args.max_gb is not None else None
+        evicted = cache.gc(max_bytes=max_bytes, dry_run=args.dry_run)
+
+        verb = 'Would evict' if args.dry_run else 'Evicted'
+        for entry in evicted:
+            last_access = datetime.fromtimestamp(entry['last_access']).strftime('%Y-%m-%d %H:%M')
+            print(f"   🗑️  {entry['video_id']:15} {entry['size_bytes'] / (1024 * 1024):8.1f} MB  last used {last_access}")
+        freed = sum(e['size_bytes'] for e in evicted)
+        print(f"\n{verb} {len(evicted)} entries ({freed / GB:.1f} GB)")
+        if not args.dry_run:
+            print_stats(cache)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
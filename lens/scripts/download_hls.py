@@ -1,21 +1,28 @@
 #!/usr/bin/env python3
 """
-Download HLS stream (.m3u8) using ffmpeg
+Download HLS stream (.m3u8) with parallel segment fetches
+
+Segments are fetched concurrently and kept on disk, so an interrupted download
+resumes; one local ffmpeg remux produces the final file (see lib/hls_download.py).
 """
 
-import subprocess
-import hashlib
+import sys
 from pathlib import Path
 from typing import Dict
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.hls_download import DEFAULT_WORKERS, HLSDownloader
+
 
-def download_hls_stream(url: str, job_dir: str) -> Dict:
+def download_hls_stream(url: str, job_dir: str, media: str = "video", workers: int = DEFAULT_WORKERS) -> Dict:
     """
-    Download HLS stream to mp4 using ffmpeg
+    Download HLS stream to mp4 (or m4a for audio-only)
 
     Args:
         url: HLS stream URL (m3u8)
         job_dir: Job directory to save video (will save to job_dir/input/source.mp4)
+        media: 'video' (best variant) or 'audio_only' (lowest-bitrate audio rendition -> source.m4a)
+        workers: Segments fetched in parallel
 
     Returns:
         Dictionary with download info
@@ -26,36 +33,28 @@ def download_hls_stream(url: str, job_dir: str) -> Dict:
     input_dir = job_dir / "input"
     input_dir.mkdir(parents=True, exist_ok=True)
 
-    output_file = input_dir / "source.mp4"
+    output_file = input_dir / ("source.m4a" if media == "audio_only" else "source.mp4")
 
     print(f"📥 Downloading HLS stream...")
     print(f"  URL: {url}")
     print(f"  Output: {output_file}")
+    print(f"  Media: {media}, {workers} parallel segments")
 
-    # Use ffmpeg to download and convert
-    cmd = [
-        "ffmpeg",
-        "-i", url,
-        "-c", "copy",  # Copy streams without re-encoding (faster)
-        "-bsf:a", "aac_adtstoasc",  # Fix AAC stream
-        "-y",  # Overwrite output file
-        str(output_file)
-    ]
-
-    print(f"  Running: {' '.join(cmd[:4])} ...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-
-    if result.returncode != 0:
-        raise RuntimeError(f"ffmpeg download failed: {result.stderr}")
+    stats = HLSDownloader(workers=workers, media=media).download(url, output_file)
 
     # Get file size
     size_mb = output_file.stat().st_size / (1024 * 1024)
 
-    print(f"✓ Downloaded: {size_mb:.1f} MB")
+    print(f"✓ Downloaded: {size_mb:.1f} MB in {stats['seconds']:.1f}s ({stats['segments']} segments)")
 
     return {
         "file": str(output_file),
-        "size_mb": size_mb
+        "size_mb": size_mb,
+        "media": media,
+        "segments": stats["segments"],
+        "resumed_segments": stats["resumed_segments"],
+        "live": stats["live"],
+        "seconds": stats["seconds"],
     }
 
 
@@ -66,10 +65,13 @@ if __name__ == "__main__":
     parser.add_argument("url", help="HLS stream URL (.m3u8)")
     parser.add_argument("--output-dir", default="/var/markethawk/_downloads",
                        help="Output directory")
+    parser.add_argument("--media", choices=["video", "audio_only"], default="video",
+                       help="video (default) or audio_only (lowest-bitrate audio rendition)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                       help=f"Parallel segment downloads (default: {DEFAULT_WORKERS})")
 
     args = parser.parse_args()
 
-    result = download_hls_stream(args.url, args.output_dir)
+    result = download_hls_stream(args.url, args.output_dir, media=args.media, workers=args.workers)
     print(f"\n✓ Success!")
-    print(f"  Video ID: {result['video_id']}")
     print(f"  File: {result['file']}")
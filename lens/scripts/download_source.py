@@ -2,6 +2,11 @@
 """
 Multi-source video downloader for earnings calls.
 Supports: YouTube, Company IR websites (manual)
+
+Media preference:
+    video       MP4 with audio, closest to 720p (source.mp4)
+    audio_only  Best audio-only stream, stored as-is (e.g. source.m4a) -
+                a fraction of the bytes, and nothing to decode but audio
 """
 
 import sys
@@ -9,10 +14,13 @@ import os
 import json
 import argparse
 from pathlib import Path
-from typing import Optional, Dict
-import requests
+from typing import Callable, Optional, Dict
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.download_cache import MEDIA_PREFERENCES
+from lib.ranged_download import DEFAULT_CONNECTIONS, RangedDownloader, get_session
+
 # Load environment variables
 load_dotenv()
 RAPID_API_KEY = os.getenv("RAPID_API_KEY")
@@ -21,9 +29,22 @@ RAPID_API_KEY = os.getenv("RAPID_API_KEY")
 class VideoSourceDownloader:
     """Download videos from multiple sources"""
 
-    def __init__(self, video_id: str, output_dir: str):
+    def __init__(
+        self,
+        video_id: str,
+        output_dir: str,
+        connections: int = DEFAULT_CONNECTIONS,
+        media: str = "video",
+        on_bytes: Optional[Callable[[int], None]] = None,
+    ):
+        if media not in MEDIA_PREFERENCES:
+            raise ValueError(f"Unknown media preference: {media} (use {', '.join(MEDIA_PREFERENCES)})")
         self.video_id = video_id
         self.output_dir = Path(output_dir)
+        self.connections = connections
+        self.media = media
+        self.on_bytes = on_bytes  # Byte callback for the media download (throttling/progress)
+        self.quota_remaining: Optional[int] = None  # RapidAPI x-ratelimit-requests-remaining
         # Flat structure - all files at root level
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -36,7 +57,11 @@ class VideoSourceDownloader:
         if not video_id:
             raise ValueError(f"Invalid YouTube URL: {youtube_url}")
 
-        # Call RapidAPI
+        data = self.fetch_details(video_id)
+        return self.download_media(data, youtube_url, video_id)
+
+    def fetch_details(self, video_id: str) -> Dict:
+        """Fetch video details (format URLs) from RapidAPI and save metadata.json"""
         api_url = "https://youtube-media-downloader.p.rapidapi.com/v2/video/details"
         headers = {
             "x-rapidapi-host": "youtube-media-downloader.p.rapidapi.com",
@@ -45,7 +70,10 @@ class VideoSourceDownloader:
         params = {"videoId": video_id}
 
         print(f"  Fetching video details from RapidAPI...")
-        response = requests.get(api_url, headers=headers, params=params)
+        response = get_session().get(api_url, headers=headers, params=params, timeout=60)
+        remaining = response.headers.get("x-ratelimit-requests-remaining")
+        if remaining is not None and remaining.isdigit():
+            self.quota_remaining = int(remaining)
         response.raise_for_status()
         data = response.json()
 
@@ -54,15 +82,31 @@ class VideoSourceDownloader:
         with open(metadata_path, "w") as f:
             json.dump(data, f, indent=2)
         print(f"✓ Metadata saved to: {metadata_path}")
+        return data
+
+    def download_media(self, data: Dict, youtube_url: str, video_id: str) -> Dict:
+        """Download the preferred media file listed in RapidAPI video details"""
+        metadata_path = self.output_dir / "metadata.json"
 
-        # Find best MP4 with audio
-        download_url = self._find_best_mp4_url(data)
-        if not download_url:
-            raise ValueError("No suitable MP4 format with audio found")
+        # Audio-only: best audio stream, stored in its original container
+        media = self.media
+        audio = self._find_best_audio(data) if media == "audio_only" else None
+        if media == "audio_only" and not audio:
+            print("  ⚠️  No audio-only format offered, falling back to video")
+            media = "video"
+
+        if audio:
+            download_url = audio["url"]
+            output_path = self.output_dir / f"source.{audio.get('extension') or 'm4a'}"
+            print(f"  Downloading audio ({audio.get('extension', '?')}, {audio.get('sizeText', 'unknown size')})...")
+        else:
+            # Find best MP4 with audio
+            download_url = self._find_best_mp4_url(data)
+            if not download_url:
+                raise ValueError("No suitable MP4 format with audio found")
+            output_path = self.output_dir / "source.mp4"
+            print(f"  Downloading video...")
 
-        # Download video
-        output_path = self.output_dir / "source.mp4"
-        print(f"  Downloading video...")
         self._download_file(download_url, output_path)
 
         print(f"✓ Downloaded to: {output_path}")
@@ -70,6 +114,7 @@ class VideoSourceDownloader:
             "source": "youtube",
             "url": youtube_url,
             "video_id": video_id,
+            "media": media,
             "file_path": str(output_path),
             "metadata_path": str(metadata_path),
             "title": data.get("title", ""),
@@ -126,35 +171,40 @@ class VideoSourceDownloader:
 
         return sorted_videos[0].get("url")
 
-    def _download_file(self, url: str, output_path: Path):
-        """Download file with progress"""
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
+    def _find_best_audio(self, video_data: dict) -> Optional[Dict]:
+        """Find best audio-only format (prefer m4a/AAC, then highest bitrate)"""
+        audios = [a for a in video_data.get("audios", {}).get("items", []) if a.get("url")]
+        if not audios:
+            return None
 
-        total_size = int(response.headers.get("content-length", 0))
-        downloaded = 0
+        # m4a (AAC) plays and stream-copies everywhere; within a container the
+        # larger file is the higher bitrate (same duration)
+        return max(audios, key=lambda a: (a.get("extension") == "m4a", a.get("size") or 0))
 
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0:
-                        percent = (downloaded / total_size) * 100
-                        print(
-                            f"\r  Progress: {percent:.1f}% ({downloaded / 1024 / 1024:.1f} MB)",
-                            end="",
-                        )
-        print()  # New line after progress
+    def _download_file(self, url: str, output_path: Path):
+        """Download file with parallel byte ranges (resumes an interrupted download)"""
+        stats = RangedDownloader(connections=self.connections, on_bytes=self.on_bytes).download(url, output_path)
+        mb = stats["size_bytes"] / 1024 / 1024
+        print(
+            f"  {mb:.1f} MB in {stats['seconds']:.1f}s "
+            f"({mb / max(stats['seconds'], 0.01):.1f} MB/s, {stats['connections']} connection(s))"
+        )
 
 
-def download_video(url: str, downloads_dir: str = "/var/markethawk/_downloads") -> Dict:
+def download_video(
+    url: str,
+    downloads_dir: str = "/var/markethawk/_downloads",
+    connections: int = DEFAULT_CONNECTIONS,
+    media: str = "video",
+) -> Dict:
     """
     Download video from YouTube URL.
 
     Args:
         url: YouTube video URL
         downloads_dir: Base directory for downloads
+        connections: Parallel byte-range connections for the media file
+        media: 'video' (source.mp4) or 'audio_only' (best audio stream, e.g. source.m4a)
 
     Returns:
         Dictionary with download results including file paths and metadata
@@ -171,7 +221,7 @@ def download_video(url: str, downloads_dir: str = "/var/markethawk/_downloads")
 
     # Create downloader - save to _downloads/<video_id>/
     output_dir = Path(downloads_dir) / video_id
-    downloader = VideoSourceDownloader(video_id, str(output_dir))
+    downloader = VideoSourceDownloader(video_id, str(output_dir), connections=connections, media=media)
 
     # Download
     result = downloader.download_from_youtube(url)
@@ -189,14 +239,28 @@ def main():
         default="/var/markethawk/_downloads",
         help="Downloads directory (default: /var/markethawk/_downloads)",
     )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=DEFAULT_CONNECTIONS,
+        help=f"Parallel range connections (default: {DEFAULT_CONNECTIONS})",
+    )
+    parser.add_argument(
+        "--media",
+        choices=MEDIA_PREFERENCES,
+        default="video",
+        help="video (MP4, default) or audio_only (best audio stream, stored as-is)",
+    )
 
     args = parser.parse_args()
 
     try:
-        result = download_video(args.url, args.downloads_dir)
+        result = download_video(
+            args.url, args.downloads_dir, connections=args.connections, media=args.media
+        )
 
         print(f"✓ Download complete!")
-        print(f"  Video: {result['file_path']}")
+        print(f"  {'Audio' if result['media'] == 'audio_only' else 'Video'}: {result['file_path']}")
         print(f"  Metadata: {result['metadata_path']}")
         print(f"  Title: {result['title']}")
 
@@ -5,11 +5,31 @@ Download YouTube videos to cache using Rapid API
 Reads video IDs from a text file and downloads them to /var/markethawk/_downloads/
 using the Rapid API (same as batch processor).
 
+The pipeline runs on asyncio with two independent limits:
+    metadata  RapidAPI video-details calls: requests per minute + daily quota
+              (the quota pauses the pipeline until the next UTC day instead of failing)
+    media     media hosts: total connections and combined bytes per second
+
+Video ids go into a persistent queue (lib/download_queue.py), so an interrupted
+or quota-paused run resumes where it stopped. Optional second column per line
+sets the priority - a quarter (2025-Q3) or publish date (2025-08-14) - and the
+most recent quarters are downloaded first. Without it, file order is kept
+(list_channel_videos.py lists newest first).
+
 Usage:
     python lens/scripts/download_to_cache_pipeline.py videos.txt [--workers 3] [--skip-existing]
 
 Configuration:
-    Create a YAML config file with pipeline settings (optional)
+    Create a YAML config file with pipeline settings (optional):
+
+        workers: 6              # videos in flight
+        connections: 4          # byte ranges per video
+        metadata:
+          rpm: 30
+          daily_quota: 500
+        media:
+          max_connections: 16
+          max_mbps: 40          # megabytes per second, 0 = unlimited
 
 Examples:
     # Download all videos from file
@@ -23,21 +43,50 @@ Examples:
 
     # Use custom config
     python lens/scripts/download_to_cache_pipeline.py nvidia_videos.txt --config download_config.yaml
+
+    # Resume whatever is still queued (no new ids)
+    python lens/scripts/download_to_cache_pipeline.py --resume
 """
 
 import argparse
+import asyncio
+import os
 import sys
+import threading
+import time
 import yaml
 from pathlib import Path
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import json
 
 # Add lens directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from scripts.download_source import download_video
+from scripts.download_source import VideoSourceDownloader
+from lib.download_cache import MEDIA_PREFERENCES, DownloadCache
+from lib.download_queue import DownloadQueue, parse_priority, utc_day
+from lib.ranged_download import MB, ByteRateLimiter
+
+# Signed media URLs in metadata.json stay valid for a few hours; reuse them
+# instead of spending a quota call when a previous attempt fetched them
+METADATA_REUSE_SECONDS = 4 * 3600
+
+
+class RequestRateLimiter:
+    """Async limiter spacing calls evenly to a requests-per-minute budget"""
+
+    def __init__(self, rpm: float):
+        self.interval = 60.0 / rpm if rpm > 0 else 0
+        self.next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self.next_at > now:
+                await asyncio.sleep(self.next_at - now)
+            self.next_at = max(now, self.next_at) + self.interval
 
 
 class DownloadPipeline:
@@ -52,14 +101,37 @@ class DownloadPipeline:
         """
         self.config = config
         self.cache_dir = Path(config.get('cache_dir', '/var/markethawk/_downloads'))
-        self.workers = config.get('workers', 3)
+        self.connections = config.get('connections', 4)  # Parallel byte ranges per video
+        self.media = config.get('media', 'video')  # 'audio_only' caches just the audio stream
         self.skip_existing = config.get('skip_existing', True)  # Default: skip cached videos
+        self.cache = DownloadCache(root=self.cache_dir)
+        self.queue = DownloadQueue(config.get('queue_db'))
+
+        # Metadata API limits
+        metadata = config.get('metadata', {})
+        self.rpm = float(metadata.get('rpm', 30))
+        self.daily_quota = int(metadata.get('daily_quota', os.getenv('RAPIDAPI_DAILY_QUOTA', 0)) or 0)
+        self.exhausted_day: Optional[str] = None  # Provider reported 0 requests remaining
+
+        # Media host limits: total connections across videos, combined bytes/second
+        media = config.get('media_limits', {})
+        self.max_connections = int(media.get('max_connections', 16))
+        self.max_mbps = float(media.get('max_mbps', 0))
+        self.media_slots = max(1, self.max_connections // max(1, self.connections))
+        self.workers = config.get('workers', self.media_slots + 2)
+
+        self.byte_limiter = ByteRateLimiter(self.max_mbps * MB) if self.max_mbps > 0 else None
+        self._bytes_lock = threading.Lock()
+        self._bytes = 0
 
         self.stats = {
             'total': 0,
             'downloaded': 0,
             'cached': 0,
             'failed': 0,
+            'api_calls': 0,
+            'bytes': 0,
+            'quota_pauses': 0,
             'errors': []
         }
 
@@ -73,22 +145,68 @@ class DownloadPipeline:
         Returns:
             True if video is cached
         """
-        video_cache_dir = self.cache_dir / video_id
-        video_file = video_cache_dir / 'source.mp4'
-        metadata_file = video_cache_dir / 'metadata.json'
-
-        return video_file.exists() and metadata_file.exists()
-
-    def download_single_video(self, video_id: str) -> Dict:
+        metadata_file = self.cache_dir / video_id / 'metadata.json'
+        return self.cache.source_name(video_id, self.media) is not None and metadata_file.exists()
+
+    def _on_bytes(self, amount: int):
+        """Byte callback from download threads: throttle and count"""
+        if self.byte_limiter and amount > 0:
+            self.byte_limiter.consume(amount)
+        with self._bytes_lock:
+            self._bytes += amount
+
+    def _reusable_metadata(self, video_id: str) -> Optional[Dict]:
+        """metadata.json from a recent attempt (its signed URLs are still valid)"""
+        path = self.cache_dir / video_id / 'metadata.json'
+        if not path.exists() or time.time() - path.stat().st_mtime > METADATA_REUSE_SECONDS:
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _quota_spent(self) -> bool:
+        """Today's metadata budget is used up (reads the queue DB - call off the event loop)"""
+        if self.exhausted_day == utc_day():
+            return True
+        return bool(self.daily_quota) and self.queue.api_calls_today() >= self.daily_quota
+
+    async def _wait_for_quota(self):
+        """Pause until the next UTC day while today's metadata budget is spent"""
+        while await asyncio.to_thread(self._quota_spent):
+            now = datetime.now(timezone.utc)
+            reset = (now + timedelta(days=1)).replace(hour=0, minute=0, second=5, microsecond=0)
+            self.stats['quota_pauses'] += 1
+            print(f"\n⏸️  Daily API quota reached, pausing until {reset:%Y-%m-%d %H:%M} UTC")
+            await asyncio.sleep((reset - now).total_seconds())
+
+    async def _fetch_details(self, downloader: VideoSourceDownloader, video_id: str) -> Dict:
+        """Rate- and quota-limited RapidAPI call"""
+        async with self.api_lock:
+            await self._wait_for_quota()
+            await self.api_limiter.acquire()
+            await asyncio.to_thread(self.queue.record_api_call)
+            self.stats['api_calls'] += 1
+
+        data = await asyncio.to_thread(downloader.fetch_details, video_id)
+
+        if downloader.quota_remaining == 0:
+            # Provider says the plan is exhausted: stop spending calls today
+            self.exhausted_day = utc_day()
+        return data
+
+    async def download_single_video(self, row: Dict) -> Dict:
         """
         Download single video
 
         Args:
-            video_id: YouTube video ID
+            row: Claimed queue row
 
         Returns:
             Result dictionary
         """
+        video_id = row['video_id']
         youtube_url = f'https://www.youtube.com/watch?v={video_id}'
 
         # Check cache
@@ -101,75 +219,148 @@ class DownloadPipeline:
 
         # Download
         try:
-            result = download_video(youtube_url, str(self.cache_dir))
+            downloader = VideoSourceDownloader(
+                video_id, str(self.cache_dir / video_id),
+                connections=self.connections, media=self.media, on_bytes=self._on_bytes
+            )
+            data = self._reusable_metadata(video_id)
+            if data is None:
+                data = await self._fetch_details(downloader, video_id)
+
+            async with self.media_slots_sem:
+                result = await asyncio.to_thread(downloader.download_media, data, youtube_url, video_id)
+
+            await asyncio.to_thread(self.cache.register, video_id)
             return {
                 'video_id': video_id,
                 'status': 'downloaded',
                 'message': 'Successfully downloaded',
                 'file_path': result['file_path'],
-                'title': result.get('title', 'Unknown')
+                'title': result.get('title', 'Unknown'),
+                'size_bytes': Path(result['file_path']).stat().st_size
             }
         except Exception as e:
             return {
                 'video_id': video_id,
                 'status': 'failed',
-                'message': str(e)
+                'message': str(e),
+                'attempts': row['attempts'],
+                'retry': row['attempts'] < row['max_attempts']
             }
 
-    def process_video_list(self, video_ids: List[str]):
+    async def _worker(self):
+        """Claim and download queued videos until the queue is empty"""
+        while True:
+            row = await asyncio.to_thread(self.queue.claim_next)
+            if row is None:
+                return
+            self.active += 1
+            try:
+                result = await self.download_single_video(row)
+            finally:
+                self.active -= 1
+            await self._record(result)
+
+    async def _record(self, result: Dict):
+        """Persist and report one result (queue writes run off the event loop)"""
+        video_id = result['video_id']
+        done = self.stats['downloaded'] + self.stats['cached'] + self.stats['failed'] + 1
+
+        if result['status'] == 'downloaded':
+            self.stats['downloaded'] += 1
+            await asyncio.to_thread(self.queue.mark, video_id, 'done',
+                                    title=result.get('title'), size_bytes=result.get('size_bytes'))
+            print(f"\r✓ [{done}/{self.stats['total']}] Downloaded: {video_id} - {result.get('title', '')}")
+        elif result['status'] == 'cached':
+            self.stats['cached'] += 1
+            await asyncio.to_thread(self.queue.mark, video_id, 'cached')
+            print(f"\r⊘ [{done}/{self.stats['total']}] Cached: {video_id}")
+        elif result.get('retry'):
+            # Back of its priority band; another worker picks it up again
+            await asyncio.to_thread(self.queue.retry_later, video_id, result['message'])
+            print(f"\r↻ Retry {result['attempts']}: {video_id} - {result['message']}")
+        else:
+            self.stats['failed'] += 1
+            self.stats['errors'].append({'video_id': video_id, 'error': result['message']})
+            await asyncio.to_thread(self.queue.mark, video_id, 'failed', error=result['message'])
+            print(f"\r✗ [{done}/{self.stats['total']}] Failed: {video_id} - {result['message']}")
+
+    async def _display(self):
+        """Live throughput / ETA line"""
+        last_bytes, last_time = 0, time.monotonic()
+        rate = 0.0
+        while True:
+            await asyncio.sleep(2)
+            now = time.monotonic()
+            with self._bytes_lock:
+                current = self._bytes
+            rate = 0.7 * rate + 0.3 * (current - last_bytes) / max(now - last_time, 1e-6)
+            last_bytes, last_time = current, now
+
+            finished = self.stats['downloaded'] + self.stats['cached'] + self.stats['failed']
+            remaining = self.stats['total'] - finished
+            elapsed = now - self.started
+            eta = ''
+            if self.stats['downloaded'] and remaining:
+                per_video = elapsed / (finished or 1)
+                eta = f" | ETA {timedelta(seconds=int(per_video * remaining))}"
+            quota = ''
+            if self.daily_quota:
+                quota = f" | API {await asyncio.to_thread(self.queue.api_calls_today)}/{self.daily_quota}"
+            print(
+                f"\r⬇️  {finished}/{self.stats['total']} | {self.active} active | "
+                f"{rate / MB:.1f} MB/s | {current / MB / 1024:.2f} GB{quota}{eta}   ",
+                end='', flush=True
+            )
+
+    async def run(self):
+        """Drain the persistent queue with bounded concurrency"""
+        self.api_limiter = RequestRateLimiter(self.rpm)
+        self.api_lock = asyncio.Lock()
+        self.media_slots_sem = asyncio.Semaphore(self.media_slots)
+        self.active = 0
+        self.started = time.monotonic()
+
+        display = asyncio.create_task(self._display())
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        finally:
+            display.cancel()
+        self.stats['bytes'] = self._bytes
+
+    def process_video_list(self, videos: List[Tuple[str, int]]):
         """
-        Process list of video IDs
+        Queue video IDs and process everything pending
 
         Args:
-            video_ids: List of YouTube video IDs
+            videos: (video_id, priority) pairs
         """
-        self.stats['total'] = len(video_ids)
+        added = self.queue.add(videos)
+        stale = self.queue.requeue_stale()
+        counts = self.queue.counts()
+        self.stats['total'] = counts.get('pending', 0)
 
         print(f"\n{'='*60}")
         print(f"Download Pipeline")
         print(f"{'='*60}")
-        print(f"Videos: {len(video_ids)}")
+        print(f"Videos: {len(videos)} ({added} newly queued, {stale} resumed)")
+        print(f"Pending: {self.stats['total']}")
         print(f"Workers: {self.workers}")
+        print(f"Connections per video: {self.connections}")
+        print(f"Media hosts: {self.max_connections} connections, "
+              f"{f'{self.max_mbps:.0f} MB/s' if self.max_mbps else 'unlimited bandwidth'}")
+        print(f"Metadata API: {self.rpm:.0f} rpm, "
+              f"{f'{self.daily_quota} calls/day' if self.daily_quota else 'no daily quota'}")
+        print(f"Media: {self.media}")
         print(f"Cache: {self.cache_dir}")
+        print(f"Queue: {self.queue.db_path}")
         print(f"Skip existing: {self.skip_existing}")
         print(f"{'='*60}\n")
 
-        # Download with thread pool
-        with ThreadPoolExecutor(max_workers=self.workers) as executor:
-            # Submit all tasks
-            futures = {
-                executor.submit(self.download_single_video, video_id): video_id
-                for video_id in video_ids
-            }
-
-            # Process results as they complete
-            for future in as_completed(futures):
-                video_id = futures[future]
-
-                try:
-                    result = future.result()
-
-                    if result['status'] == 'downloaded':
-                        self.stats['downloaded'] += 1
-                        print(f"✓ [{self.stats['downloaded']}/{self.stats['total']}] Downloaded: {result['video_id']} - {result.get('title', '')}")
-                    elif result['status'] == 'cached':
-                        self.stats['cached'] += 1
-                        print(f"⊘ [{self.stats['cached']}/{self.stats['total']}] Cached: {result['video_id']}")
-                    else:
-                        self.stats['failed'] += 1
-                        self.stats['errors'].append({
-                            'video_id': video_id,
-                            'error': result['message']
-                        })
-                        print(f"✗ [{self.stats['failed']}/{self.stats['total']}] Failed: {result['video_id']} - {result['message']}")
-
-                except Exception as e:
-                    self.stats['failed'] += 1
-                    self.stats['errors'].append({
-                        'video_id': video_id,
-                        'error': str(e)
-                    })
-                    print(f"✗ Failed: {video_id} - {e}")
+        try:
+            asyncio.run(self.run())
+        except KeyboardInterrupt:
+            print(f"\n⚠️  Interrupted - queued videos resume on the next run")
 
         # Print summary
         self.print_summary()
@@ -183,6 +374,8 @@ class DownloadPipeline:
         print(f"Downloaded: {self.stats['downloaded']}")
         print(f"Cached: {self.stats['cached']}")
         print(f"Failed: {self.stats['failed']}")
+        print(f"API calls: {self.stats['api_calls']}")
+        print(f"Data: {self._bytes / MB / 1024:.2f} GB")
         print(f"{'='*60}\n")
 
         if self.stats['errors']:
@@ -203,7 +396,8 @@ class DownloadPipeline:
             'pipeline': 'youtube_download_cache',
             'timestamp': datetime.now().isoformat(),
             'config': self.config,
-            'stats': self.stats
+            'stats': self.stats,
+            'queue': self.queue.counts()
         }
 
         with open(output_file, 'w') as f:
@@ -212,23 +406,31 @@ class DownloadPipeline:
         print(f"📄 Report saved: {output_file}")
 
 
-def load_video_ids(file_path: Path) -> List[str]:
+def load_video_ids(file_path: Path) -> List[Tuple[str, int]]:
     """
     Load video IDs from text file
 
     Args:
-        file_path: Path to text file (one video ID per line)
+        file_path: Path to text file (one video ID per line, optional
+                   quarter/date/priority as second column)
 
     Returns:
-        List of video IDs
+        List of (video_id, priority)
     """
-    video_ids = []
+    videos = []
     with open(file_path, 'r') as f:
         for line in f:
             line = line.strip()
             if line and not line.startswith('#'):
-                video_ids.append(line)
-    return video_ids
+                parts = line.split()
+                priority = 0
+                if len(parts) > 1:
+                    try:
+                        priority = parse_priority(parts[1])
+                    except ValueError:
+                        print(f"⚠️  Ignoring priority '{parts[1]}' for {parts[0]}")
+                videos.append((parts[0], priority))
+    return videos
 
 
 def load_config(config_file: Path) -> Dict:
@@ -245,7 +447,12 @@ def load_config(config_file: Path) -> Dict:
         return {}
 
     with open(config_file, 'r') as f:
-        return yaml.safe_load(f) or {}
+        config = yaml.safe_load(f) or {}
+
+    # YAML `media:` may hold host limits (a mapping) or the media preference
+    if isinstance(config.get('media'), dict):
+        config['media_limits'] = config.pop('media')
+    return config
 
 
 def main():
@@ -263,34 +470,64 @@ Examples:
   # Skip videos already in cache
   python lens/scripts/download_to_cache_pipeline.py videos.txt --skip-existing
 
+  # Respect the RapidAPI plan: 20 calls/min, 500/day, 40 MB/s total
+  python lens/scripts/download_to_cache_pipeline.py videos.txt --rpm 20 --daily-quota 500 --max-mbps 40
+
+  # Continue a stopped or quota-paused run
+  python lens/scripts/download_to_cache_pipeline.py --resume
+
   # Save report to file
   python lens/scripts/download_to_cache_pipeline.py videos.txt --report download_report.json
         """
     )
 
-    parser.add_argument('video_list', type=Path, help='Text file with video IDs (one per line)')
+    parser.add_argument('video_list', type=Path, nargs='?', help='Text file with video IDs (one per line)')
+    parser.add_argument('--resume', action='store_true', help='Process what is still queued (no video list needed)')
+    parser.add_argument('--retry-failed', action='store_true', help='Re-queue failed downloads first')
+    parser.add_argument('--status', action='store_true', help='Show queue counts and exit')
     parser.add_argument('--config', type=Path, help='YAML config file (optional)')
-    parser.add_argument('--workers', type=int, help='Number of parallel workers (default: 3)')
+    parser.add_argument('--workers', type=int, help='Videos in flight (default: media slots + 2)')
+    parser.add_argument('--connections', type=int, help='Parallel byte-range connections per video (default: 4)')
+    parser.add_argument('--max-connections', type=int, help='Total media host connections (default: 16)')
+    parser.add_argument('--max-mbps', type=float, help='Combined media bandwidth cap in MB/s (default: unlimited)')
+    parser.add_argument('--rpm', type=float, help='RapidAPI metadata requests per minute (default: 30)')
+    parser.add_argument('--daily-quota', type=int, help='RapidAPI calls per UTC day (default: RAPIDAPI_DAILY_QUOTA, 0 = none)')
+    parser.add_argument('--media', choices=MEDIA_PREFERENCES, help='video (default) or audio_only (audio stream only)')
     parser.add_argument('--skip-existing', action='store_true', help='Skip videos already in cache')
     parser.add_argument('--cache-dir', type=Path, help='Cache directory (default: /var/markethawk/_downloads)')
+    parser.add_argument('--queue-db', type=Path, help='Queue database (default: DOWNLOAD_QUEUE_DB or ~/.markethawk/download_queue.db)')
     parser.add_argument('--report', type=Path, help='Save report to JSON file')
 
     args = parser.parse_args()
 
-    # Validate input file
-    if not args.video_list.exists():
-        print(f"❌ Error: File not found: {args.video_list}")
-        return 1
-
-    # Load video IDs
-    print(f"📖 Loading video IDs from: {args.video_list}")
-    video_ids = load_video_ids(args.video_list)
-
-    if not video_ids:
-        print("❌ No video IDs found in file")
-        return 1
-
-    print(f"✓ Found {len(video_ids)} video IDs")
+    if args.status:
+        queue = DownloadQueue(args.queue_db)
+        print(f"\n📦 Download queue: {queue.db_path}")
+        for status, count in sorted(queue.counts().items()):
+            print(f"   {status:12} {count}")
+        print(f"   API calls today: {queue.api_calls_today()}")
+        for failure in queue.failures(limit=10):
+            print(f"   ❌ {failure['video_id']}: {failure['error']}")
+        return 0
+
+    videos = []
+    if args.video_list:
+        # Validate input file
+        if not args.video_list.exists():
+            print(f"❌ Error: File not found: {args.video_list}")
+            return 1
+
+        # Load video IDs
+        print(f"📖 Loading video IDs from: {args.video_list}")
+        videos = load_video_ids(args.video_list)
+
+        if not videos:
+            print("❌ No video IDs found in file")
+            return 1
+
+        print(f"✓ Found {len(videos)} video IDs")
+    elif not args.resume:
+        parser.error('video_list is required (or use --resume)')
 
     # Load config
     config = {}
@@ -298,16 +535,34 @@ Examples:
         config = load_config(args.config)
 
     # Override with CLI args
+    metadata = config.setdefault('metadata', {})
+    media_limits = config.setdefault('media_limits', {})
     if args.workers:
         config['workers'] = args.workers
+    if args.connections:
+        config['connections'] = args.connections
+    if args.max_connections:
+        media_limits['max_connections'] = args.max_connections
+    if args.max_mbps is not None:
+        media_limits['max_mbps'] = args.max_mbps
+    if args.rpm:
+        metadata['rpm'] = args.rpm
+    if args.daily_quota is not None:
+        metadata['daily_quota'] = args.daily_quota
+    if args.media:
+        config['media'] = args.media
     if args.skip_existing:
         config['skip_existing'] = True
     if args.cache_dir:
         config['cache_dir'] = str(args.cache_dir)
+    if args.queue_db:
+        config['queue_db'] = str(args.queue_db)
 
     # Run pipeline
     pipeline = DownloadPipeline(config)
-    pipeline.process_video_list(video_ids)
+    if args.retry_failed:
+        print(f"🔁 Re-queued {pipeline.queue.retry_failed()} failed download(s)")
+    pipeline.process_video_list(videos)
 
     # Save report
     if args.report:
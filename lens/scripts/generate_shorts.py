@@ -2,14 +2,26 @@
 """
 Generate YouTube Shorts from Earnings Call Highlights
 
-Creates props files for Remotion EarningsShort composition
+Creates props files for the Remotion EarningsShort composition and, with
+--render, renders them (ffmpeg backend by default, or Remotion)
+
+Usage:
+    python lens/scripts/generate_shorts.py /var/markethawk/jobs/<job_id>
+    python lens/scripts/generate_shorts.py /var/markethawk/jobs/<job_id> --render --parallel 4
+    python lens/scripts/generate_shorts.py /var/markethawk/jobs/<job_id> --render --renderer remotion
 """
 
 import json
 import argparse
+import sys
 from pathlib import Path
 from typing import List, Dict, Any
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.artifact_io import artifact_exists, load_json_artifact
+from lib.shorts_render import RENDERERS, render_shorts
+from lib.step_payloads import load_job_file
+
 
 def extract_words_for_highlight(transcript: Dict, highlight: Dict, window_seconds: int = 5) -> List[Dict]:
     """
@@ -66,26 +78,22 @@ def generate_shorts(job_dir: Path, max_shorts: int = 5):
     """
     # Load insights
     insights_file = job_dir / 'insights.raw.json'
-    if not insights_file.exists():
+    if not artifact_exists(insights_file):
         raise FileNotFoundError(f"Insights file not found: {insights_file}")
 
-    with open(insights_file, 'r') as f:
-        insights_data = json.load(f)
-        insights = insights_data.get('insights', {})
+    insights_data = load_json_artifact(insights_file)
+    insights = insights_data.get('insights', {})
 
     # Load transcript
     transcript_file = job_dir / 'transcripts' / 'transcript.json'
-    if not transcript_file.exists():
+    if not artifact_exists(transcript_file):
         raise FileNotFoundError(f"Transcript file not found: {transcript_file}")
 
-    with open(transcript_file, 'r') as f:
-        transcript = json.load(f)
+    transcript = load_json_artifact(transcript_file)
 
     # Load job.yaml for metadata
-    import yaml
     job_yaml = job_dir / 'job.yaml'
-    with open(job_yaml, 'r') as f:
-        job_data = yaml.safe_load(f)
+    job_data = load_job_file(job_yaml)
 
     # Get company info
     confirmed = job_data.get('processing', {}).get('confirm_metadata', {}).get('confirmed', {})
@@ -176,7 +184,32 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate YouTube Shorts from earnings highlights")
     parser.add_argument("job_dir", help="Path to job directory")
     parser.add_argument("--max-shorts", type=int, default=5, help="Maximum number of shorts to generate")
+    parser.add_argument("--render", action="store_true", help="Render the shorts after writing props")
+    parser.add_argument("--renderer", choices=RENDERERS, default="ffmpeg", help="Render backend (default: ffmpeg)")
+    parser.add_argument("--parallel", type=int, help="Concurrent renders (default: CPU count / 2 for ffmpeg, 1 for remotion)")
 
     args = parser.parse_args()
 
-    generate_shorts(Path(args.job_dir), args.max_shorts)
+    job_dir = Path(args.job_dir)
+    generate_shorts(job_dir, args.max_shorts)
+
+    if args.render:
+        sources = sorted((job_dir / 'input').glob('source.*'))
+        if args.renderer == 'ffmpeg' and not sources:
+            print(f"❌ No source media in {job_dir / 'input'}")
+            sys.exit(1)
+
+        print(f"🎬 Rendering shorts ({args.renderer})...")
+        results = render_shorts(
+            job_dir / 'shorts',
+            sources[0] if sources else None,
+            renderer=args.renderer,
+            max_parallel=args.parallel,
+            studio_dir=Path(__file__).parent.parent.parent / 'studio'
+        )
+        for r in results:
+            if r['success']:
+                print(f"   ✓ {r['file']} ({r['render_seconds']:.1f}s)")
+            else:
+                print(f"   ✗ short_{r['index']}: {r['error'][:200]}")
+        sys.exit(0 if any(r['success'] for r in results) else 1)
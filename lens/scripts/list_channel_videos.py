@@ -2,8 +2,16 @@
 """
 List all video IDs from a YouTube channel
 
+With --sync, only videos uploaded since the last sync are listed: the newest
+video seen per uploads playlist (id + publish time) and the first page's ETag
+are kept in a local state store (lib/channel_state.py). Paging stops at the
+watermark, an unchanged playlist answers 304 to If-None-Match, and earnings
+filtering uses the playlist snippets (no per-video re-fetch). Many channels
+are synced concurrently; new IDs can go straight into batch_setup.py.
+
 Usage:
     python lens/scripts/list_channel_videos.py <channel_id> [--output videos.txt] [--max-results 500]
+    python lens/scripts/list_channel_videos.py <channel_id> [<channel_id> ...] --sync [--batch-name NAME]
 
 Examples:
     # Get all videos from a channel
@@ -15,6 +23,9 @@ Examples:
     # Use channel URL instead of ID
     python lens/scripts/list_channel_videos.py @nvidia --output nvidia_videos.txt
 
+    # Daily: new earnings uploads from many channels -> new batch
+    python lens/scripts/list_channel_videos.py --channels-file channels.txt --sync --filter-earnings --batch-name daily-2025-11-14
+
 Environment:
     YOUTUBE_API_KEY - Required, get from Google Cloud Console
 """
@@ -22,11 +33,29 @@ Environment:
 import argparse
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.channel_state import ChannelStateStore, PlaylistState
+
+EARNINGS_KEYWORDS = [
+    'earnings', 'quarterly results', 'financial results',
+    'q1', 'q2', 'q3', 'q4', 'fiscal'
+]
+
+
+def is_earnings_video(title: str, description: str) -> bool:
+    """Check if a video title/description looks earnings-related"""
+    title = title.lower()
+    description = description.lower()
+    return any(keyword in title or keyword in description for keyword in EARNINGS_KEYWORDS)
+
+
 def get_channel_id_from_username(youtube, username: str) -> Optional[str]:
     """
     Convert channel username (@nvidia) to channel ID
@@ -144,27 +173,116 @@ def get_playlist_videos(youtube, playlist_id: str, max_results: Optional[int] =
         return video_ids
 
 
-def filter_earnings_videos(youtube, video_ids: List[str]) -> List[str]:
+def sync_playlist(
+    youtube,
+    state: PlaylistState,
+    max_results: Optional[int] = None
+) -> Tuple[List[Dict], PlaylistState, bool]:
+    """
+    List videos uploaded since the playlist watermark
+
+    Pages newest-first and stops at the last-seen video (or anything published
+    at/before it). The first page is requested with If-None-Match, so an
+    unchanged playlist costs a single 304.
+
+    Args:
+        youtube: YouTube API client
+        state: Current watermark (empty state = list everything)
+        max_results: Maximum number of new videos (None = all). A listing cut
+                     short by it returns the watermark unchanged, so the
+                     older new uploads are still listed by the next sync
+
+    Returns:
+        (new videos newest first, advanced watermark, not_modified)
+    """
+    new_videos = []
+    next_page_token = None
+    first_etag = None
+    truncated = False
+
+    while True:
+        request = youtube.playlistItems().list(
+            part='snippet,contentDetails',
+            playlistId=state.playlist_id,
+            maxResults=50,
+            pageToken=next_page_token
+        )
+        if next_page_token is None and state.etag:
+            request.headers['If-None-Match'] = state.etag
+
+        try:
+            response = request.execute()
+        except HttpError as e:
+            if next_page_token is None and e.resp.status == 304:
+                return [], state, True
+            raise
+
+        if next_page_token is None:
+            first_etag = response.get('etag')
+
+        reached = False
+        for item in response['items']:
+            video_id = item['contentDetails']['videoId']
+            snippet = item.get('snippet', {})
+            published_at = item['contentDetails'].get('videoPublishedAt') or snippet.get('publishedAt')
+
+            if video_id == state.last_video_id or (
+                state.last_published_at and published_at and published_at <= state.last_published_at
+            ):
+                reached = True
+                break
+
+            new_videos.append({
+                'video_id': video_id,
+                'published_at': published_at,
+                'title': snippet.get('title', ''),
+                'description': snippet.get('description', ''),
+            })
+            if max_results and len(new_videos) >= max_results:
+                reached = truncated = True
+                break
+
+        print(f"   {state.playlist_id}: {len(new_videos)} new videos...", end='\r')
+
+        next_page_token = response.get('nextPageToken')
+        if reached or not next_page_token:
+            break
+
+    if truncated:
+        return new_videos, state, False
+
+    advanced = replace(state, etag=first_etag or state.etag, videos_seen=state.videos_seen + len(new_videos))
+    dated = [v for v in new_videos if v['published_at']]
+    if dated:
+        newest = max(dated, key=lambda v: v['published_at'])
+        if not state.last_published_at or newest['published_at'] > state.last_published_at:
+            advanced.last_video_id = newest['video_id']
+            advanced.last_published_at = newest['published_at']
+
+    return new_videos, advanced, False
+
+
+def filter_earnings_videos(youtube, video_ids: List[str], store: Optional[ChannelStateStore] = None) -> List[str]:
     """
     Filter videos to only include earnings-related ones
 
     Args:
         youtube: YouTube API client
         video_ids: List of video IDs to filter
+        store: Optional state store; videos classified before are not re-fetched
 
     Returns:
         List of earnings video IDs
     """
-    earnings_keywords = [
-        'earnings', 'quarterly results', 'financial results',
-        'q1', 'q2', 'q3', 'q4', 'fiscal'
-    ]
-
-    earnings_videos = []
+    known = store.known_videos(video_ids) if store else {}
+    to_fetch = [vid for vid in video_ids if known.get(vid) is None]
+    classified = {vid: flag for vid, flag in known.items() if flag is not None}
+    if store and classified:
+        print(f"   {len(classified)} videos already classified, fetching {len(to_fetch)}")
 
     # Process in batches of 50 (YouTube API limit)
-    for i in range(0, len(video_ids), 50):
-        batch = video_ids[i:i+50]
+    for i in range(0, len(to_fetch), 50):
+        batch = to_fetch[i:i+50]
 
         try:
             request = youtube.videos().list(
@@ -173,20 +291,102 @@ def filter_earnings_videos(youtube, video_ids: List[str]) -> List[str]:
             )
             response = request.execute()
 
+            records = []
             for item in response['items']:
-                title = item['snippet']['title'].lower()
-                description = item['snippet']['description'].lower()
-
                 # Check if earnings-related
-                if any(keyword in title or keyword in description for keyword in earnings_keywords):
-                    earnings_videos.append(item['id'])
+                flag = is_earnings_video(item['snippet']['title'], item['snippet']['description'])
+                classified[item['id']] = flag
+                records.append({
+                    'video_id': item['id'],
+                    'published_at': item['snippet'].get('publishedAt'),
+                    'title': item['snippet']['title'],
+                    'is_earnings': flag,
+                })
+                if flag:
                     print(f"   ✓ {item['snippet']['title']}")
+            if store:
+                store.record_videos(records)
 
         except HttpError as e:
             print(f"❌ Error fetching video details: {e}")
             continue
 
-    return earnings_videos
+    return [vid for vid in video_ids if classified.get(vid)]
+
+
+def resolve_channel(youtube, channel_key: str, store: ChannelStateStore) -> Optional[Tuple[str, str]]:
+    """
+    Resolve an id or @handle to (channel_id, uploads_playlist_id), cached in the store
+
+    Returns:
+        (channel_id, uploads_playlist_id) or None
+    """
+    cached = store.get_channel(channel_key)
+    if cached:
+        return cached['channel_id'], cached['uploads_playlist_id']
+
+    channel_id = channel_key
+    if channel_id.startswith('@'):
+        print(f"🔍 Looking up channel ID for {channel_id}...")
+        channel_id = get_channel_id_from_username(youtube, channel_id)
+        if not channel_id:
+            return None
+
+    uploads_playlist_id = get_channel_uploads_playlist_id(youtube, channel_id)
+    if not uploads_playlist_id:
+        return None
+
+    store.save_channel(channel_key, channel_id, uploads_playlist_id)
+    return channel_id, uploads_playlist_id
+
+
+def sync_channel(
+    api_key: str,
+    channel_key: str,
+    store: ChannelStateStore,
+    incremental: bool = True,
+    max_results: Optional[int] = None,
+    filter_earnings: bool = False
+) -> Dict:
+    """
+    List one channel's (new) uploads
+
+    Builds its own API client: googleapiclient clients are not thread-safe.
+    The watermark is returned, not saved - call store.save_playlist() once the
+    new IDs have been handed off.
+
+    Returns:
+        Dict with channel, playlist_id, videos, state, not_modified (or error)
+    """
+    youtube = build('youtube', 'v3', developerKey=api_key, cache_discovery=False)
+
+    resolved = resolve_channel(youtube, channel_key, store)
+    if not resolved:
+        return {'channel': channel_key, 'error': 'channel not found'}
+    channel_id, playlist_id = resolved
+
+    state = store.get_playlist(playlist_id) if incremental else PlaylistState(playlist_id)
+    state.channel_id = channel_id
+
+    try:
+        videos, new_state, not_modified = sync_playlist(youtube, state, max_results)
+    except HttpError as e:
+        return {'channel': channel_key, 'playlist_id': playlist_id, 'error': str(e)}
+
+    # Classify from the playlist snippets (no per-video re-fetch), cache for later runs
+    for video in videos:
+        video['is_earnings'] = is_earnings_video(video['title'], video['description'])
+    store.record_videos(videos, playlist_id)
+    if filter_earnings:
+        videos = [v for v in videos if v['is_earnings']]
+
+    return {
+        'channel': channel_key,
+        'playlist_id': playlist_id,
+        'videos': videos,
+        'state': new_state,
+        'not_modified': not_modified,
+    }
 
 
 def main():
@@ -209,16 +409,37 @@ Examples:
 
   # Use channel handle instead of ID
   python lens/scripts/list_channel_videos.py @nvidia --output nvidia_videos.txt
+
+  # Only uploads since the last sync, for many channels at once, into a new batch
+  python lens/scripts/list_channel_videos.py --channels-file channels.txt --sync \\
+    --filter-earnings --with-dates --output new.txt --batch-name daily-2025-11-14
         """
     )
 
-    parser.add_argument('channel_id', help='YouTube channel ID or @username')
+    parser.add_argument('channel_id', nargs='*', help='YouTube channel ID(s) or @username(s)')
+    parser.add_argument('--channels-file', type=Path, help='Text file with one channel ID/@username per line')
     parser.add_argument('--output', '-o', help='Output file (default: stdout)')
-    parser.add_argument('--max-results', '-n', type=int, help='Maximum number of videos to fetch')
+    parser.add_argument('--max-results', '-n', type=int, help='Maximum number of videos to fetch (per channel; a --sync listing cut short does not advance the watermark)')
     parser.add_argument('--filter-earnings', action='store_true', help='Only include earnings-related videos')
+    parser.add_argument('--sync', action='store_true', help='Only videos since the last sync (advances the watermark)')
+    parser.add_argument('--full', action='store_true', help='With --sync: ignore and rebuild the watermark')
+    parser.add_argument('--with-dates', action='store_true',
+                        help='Write "video_id publish_date" (priority column for download_to_cache_pipeline.py)')
+    parser.add_argument('--workers', type=int, default=4, help='Channels synced concurrently (default: 4)')
+    parser.add_argument('--state-db', type=Path, help='State store (default: CHANNEL_STATE_DB or ~/.markethawk/channel_state.db)')
+    parser.add_argument('--batch-name', help='Create a batch from the listed IDs (batch_setup.py)')
+    parser.add_argument('--pipeline-type', default='audio-only', help='Batch pipeline type (default: audio-only)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Videos per batch (default: 100)')
 
     args = parser.parse_args()
 
+    channels = list(args.channel_id)
+    if args.channels_file:
+        with open(args.channels_file, 'r') as f:
+            channels += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not channels:
+        parser.error('at least one channel_id (or --channels-file) is required')
+
     # Check for API key
     api_key = os.getenv('YOUTUBE_API_KEY')
     if not api_key:
@@ -226,54 +447,73 @@ Examples:
         print("   Get an API key from: https://console.cloud.google.com/apis/credentials")
         return 1
 
-    # Build YouTube API client
-    youtube = build('youtube', 'v3', developerKey=api_key)
-
-    # Handle channel ID or username
-    channel_id = args.channel_id
-    if channel_id.startswith('@'):
-        print(f"🔍 Looking up channel ID for {channel_id}...")
-        channel_id = get_channel_id_from_username(youtube, channel_id)
-        if not channel_id:
-            return 1
-        print(f"   Channel ID: {channel_id}")
-
-    # Get uploads playlist ID
-    print(f"\n📺 Fetching channel details...")
-    uploads_playlist_id = get_channel_uploads_playlist_id(youtube, channel_id)
-    if not uploads_playlist_id:
-        return 1
-
-    print(f"   Uploads playlist: {uploads_playlist_id}")
+    store = ChannelStateStore(args.state_db)
+    incremental = args.sync and not args.full
+
+    print(f"\n📋 {'Syncing' if args.sync else 'Fetching'} {len(channels)} channel(s)...")
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(channels)))) as executor:
+        results = list(executor.map(
+            lambda channel: sync_channel(api_key, channel, store, incremental, args.max_results, args.filter_earnings),
+            channels
+        ))
+
+    videos = []
+    failed = 0
+    for result in results:
+        if 'error' in result:
+            failed += 1
+            print(f"❌ {result['channel']}: {result['error']}")
+        elif result['not_modified']:
+            print(f"   {result['channel']}: unchanged (304)")
+        else:
+            print(f"   {result['channel']}: {len(result['videos'])} {'new ' if incremental else ''}videos")
+            videos.extend(result['videos'])
 
-    # Get all video IDs
-    print(f"\n📋 Fetching video list...")
-    video_ids = get_playlist_videos(youtube, uploads_playlist_id, args.max_results)
+    # Same video can appear on several channels (collabs, re-uploads)
+    seen = set()
+    videos = [v for v in videos if not (v['video_id'] in seen or seen.add(v['video_id']))]
+    video_ids = [v['video_id'] for v in videos]
 
     if not video_ids:
-        print("❌ No videos found")
-        return 1
-
-    print(f"\n✅ Found {len(video_ids)} videos")
-
-    # Filter earnings videos if requested
-    if args.filter_earnings:
-        print(f"\n🔍 Filtering earnings-related videos...")
-        video_ids = filter_earnings_videos(youtube, video_ids)
-        print(f"✅ Found {len(video_ids)} earnings videos")
-
-    # Output results
-    if args.output:
-        output_path = Path(args.output)
-        with open(output_path, 'w') as f:
-            for video_id in video_ids:
-                f.write(f"{video_id}\n")
-        print(f"\n✅ Saved to: {output_path}")
+        print("✅ No new videos" if args.sync else "❌ No videos found")
     else:
-        # Print to stdout
-        for video_id in video_ids:
-            print(video_id)
+        print(f"\n✅ Found {len(video_ids)} {'earnings ' if args.filter_earnings else ''}videos")
+
+        lines = [f"{v['video_id']} {(v['published_at'] or '')[:10]}".rstrip() if args.with_dates else v['video_id']
+                 for v in videos]
+
+        # Output results
+        if args.output:
+            output_path = Path(args.output)
+            with open(output_path, 'w') as f:
+                for line in lines:
+                    f.write(f"{line}\n")
+            print(f"\n✅ Saved to: {output_path}")
+        elif not args.batch_name:
+            # Print to stdout
+            for line in lines:
+                print(line)
+
+        if args.batch_name:
+            from batch_setup import create_batch_structure
+            create_batch_structure(
+                video_ids=video_ids,
+                batch_name=args.batch_name,
+                batch_size=args.batch_size,
+                base_path=Path('/var/markethawk/batch_runs'),
+                pipeline_type=args.pipeline_type
+            )
+
+    # Advance watermarks only after the new IDs were handed off
+    if args.sync:
+        for result in results:
+            if 'error' not in result and not result['not_modified']:
+                store.save_playlist(result['state'])
 
+    if failed:
+        return 1
+    if not video_ids and not args.sync:
+        return 1
     return 0
 
 
@@ -9,7 +9,6 @@ Migrate job from dev to production
 import os
 import sys
 import subprocess
-import yaml
 from pathlib import Path
 
 # Add parent to path
@@ -19,6 +18,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 os.environ['DEV_MODE'] = 'false'
 
 # Import after setting DEV_MODE
+from lib.step_payloads import load_job_file
 from steps.match_company import match_company
 from steps.update_database import update_database
 
@@ -134,8 +134,7 @@ def main():
     job_dir = job_file.parent
 
     # Load job data
-    with open(job_file, 'r') as f:
-        job_data = yaml.safe_load(f)
+    job_data = load_job_file(job_file)
 
     job_id = job_data.get('job_id')
     print(f"\n🚀 Migrating job: {job_id}")
@@ -14,6 +14,8 @@ LENS_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(LENS_DIR))
 
 from scripts.upload_youtube import build_description
+from lib.artifact_io import artifact_exists, load_json_artifact
+from lib.step_payloads import load_job_file
 
 
 def preview_youtube_metadata(job_yaml_path: str):
@@ -23,23 +25,18 @@ def preview_youtube_metadata(job_yaml_path: str):
     Args:
         job_yaml_path: Path to job.yaml
     """
-    import yaml
-    import json
-
     job_file = Path(job_yaml_path)
     job_dir = job_file.parent
 
     # Load job config
-    with open(job_file) as f:
-        job_data = yaml.safe_load(f)
+    job_data = load_job_file(job_file)
 
     # Load insights
     insights_file = job_data.get('processing', {}).get('extract_insights', {}).get('insights_file')
     insights = {}
-    if insights_file and Path(insights_file).exists():
-        with open(insights_file, 'r') as f:
-            insights_data = json.load(f)
-            insights = insights_data.get('insights', {})
+    if insights_file and artifact_exists(Path(insights_file)):
+        insights_data = load_json_artifact(insights_file)
+        insights = insights_data.get('insights', {})
 
     # Get metadata
     confirmed = job_data.get('processing', {}).get('confirm_metadata', {}).get('confirmed', {})
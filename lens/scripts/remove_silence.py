@@ -11,6 +11,10 @@ import argparse
 import json
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.audio_policy import AAC_RENDER, container_accepts, probe_audio
+from lib.trim_detect import detect_trim, parse_db
+
 
 class SilenceRemover:
     """Remove initial silence from video files"""
@@ -28,31 +32,16 @@ class SilenceRemover:
         print(f"  Threshold: {self.threshold}")
         print(f"  Min duration: {self.min_duration}s")
 
-        # Use ffmpeg silencedetect filter
-        cmd = [
-            "ffmpeg",
-            "-i", str(self.input_path),
-            "-af", f"silencedetect=noise={self.threshold}:d={self.min_duration}",
-            "-f", "null",
-            "-"
-        ]
-
-        result = subprocess.run(
-            cmd,
-            stderr=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            text=True
-        )
-
-        # Parse ffmpeg output for silence_end
-        silence_end = 0.0
-        for line in result.stderr.split('\n'):
-            if 'silence_end:' in line:
-                # Extract timestamp from line like: [silencedetect @ 0x...] silence_end: 3.456 | silence_duration: 3.456
-                parts = line.split('silence_end:')[1].split('|')[0].strip()
-                silence_end = float(parts)
-                print(f"✓ Silence ends at: {silence_end}s")
-                break
+        # Decode only the head of the audio, growing until sound starts
+        # (silencedetect over the whole file only to read the first silence_end)
+        silence_end = detect_trim(
+            self.input_path,
+            silence_db=parse_db(self.threshold),
+            min_silence=self.min_duration,
+            find_speech=False
+        ).silence_end
+        if silence_end > 0:
+            print(f"✓ Silence ends at: {silence_end}s")
 
         if silence_end == 0.0:
             print(f"  No initial silence detected (or audio starts immediately)")
@@ -70,12 +59,20 @@ class SilenceRemover:
 
         print(f"✂️  Trimming video from {start_time}s onwards...")
 
+        # Copy all streams (fast, no re-encoding) unless the output container
+        # can't carry the source audio codec - then only the audio is re-encoded
+        codec_args = ["-c", "copy"]
+        codec = probe_audio(self.input_path).get("codec_name")
+        if codec and not container_accepts(self.output_path.suffix, codec):
+            print(f"  {codec} audio can't be copied into {self.output_path.suffix}, re-encoding audio only")
+            codec_args = ["-c:v", "copy", *AAC_RENDER.encoder_args()]
+
         # Use ffmpeg to trim
         cmd = [
             "ffmpeg",
             "-i", str(self.input_path),
             "-ss", str(start_time),  # Start time
-            "-c", "copy",  # Copy codec (fast, no re-encoding)
+            *codec_args,
             "-y",  # Overwrite output
             str(self.output_path)
         ]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Render Thumbnails - all thumbnail/banner variations for many jobs at once
+
+For every job directory (job.yaml) the renders are queued as independent
+tasks and drawn on a process pool:
+
+    frames extracted (thumbnails/frame_*.jpg)  -> every branding variation of every frame
+    audio-only (no frames)                     -> eye-catching custom thumbnail
+    company/quarter known                      -> renders/banner.png (--banner)
+
+Usage:
+    # All jobs of a batch
+    python lens/scripts/render_thumbnails.py --batch /var/markethawk/batch_runs/nov-13-2025/batch.yaml
+
+    # Specific job directories, 8 processes, banners too
+    python lens/scripts/render_thumbnails.py /var/markethawk/jobs/job_* --workers 8 --banner
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.compositing import RenderTask, render_batch
+from lib.step_payloads import load_job_file
+from smart_thumbnail_generator import add_branding_to_frame, create_eye_catching_thumbnail
+from steps.create_banner import render_banner
+
+JOBS_DIR = Path('/var/markethawk/jobs')
+VARIATIONS = (1, 2, 3, 4)
+
+
+def job_metadata(job: Dict) -> Dict:
+    """Company/ticker/quarter/year from whichever part of job.yaml has them"""
+    company = job.get('company') or {}
+    insights = job.get('insights') or {}
+    confirmed = job.get('processing', {}).get('confirm_metadata', {}).get('confirmed', {}) or {}
+    return {
+        'company': company.get('name') or insights.get('company_name') or confirmed.get('company'),
+        'ticker': company.get('ticker') or insights.get('company_ticker') or confirmed.get('ticker') or '',
+        'quarter': company.get('quarter') or insights.get('quarter') or confirmed.get('quarter') or 'Q4',
+        'year': company.get('year') or insights.get('year') or confirmed.get('year') or 2024,
+    }
+
+
+def job_tasks(job_dir: Path, banner: bool = False) -> List[RenderTask]:
+    """Render tasks for one job"""
+    job = load_job_file(job_dir / 'job.yaml')
+    meta = job_metadata(job)
+    if not meta['company']:
+        return []
+
+    thumbnails_dir = job_dir / 'thumbnails'
+    thumbnails_dir.mkdir(parents=True, exist_ok=True)
+    job_id = job.get('job_id', job_dir.name)
+    tasks = []
+
+    frames = sorted(thumbnails_dir.glob('frame_*.jpg'))
+    if frames:
+        branding_data = {'company': {'name': meta['company'], 'quarter': meta['quarter'], 'year': meta['year']}}
+        for i, frame in enumerate(frames, 1):
+            for variation in VARIATIONS:
+                output = thumbnails_dir / f"thumbnail_{i}_v{variation}.jpg"
+                tasks.append(RenderTask(
+                    f"{job_id}/{output.name}", add_branding_to_frame,
+                    (str(frame), branding_data, str(output)), {'variation': variation}
+                ))
+    else:
+        thumbnail_data = {
+            'company': meta['company'],
+            'ticker': meta['ticker'],
+            'quarter': meta['quarter'],
+            'fiscal_year': meta['year'],
+            'stock_change_percent': job.get('stock_change_percent', 0.0),
+        }
+        output = thumbnails_dir / 'custom_thumbnail.jpg'
+        tasks.append(RenderTask(
+            f"{job_id}/{output.name}", create_eye_catching_thumbnail, (thumbnail_data, str(output))
+        ))
+
+    if banner:
+        output = job_dir / 'renders' / 'banner.png'
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tasks.append(RenderTask(
+            f"{job_id}/banner.png", render_banner,
+            (meta['company'], meta['ticker'], meta['quarter'], meta['year'], str(output))
+        ))
+    return tasks
+
+
+def batch_job_dirs(batch_yaml: Path) -> List[Path]:
+    """Job directories of a batch.yaml"""
+    with open(batch_yaml) as f:
+        batch = yaml.safe_load(f) or {}
+    return [JOBS_DIR / job['job_id'] for job in batch.get('jobs', [])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render thumbnail and banner variations for many jobs on a process pool')
+    parser.add_argument('job_dirs', nargs='*', type=Path, help='Job directories (containing job.yaml)')
+    parser.add_argument('--batch', type=Path, help='batch.yaml - render every job of the batch')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Render processes (default: CPU count)')
+    parser.add_argument('--banner', action='store_true', help='Also render renders/banner.png')
+    args = parser.parse_args()
+
+    job_dirs = list(args.job_dirs)
+    if args.batch:
+        job_dirs += batch_job_dirs(args.batch)
+    job_dirs = [d for d in job_dirs if (d / 'job.yaml').exists()]
+    if not job_dirs:
+        print("❌ No job directories with a job.yaml")
+        sys.exit(1)
+
+    tasks = []
+    for job_dir in job_dirs:
+        tasks.extend(job_tasks(job_dir, banner=args.banner))
+
+    print(f"🎨 Rendering {len(tasks)} images for {len(job_dirs)} jobs ({args.workers} processes)")
+    started = time.monotonic()
+    results = render_batch(tasks, workers=args.workers)
+    elapsed = time.monotonic() - started
+
+    failed = [r for r in results if not r['success']]
+    for r in failed:
+        print(f"   ✗ {r['label']}: {r['error']}")
+    print(f"✅ {len(results) - len(failed)}/{len(results)} rendered in {elapsed:.1f}s "
+          f"({len(results) / max(elapsed, 0.01):.1f} images/s)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@
 Update YouTube video description without re-uploading video
 """
 
-import yaml
 import os
 import sys
 import argparse
@@ -16,6 +15,7 @@ load_dotenv()
 # Import from upload_youtube.py
 sys.path.insert(0, str(Path(__file__).parent))
 from upload_youtube import get_youtube_client, build_description
+from lib.step_payloads import load_job_file
 
 def update_video_description(video_id: str, metadata_file: Path):
     """
@@ -25,9 +25,8 @@ def update_video_description(video_id: str, metadata_file: Path):
         video_id: YouTube video ID
         metadata_file: Path to job.yaml with metadata
     """
-    # Load job metadata
-    with open(metadata_file, 'r') as f:
-        job_data = yaml.safe_load(f)
+    # Load job metadata (step payloads may live in steps/*.json sidecars)
+    job_data = load_job_file(metadata_file)
 
     # Build new description
     description = build_description(job_data)
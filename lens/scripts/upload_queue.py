@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Upload Queue CLI - Inspect and drain the background R2 upload queue
+
+Uploads queued by workflows/batches (background upload mode) live in a local
+SQLite queue (UPLOAD_QUEUE_DB, default ~/.markethawk/upload_queue.db). They
+survive restarts; this tool shows what is pending and finishes the work.
+
+Usage:
+    # Counts per status
+    python lens/scripts/upload_queue.py status
+
+    # List failed uploads for a job
+    python lens/scripts/upload_queue.py list --status failed --job-id abc123_x7k2
+
+    # Upload everything still pending (e.g. after a crash)
+    python lens/scripts/upload_queue.py drain --parallel 8
+
+    # Re-queue failed uploads and drain them
+    python lens/scripts/upload_queue.py retry --drain
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.upload_queue import BackgroundUploader, UploadQueue
+
+# Load environment variables (R2 credentials)
+load_dotenv()
+
+
+def print_status(queue: UploadQueue):
+    """Print upload counts per status"""
+    counts = queue.counts()
+    print(f"\n📦 Upload queue: {queue.db_path}")
+    if not counts:
+        print("   (empty)")
+        return
+    for status in ('pending', 'in_progress', 'uploaded', 'skipped', 'failed'):
+        if status in counts:
+            print(f"   {status:12} {counts[status]}")
+
+
+def drain(queue: UploadQueue, parallel: int):
+    """Upload all pending items and report the result"""
+    with BackgroundUploader(queue, max_parallel=parallel):
+        pass  # __exit__ drains the queue
+    print_status(queue)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and drain the background R2 upload queue')
+    parser.add_argument('--db', type=Path, help='Queue database (default: UPLOAD_QUEUE_DB or ~/.markethawk/upload_queue.db)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('status', help='Show counts per status')
+
+    list_parser = subparsers.add_parser('list', help='List uploads')
+    list_parser.add_argument('--status', help='Filter by status (pending, uploaded, failed, ...)')
+    list_parser.add_argument('--job-id', help='Filter by job')
+    list_parser.add_argument('--limit', type=int, default=50, help='Max rows (default: 50)')
+
+    drain_parser = subparsers.add_parser('drain', help='Upload everything pending')
+    drain_parser.add_argument('--parallel', type=int, default=4, help='Concurrent uploads (default: 4)')
+
+    retry_parser = subparsers.add_parser('retry', help='Re-queue failed uploads')
+    retry_parser.add_argument('--job-id', help='Only this job')
+    retry_parser.add_argument('--drain', action='store_true', help='Upload them now')
+    retry_parser.add_argument('--parallel', type=int, default=4, help='Concurrent uploads (default: 4)')
+
+    args = parser.parse_args()
+    queue = UploadQueue(args.db)
+
+    if args.command == 'status':
+        print_status(queue)
+
+    elif args.command == 'list':
+        rows = queue.list_uploads(status=args.status, job_id=args.job_id, limit=args.limit)
+        for row in rows:
+            line = f"{row['id']:>6}  {row['status']:11}  {row['job_id'] or '-':24}  {row['bucket']}/{row['key']}"
+            if row['error']:
+                line += f"\n        ❌ {row['error']}"
+            print(line)
+        print(f"\n{len(rows)} upload(s)")
+
+    elif args.command == 'drain':
+        drain(queue, args.parallel)
+
+    elif args.command == 'retry':
+        count = queue.retry_failed(job_id=args.job_id)
+        print(f"🔁 Re-queued {count} failed upload(s)")
+        if args.drain and count:
+            drain(queue, args.parallel)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
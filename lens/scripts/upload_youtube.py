@@ -4,7 +4,6 @@ Upload earnings call video to YouTube with comprehensive metadata.
 Supports job.yaml format and thumbnail uploads.
 """
 
-import yaml
 import os
 import sys
 import argparse
@@ -12,6 +11,10 @@ from pathlib import Path
 from typing import Dict, Optional
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.artifact_io import artifact_exists, load_json_artifact
+from lib.step_payloads import load_job_file
+
 # Load environment
 load_dotenv()
 
@@ -81,11 +84,9 @@ def build_description(job_data: Dict) -> str:
     # Load insights from file (not stored in job.yaml, only metadata)
     insights_file = job_data.get('processing', {}).get('extract_insights', {}).get('insights_file')
     insights = {}
-    if insights_file and Path(insights_file).exists():
-        import json
-        with open(insights_file, 'r') as f:
-            insights_data = json.load(f)
-            insights = insights_data.get('insights', {})
+    if insights_file and artifact_exists(Path(insights_file)):
+        insights_data = load_json_artifact(insights_file)
+        insights = insights_data.get('insights', {})
 
     company = job_data.get('company', {})
 
@@ -187,8 +188,7 @@ def upload_video(video_path: str, job_yaml_path: str, thumbnail_path: Optional[s
     """
 
     # Load job.yaml
-    with open(job_yaml_path, 'r') as f:
-        job_data = yaml.safe_load(f)
+    job_data = load_job_file(job_yaml_path)
 
     company = job_data.get('company', {})
     youtube_info = job_data.get('youtube', {})
@@ -196,11 +196,9 @@ def upload_video(video_path: str, job_yaml_path: str, thumbnail_path: Optional[s
     # Load insights from file (not stored in job.yaml, only metadata)
     insights_file = job_data.get('processing', {}).get('extract_insights', {}).get('insights_file')
     insights = {}
-    if insights_file and Path(insights_file).exists():
-        import json
-        with open(insights_file, 'r') as f:
-            insights_data = json.load(f)
-            insights = insights_data.get('insights', {})
+    if insights_file and artifact_exists(Path(insights_file)):
+        insights_data = load_json_artifact(insights_file)
+        insights = insights_data.get('insights', {})
 
     # Prefer confirmed metadata (from manual-audio workflow)
     confirmed = job_data.get('processing', {}).get('confirm_metadata', {}).get('confirmed', {})
@@ -21,11 +21,16 @@ import json
 import yaml
 import subprocess
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
+from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
 import requests
 from io import BytesIO
 import logging
 
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.compositing import get_font, load_asset, overlay_gradient
+from lib.frame_scoring import extract_full_frames, sample_candidates, select_top
+from lib.media_probe import ProbeError, probe
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -38,22 +43,12 @@ def has_video_stream(video_path: str) -> bool:
         bool: True if video stream exists, False if audio-only
     """
     try:
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=codec_type',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        has_video = result.stdout.strip() == 'video'
+        has_video = probe(video_path).has_video
 
         logger.info(f"Video stream detected: {has_video}")
         return has_video
 
-    except Exception as e:
+    except ProbeError as e:
         logger.error(f"Error checking video stream: {e}")
         return False
 
@@ -61,21 +56,14 @@ def has_video_stream(video_path: str) -> bool:
 def get_video_duration(video_path: str) -> float:
     """Get video duration in seconds"""
     try:
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        duration = float(result.stdout.strip())
+        duration = probe(video_path).duration
+        if duration is None:
+            raise ProbeError(f"No duration reported for {video_path}")
 
         logger.info(f"Video duration: {duration:.1f}s")
         return duration
 
-    except Exception as e:
+    except ProbeError as e:
         logger.error(f"Error getting video duration: {e}")
         return 0.0
 
@@ -140,14 +128,9 @@ def add_branding_to_frame(frame_path: str, data: dict, output_path: str, variati
         draw = ImageDraw.Draw(img)
 
         # Load fonts
-        try:
-            font_company = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 80)
-            font_quarter = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 50)
-            font_metric = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 40)
-        except:
-            font_company = ImageFont.load_default()
-            font_quarter = ImageFont.load_default()
-            font_metric = ImageFont.load_default()
+        font_company = get_font(80, bold=True)
+        font_quarter = get_font(50, bold=True)
+        font_metric = get_font(40, bold=True)
 
         # Extract data from job.yaml (company info at top level)
         company_info = data.get('company', {})
@@ -240,10 +223,12 @@ def add_branding_to_frame(frame_path: str, data: dict, output_path: str, variati
 
 def extract_frames_from_video(video_path: str, output_dir: str, num_frames: int = 4) -> list:
     """
-    Extract frames from strategic locations in video
+    Extract the best-looking frames from the video
 
-    Extracts frames at: 15%, 35%, 55%, 75% of video duration
-    (Avoiding very start/end which may have static screens)
+    One downscaled decode pass samples frames across 10-90% of the video and
+    scores them (sharpness, contrast, speaker/text content, no duplicates);
+    only the top frames are written at full resolution. Falls back to fixed
+    positions (15%, 35%, 55%, 75%) if sampling yields nothing.
 
     Args:
         video_path: Path to video file
@@ -262,17 +247,30 @@ def extract_frames_from_video(video_path: str, output_dir: str, num_frames: int
 
     os.makedirs(output_dir, exist_ok=True)
 
-    # Extract at strategic positions (avoiding very start/end)
-    positions = [0.15, 0.35, 0.55, 0.75][:num_frames]
+    candidates = sample_candidates(video_path, duration)
+    picks = select_top(candidates, num_frames, duration)
+    logger.info(f"Scored {len(candidates)} sampled frames, picked {len(picks)}")
 
-    frame_paths = []
+    if picks:
+        frame_paths = extract_full_frames(
+            video_path,
+            [c.timestamp for c in picks],
+            [os.path.join(output_dir, f"frame_{i+1}_at_{int(c.timestamp)}s.jpg") for i, c in enumerate(picks)]
+        )
+        for c in picks:
+            logger.info(f"✓ Frame at {c.timestamp:.1f}s (score {c.score:.2f})")
+    else:
+        # Extract at strategic positions (avoiding very start/end)
+        positions = [0.15, 0.35, 0.55, 0.75][:num_frames]
 
-    for i, pos in enumerate(positions):
-        timestamp = duration * pos
-        frame_path = os.path.join(output_dir, f"frame_{i+1}_at_{int(timestamp)}s.jpg")
+        frame_paths = []
 
-        if extract_frame_at_timestamp(video_path, timestamp, frame_path):
-            frame_paths.append(frame_path)
+        for i, pos in enumerate(positions):
+            timestamp = duration * pos
+            frame_path = os.path.join(output_dir, f"frame_{i+1}_at_{int(timestamp)}s.jpg")
+
+            if extract_frame_at_timestamp(video_path, timestamp, frame_path):
+                frame_paths.append(frame_path)
 
     logger.info(f"✅ Extracted {len(frame_paths)} frames from video")
     return frame_paths
@@ -387,12 +385,8 @@ def create_stock_chart_simple(
         draw.ellipse([x-4, y-4, x+4, y+4], fill=color)
 
     # Draw large arrow and percentage
-    try:
-        font_large = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 120)
-        font_percent = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 80)
-    except:
-        font_large = ImageFont.load_default()
-        font_percent = ImageFont.load_default()
+    font_large = get_font(120, bold=True)
+    font_percent = get_font(80, bold=True)
 
     # Arrow
     arrow_text = arrow
@@ -445,30 +439,15 @@ def create_eye_catching_thumbnail(
         fiscal_year = data.get('fiscal_year', 2024)
         change_percent = data.get('stock_change_percent', 0.0)  # Default to 0
 
-        # Create gradient background (dark, professional)
-        img = Image.new('RGB', (width, height), (15, 23, 42))
-
-        # Add gradient overlay
-        gradient = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        gradient_draw = ImageDraw.Draw(gradient)
-
-        for i in range(height):
-            alpha = int(100 * (i / height))
-            gradient_draw.rectangle([(0, i), (width, i+1)], fill=(30, 41, 59, alpha))
-
-        img = Image.alpha_composite(img.convert('RGBA'), gradient).convert('RGB')
+        # Create gradient background (dark, professional): slate 900 fading to slate 800 at the bottom
+        img = overlay_gradient(Image.new('RGB', (width, height), (15, 23, 42)), (30, 41, 59), 0.0, 100 / 255)
 
         draw = ImageDraw.Draw(img, 'RGBA')
 
         # Load fonts
-        try:
-            font_title = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 110)
-            font_ticker = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 70)
-            font_quarter = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 60)
-        except:
-            font_title = ImageFont.load_default()
-            font_ticker = ImageFont.load_default()
-            font_quarter = ImageFont.load_default()
+        font_title = get_font(110, bold=True)
+        font_ticker = get_font(70, bold=True)
+        font_quarter = get_font(60, bold=True)
 
         # Layout: Left side = Text, Right side = Chart
         left_width = int(width * 0.5)
@@ -514,10 +493,7 @@ def create_eye_catching_thumbnail(
 
         # "EARNINGS CALL" text
         earnings_y = quarter_y + 90
-        try:
-            font_small = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', 45)
-        except:
-            font_small = ImageFont.load_default()
+        font_small = get_font(45)
 
         draw.text((50, earnings_y), "EARNINGS CALL", font=font_small, fill=(226, 232, 240))
 
@@ -534,11 +510,9 @@ def create_eye_catching_thumbnail(
         # CEO image (if available)
         if ceo_image_path and os.path.exists(ceo_image_path):
             try:
-                ceo_img = Image.open(ceo_image_path)
-
-                # Resize and crop to circle
+                # Resize and crop to circle (decoded/resized once per process)
                 ceo_size = 180
-                ceo_img = ceo_img.resize((ceo_size, ceo_size), Image.Resampling.LANCZOS)
+                ceo_img = load_asset(ceo_image_path, (ceo_size, ceo_size)).convert('RGBA')
 
                 # Create circular mask
                 mask = Image.new('L', (ceo_size, ceo_size), 0)
@@ -564,10 +538,7 @@ def create_eye_catching_thumbnail(
                 logger.warning(f"Could not add CEO image: {e}")
 
         # Logo badge (bottom right)
-        try:
-            font_logo = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 35)
-        except:
-            font_logo = ImageFont.load_default()
+        font_logo = get_font(35, bold=True)
 
         logo_x = width - 320
         logo_y = height - 90
@@ -126,6 +126,11 @@ try:
 except ImportError:
     ffmpeg_audio_with_banner = None
 
+try:
+    from steps.render_shorts import render_shorts
+except ImportError:
+    render_shorts = None
+
 
 # Step Handler Registry
 # Maps handler names (from workflow YAML) to Python functions
@@ -157,6 +162,7 @@ STEP_HANDLERS: Dict[str, Callable] = {
     'ffmpeg_audio_with_banner': ffmpeg_audio_with_banner,
     'remotion_render': remotion_render,
     'generate_thumbnails': generate_thumbnails_step,
+    'render_shorts': render_shorts,
 
     # Database steps
     'update_database': update_database,
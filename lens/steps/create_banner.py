@@ -2,9 +2,60 @@
 Create Banner - Create static banner image for video background
 """
 
+import sys
 from pathlib import Path
 from typing import Dict, Any
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.compositing import centered_x, get_font
+
+
+def render_banner(
+    company_name: str,
+    ticker: str,
+    quarter: str,
+    year,
+    output_path: str,
+    width: int = 1920,
+    height: int = 1080
+) -> str:
+    """
+    Draw the banner image (module-level so batches can render it on a process pool)
+
+    Returns:
+        output_path
+    """
+    # Create image with dark background
+    img = Image.new('RGB', (width, height), color='#1a1a2e')
+    draw = ImageDraw.Draw(img)
+
+    # Fonts (cached per process)
+    font_large = get_font(120, bold=True)
+    font_medium = get_font(80)
+    font_small = get_font(60)
+
+    # Calculate text positions (centered)
+    # Company name (top)
+    company_x = centered_x(draw, company_name, font_large, width)
+    company_y = height // 3
+
+    # Earnings call text
+    earnings_text = f"{quarter} {year} Earnings Call"
+    earnings_x = centered_x(draw, earnings_text, font_medium, width)
+    earnings_y = company_y + 150
+
+    # Ticker (bottom)
+    ticker_x = centered_x(draw, ticker, font_small, width)
+    ticker_y = earnings_y + 120
+
+    # Draw text
+    draw.text((company_x, company_y), company_name, fill='#ffffff', font=font_large)
+    draw.text((earnings_x, earnings_y), earnings_text, fill='#e94560', font=font_medium)
+    draw.text((ticker_x, ticker_y), ticker, fill='#0f3460', font=font_small)
+
+    img.save(output_path)
+    return output_path
 
 
 def create_banner(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -38,50 +89,8 @@ def create_banner(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
 
     # Image dimensions (1920x1080)
     width, height = 1920, 1080
+    render_banner(company_name, ticker, quarter, year, str(banner_path), width, height)
 
-    # Create image with dark background
-    img = Image.new('RGB', (width, height), color='#1a1a2e')
-    draw = ImageDraw.Draw(img)
-
-    # Try to use a nice font, fall back to default
-    try:
-        # Try common font paths
-        font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 120)
-        font_medium = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 80)
-        font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 60)
-    except:
-        # Fallback to default font
-        font_large = ImageFont.load_default()
-        font_medium = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-
-    # Calculate text positions (centered)
-    # Company name (top)
-    company_bbox = draw.textbbox((0, 0), company_name, font=font_large)
-    company_width = company_bbox[2] - company_bbox[0]
-    company_x = (width - company_width) // 2
-    company_y = height // 3
-
-    # Earnings call text
-    earnings_text = f"{quarter} {year} Earnings Call"
-    earnings_bbox = draw.textbbox((0, 0), earnings_text, font=font_medium)
-    earnings_width = earnings_bbox[2] - earnings_bbox[0]
-    earnings_x = (width - earnings_width) // 2
-    earnings_y = company_y + 150
-
-    # Ticker (bottom)
-    ticker_bbox = draw.textbbox((0, 0), ticker, font=font_small)
-    ticker_width = ticker_bbox[2] - ticker_bbox[0]
-    ticker_x = (width - ticker_width) // 2
-    ticker_y = earnings_y + 120
-
-    # Draw text
-    draw.text((company_x, company_y), company_name, fill='#ffffff', font=font_large)
-    draw.text((earnings_x, earnings_y), earnings_text, fill='#e94560', font=font_medium)
-    draw.text((ticker_x, ticker_y), ticker, fill='#0f3460', font=font_small)
-
-    # Save image
-    img.save(banner_path)
     print(f"📸 Banner image created: {banner_path.name}")
     print(f"   Size: {width}x{height}")
     print(f"   Company: {company_name}")
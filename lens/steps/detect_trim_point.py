@@ -0,0 +1,48 @@
+"""
+Detect Trim Point - Find where the call starts from the head of the source audio
+
+Runs straight after download (no transcript needed): lib/trim_detect decodes
+the first minutes of input/source.* until it hears sustained speech. The
+video is not cut - `trim_start_seconds` (top-level, human-editable) is set to
+5 s before the first speech, unless it was already set by hand.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.trim_detect import PRE_ROLL, detect_trim
+
+
+def detect_trim_point(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Detect first speech and the trim start (step handler)
+
+    Args:
+        job_dir: Job directory path
+        job_data: Job data dict (trim_start_seconds is set on it)
+
+    Returns:
+        Result dict with silence_end, first_speech_at, trim_start_seconds
+    """
+    sources = sorted((job_dir / "input").glob("source.*"))
+    if not sources:
+        raise FileNotFoundError(f"No source media found in {job_dir / 'input'}")
+
+    print(f"🔍 Detecting first speech in {sources[0].name}...")
+    trim = detect_trim(sources[0], pre_roll=PRE_ROLL)
+
+    if trim.first_speech_at is None:
+        print(f"  ⚠️  No sustained speech in the first {trim.decoded_seconds:.0f}s, keeping the start")
+    else:
+        print(f"  ✓ First speech at {trim.first_speech_at:.2f}s "
+              f"(decoded {trim.decoded_seconds:.0f}s of audio)")
+
+    if job_data.get('trim_start_seconds') is None:
+        job_data['trim_start_seconds'] = trim.trim_start_seconds
+        print(f"  ✓ Video will start at: {trim.trim_start_seconds:.2f}s")
+    else:
+        print(f"  Keeping trim_start_seconds from job.yaml: {job_data['trim_start_seconds']}")
+
+    return trim.to_dict()
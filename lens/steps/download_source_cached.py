@@ -1,12 +1,21 @@
 """
 Download Source Cached Step - Download video from YouTube with caching
+
+Cached files are linked into the job (reflink/hardlink/symlink, copy as last resort)
+instead of copied; see lib/download_cache.py.
+
+Media preference comes from job input.media, defaulting to the workflow's
+`source.media` (audio_only workflows fetch just the audio stream, e.g. source.m4a).
 """
 
-import shutil
+import sys
 from pathlib import Path
 from typing import Dict, Any
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.download_cache import DownloadCache
+
 
 def download_source_cached(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -21,10 +30,11 @@ def download_source_cached(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str,
     Returns:
         Result dict with downloaded file info
     """
-    # Get input URL
+    # Get input URL and media preference
     input_data = job_data.get('input', {})
     input_type = input_data.get('type')
     youtube_url = input_data.get('value')
+    media = input_data.get('media', 'video')
 
     if input_type != 'youtube_url' or not youtube_url:
         raise ValueError(f"Invalid input: expected youtube_url, got {input_type}")
@@ -41,36 +51,34 @@ def download_source_cached(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str,
 
     print(f"📥 Downloading YouTube video: {video_id}")
     print(f"   URL: {youtube_url}")
+    print(f"   Media: {media}")
 
     # Check cache first
-    cache_dir = Path("/var/markethawk/_downloads") / video_id
-    cached_video = cache_dir / "source.mp4"
-    cached_metadata = cache_dir / "metadata.json"
-
-    if cached_video.exists():
-        print(f"✅ Found in cache: {cache_dir}")
-        print(f"   Copying to job directory...")
+    cache = DownloadCache()
+    cache_dir = cache.entry_dir(video_id)
 
-        # Copy from cache to job input directory
-        input_dir = job_dir / "input"
-        input_dir.mkdir(parents=True, exist_ok=True)
+    input_dir = job_dir / "input"
+    source_name = cache.source_name(video_id, media) or 'source.mp4'
 
-        dest_video = input_dir / "source.mp4"
-        shutil.copy2(cached_video, dest_video)
+    if cache.lookup(video_id, required=(source_name,)):
+        print(f"✅ Found in cache: {cache_dir} ({source_name})")
 
-        if cached_metadata.exists():
-            dest_metadata = input_dir / "metadata.json"
-            shutil.copy2(cached_metadata, dest_metadata)
+        # Link from cache into job input directory
+        dest_source = input_dir / source_name
+        methods = cache.link_into(video_id, {source_name: dest_source, 'metadata.json': input_dir / "metadata.json"})
+        print(f"   Linked into job directory ({methods[source_name]})")
 
-        file_size = dest_video.stat().st_size
+        file_size = dest_source.stat().st_size
 
         return {
             'source': 'youtube_cached',
             'video_id': video_id,
-            'file_path': str(dest_video),
+            'media': media,
+            'file_path': str(dest_source),
             'file_size_bytes': file_size,
             'file_size_mb': round(file_size / (1024 * 1024), 2),
             'cached': True,
+            'link_method': methods[source_name],
             'downloaded_at': datetime.now().isoformat()
         }
 
@@ -79,38 +87,31 @@ def download_source_cached(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str,
 
     from scripts.download_source import download_video
 
-    # Download to cache
-    result = download_video(youtube_url, downloads_dir="/var/markethawk/_downloads")
-
-    # Copy from cache to job input directory
-    input_dir = job_dir / "input"
-    input_dir.mkdir(parents=True, exist_ok=True)
-
-    source_video = Path(result['file_path'])
-    dest_video = input_dir / "source.mp4"
-    shutil.copy2(source_video, dest_video)
+    # Download to cache, then link into job input directory
+    result = download_video(youtube_url, downloads_dir=str(cache.root), media=media)
+    cache.register(video_id)
 
-    if result.get('metadata_path'):
-        source_metadata = Path(result['metadata_path'])
-        if source_metadata.exists():
-            dest_metadata = input_dir / "metadata.json"
-            shutil.copy2(source_metadata, dest_metadata)
+    source_name = Path(result['file_path']).name
+    dest_source = input_dir / source_name
+    methods = cache.link_into(video_id, {source_name: dest_source, 'metadata.json': input_dir / "metadata.json"})
 
-    file_size = dest_video.stat().st_size
+    file_size = dest_source.stat().st_size
 
     print(f"✅ Downloaded and cached: {cache_dir}")
-    print(f"   Copied to: {dest_video}")
+    print(f"   Linked to: {dest_source} ({methods[source_name]})")
     print(f"   Size: {file_size / (1024 * 1024):.1f} MB")
 
     return {
         'source': 'youtube',
         'video_id': video_id,
-        'file_path': str(dest_video),
+        'media': result.get('media', media),
+        'file_path': str(dest_source),
         'file_size_bytes': file_size,
         'file_size_mb': round(file_size / (1024 * 1024), 2),
         'title': result.get('title', ''),
         'description': result.get('description', ''),
         'duration_seconds': result.get('duration', 0),
         'cached': False,
+        'link_method': methods[source_name],
         'downloaded_at': datetime.now().isoformat()
     }
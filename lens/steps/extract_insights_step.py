@@ -11,6 +11,7 @@ LENS_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(LENS_DIR))
 
 from extract_insights_structured import extract_earnings_insights, extract_earnings_insights_auto
+from lib.artifact_io import artifact_exists
 
 
 def extract_insights_step(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -44,7 +45,7 @@ def extract_insights_step(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str,
 
     # Find transcript file
     transcript_file = job_dir / "transcripts" / "transcript.json"
-    if not transcript_file.exists():
+    if not artifact_exists(transcript_file):
         raise FileNotFoundError(f"Transcript not found: {transcript_file}")
 
     # Output file for insights
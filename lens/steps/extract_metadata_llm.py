@@ -5,12 +5,33 @@ Analyzes transcript to extract ticker, company name, quarter, and year
 """
 
 import os
-import json
 from pathlib import Path
 from typing import Dict, Any, Optional
 from openai import OpenAI
 from pydantic import BaseModel
 
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.artifact_io import artifact_exists, load_json_artifact
+from lib.tracing import llm_usage, span
+
+
+SYSTEM_PROMPT = """You are an expert at analyzing earnings call transcripts.
+Extract the following metadata from the transcript:
+
+1. ticker: Stock symbol (e.g., "NVDA", "AAPL", "GOOGL")
+2. company: Full legal company name (e.g., "NVIDIA Corporation", "Apple Inc.")
+3. quarter: Fiscal quarter (e.g., "Q1", "Q2", "Q3", "Q4")
+4. year: Fiscal year (e.g., 2024, 2025)
+
+Look for clues in:
+- Opening remarks (e.g., "Welcome to Apple's Q3 2024 earnings call")
+- Speaker introductions (e.g., "I'm Tim Cook, CEO of Apple")
+- Financial statements (e.g., "For the third quarter of fiscal 2024...")
+
+If you cannot find a value with confidence, leave it null.
+Set confidence to 'high' if you found explicit mentions, 'medium' if inferred, 'low' if guessing."""
+
 
 class EarningsMetadata(BaseModel):
     """Structured output for earnings call metadata"""
@@ -34,14 +55,13 @@ def extract_metadata_llm(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, A
     """
     # Load transcript
     transcript_path = job_dir / "transcripts" / "transcript.json"
-    if not transcript_path.exists():
+    if not artifact_exists(transcript_path):
         raise FileNotFoundError(
             f"Transcript not found: {transcript_path}\n"
             "Run 'transcribe' step first"
         )
 
-    with open(transcript_path, 'r') as f:
-        transcript_data = json.load(f)
+    transcript_data = load_json_artifact(transcript_path)
 
     # Extract text from transcript (first 10 minutes for metadata extraction)
     # Usually ticker/company/quarter announced in first few minutes
@@ -63,34 +83,23 @@ def extract_metadata_llm(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, A
     # Call OpenAI with structured output
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-    completion = client.beta.chat.completions.parse(
-        model="gpt-4o-2024-08-06",
-        messages=[
-            {
-                "role": "system",
-                "content": """You are an expert at analyzing earnings call transcripts.
-Extract the following metadata from the transcript:
-
-1. ticker: Stock symbol (e.g., "NVDA", "AAPL", "GOOGL")
-2. company: Full legal company name (e.g., "NVIDIA Corporation", "Apple Inc.")
-3. quarter: Fiscal quarter (e.g., "Q1", "Q2", "Q3", "Q4")
-4. year: Fiscal year (e.g., 2024, 2025)
-
-Look for clues in:
-- Opening remarks (e.g., "Welcome to Apple's Q3 2024 earnings call")
-- Speaker introductions (e.g., "I'm Tim Cook, CEO of Apple")
-- Financial statements (e.g., "For the third quarter of fiscal 2024...")
-
-If you cannot find a value with confidence, leave it null.
-Set confidence to 'high' if you found explicit mentions, 'medium' if inferred, 'low' if guessing."""
-            },
-            {
-                "role": "user",
-                "content": f"Extract metadata from this earnings call transcript:\n\n{transcript_text}"
-            }
-        ],
-        response_format=EarningsMetadata,
-    )
+    with span('llm', cat='llm', model="gpt-4o-2024-08-06", purpose='metadata',
+              transcript_chars=len(transcript_text)) as traced:
+        completion = client.beta.chat.completions.parse(
+            model="gpt-4o-2024-08-06",
+            messages=[
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": f"Extract metadata from this earnings call transcript:\n\n{transcript_text}"
+                }
+            ],
+            response_format=EarningsMetadata,
+        )
+        traced.set(**llm_usage(completion))
 
     metadata = completion.choices[0].message.parsed
 
@@ -2,10 +2,15 @@
 FFmpeg Audio Intact with Banner - Extract audio from source video and overlay banner image
 """
 
-import subprocess
+import sys
 from pathlib import Path
 from typing import Dict, Any
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.audio_policy import AUDIO_CACHE_DIR
+from lib.media_probe import ProbeError, probe
+from lib.static_render import render_static
+
 
 def ffmpeg_audio_intact_with_banner(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -19,14 +24,15 @@ def ffmpeg_audio_intact_with_banner(job_dir: Path, job_data: Dict[str, Any]) ->
         Result dict with render info
     """
 
-    # Find input video file (source video with original audio)
+    # Find input file with the original audio (source video, or an audio-only download)
     input_video = job_dir / "input" / "source.mp4"
     if not input_video.exists():
-        # Try other video extensions
+        # Try other video/audio extensions
         video_files = list((job_dir / "input").glob("source.*"))
-        video_files = [f for f in video_files if f.suffix.lower() in ['.mp4', '.mov', '.avi', '.mkv', '.webm']]
+        video_files = [f for f in video_files if f.suffix.lower() in
+                       ['.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4a', '.weba', '.opus', '.mp3']]
         if not video_files:
-            raise FileNotFoundError(f"No video file found in {job_dir / 'input'}")
+            raise FileNotFoundError(f"No video or audio source found in {job_dir / 'input'}")
         input_video = video_files[0]
 
     # Find banner image (created by create_banner step)
@@ -49,45 +55,24 @@ def ffmpeg_audio_intact_with_banner(job_dir: Path, job_data: Dict[str, Any]) ->
     print(f"   Output: {output_video.name}")
     print(f"   Strategy: Extract audio from input video + overlay banner image")
 
-    # FFmpeg command: use banner as video track + extract audio from input video
-    cmd = [
-        'ffmpeg',
-        '-loop', '1',                    # Loop the banner image
-        '-i', str(banner_path),          # Input: banner image (video track)
-        '-i', str(input_video),          # Input: source video (for audio track)
-        '-c:v', 'libx264',               # Video codec
-        '-tune', 'stillimage',           # Optimize for static image
-        '-c:a', 'aac',                   # Audio codec
-        '-b:a', '192k',                  # Audio bitrate
-        '-pix_fmt', 'yuv420p',           # Pixel format for compatibility
-        '-map', '0:v:0',                 # Map video from first input (banner)
-        '-map', '1:a:0',                 # Map audio from second input (source video)
-        '-shortest',                     # End when shortest stream ends
-        '-movflags', '+faststart',       # Enable progressive streaming (moov atom at start)
-        '-y',                            # Overwrite output file
-        str(output_video)
-    ]
-
-    # Run FFmpeg
-    result = subprocess.run(cmd, capture_output=True, text=True)
-
-    if result.returncode != 0:
-        raise Exception(f"FFmpeg render failed: {result.stderr}")
+    # Fast mode: banner encoded at 1 fps with a long GOP, AAC audio stream-copied
+    # (other codecs encoded once and cached); FFMPEG_RENDER_MODE=legacy for the old path
+    render_stats = render_static(
+        banner_path,
+        input_video,
+        output_video,
+        cache_dir=job_dir / AUDIO_CACHE_DIR,
+    )
 
     # Get output file info
     file_size = output_video.stat().st_size
     file_size_mb = file_size / (1024 * 1024)
 
-    # Get duration using ffprobe
-    duration_cmd = [
-        'ffprobe',
-        '-v', 'error',
-        '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1',
-        str(output_video)
-    ]
-    duration_result = subprocess.run(duration_cmd, capture_output=True, text=True)
-    duration_seconds = float(duration_result.stdout.strip()) if duration_result.returncode == 0 else 0
+    # Get duration (memoized probe, shared with later steps)
+    try:
+        duration_seconds = probe(output_video, job_dir).duration or 0
+    except ProbeError:
+        duration_seconds = 0
 
     print(f"✅ Video rendered: {output_video.name}")
     print(f"   Duration: {duration_seconds:.1f}s")
@@ -101,5 +86,6 @@ def ffmpeg_audio_intact_with_banner(job_dir: Path, job_data: Dict[str, Any]) ->
         'file_size_bytes': file_size,
         'codec': 'h264',
         'resolution': '1920x1080',
-        'renderer': 'ffmpeg'
+        'renderer': 'ffmpeg',
+        **render_stats
     }
@@ -2,10 +2,15 @@
 FFmpeg Audio with Banner - Render video from audio file + banner image (audio-only workflow)
 """
 
-import subprocess
+import sys
 from pathlib import Path
 from typing import Dict, Any
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.audio_policy import AUDIO_CACHE_DIR
+from lib.media_probe import ProbeError, probe
+from lib.static_render import render_static
+
 
 def ffmpeg_audio_with_banner(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -57,45 +62,25 @@ def ffmpeg_audio_with_banner(job_dir: Path, job_data: Dict[str, Any]) -> Dict[st
     print(f"   Output: {output_video.name}")
     print(f"   Strategy: Combine audio file with static banner image")
 
-    # FFmpeg command: banner image as video + audio file
-    # Use scale and crop filters to fit banner to 1920x1080 (16:9)
-    cmd = [
-        'ffmpeg',
-        '-loop', '1',                    # Loop the banner image
-        '-i', str(banner_path),          # Input: banner image (video track)
-        '-i', str(input_audio),          # Input: audio file
-        '-vf', 'scale=1920:1920,crop=1920:1080',  # Scale to 1920 width, crop to 16:9
-        '-c:v', 'libx264',               # Video codec
-        '-tune', 'stillimage',           # Optimize for static image
-        '-c:a', 'aac',                   # Audio codec
-        '-b:a', '192k',                  # Audio bitrate
-        '-pix_fmt', 'yuv420p',           # Pixel format for compatibility
-        '-shortest',                     # End when audio ends
-        '-movflags', '+faststart',       # Enable progressive streaming (moov atom at start)
-        '-y',                            # Overwrite output file
-        str(output_video)
-    ]
-
-    # Run FFmpeg
-    result = subprocess.run(cmd, capture_output=True, text=True)
-
-    if result.returncode != 0:
-        raise Exception(f"FFmpeg render failed: {result.stderr}")
+    # Fast mode: banner encoded at 1 fps with a long GOP, AAC audio stream-copied
+    # (other codecs encoded once and cached); FFMPEG_RENDER_MODE=legacy for the old path
+    render_stats = render_static(
+        banner_path,
+        input_audio,
+        output_video,
+        video_filter='scale=1920:1920,crop=1920:1080',  # Scale to 1920 width, crop to 16:9
+        cache_dir=job_dir / AUDIO_CACHE_DIR,
+    )
 
     # Get output file info
     file_size = output_video.stat().st_size
     file_size_mb = file_size / (1024 * 1024)
 
-    # Get duration using ffprobe
-    duration_cmd = [
-        'ffprobe',
-        '-v', 'error',
-        '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1',
-        str(output_video)
-    ]
-    duration_result = subprocess.run(duration_cmd, capture_output=True, text=True)
-    duration_seconds = float(duration_result.stdout.strip()) if duration_result.returncode == 0 else 0
+    # Get duration (memoized probe, shared with later steps)
+    try:
+        duration_seconds = probe(output_video, job_dir).duration or 0
+    except ProbeError:
+        duration_seconds = 0
 
     print(f"✅ Video rendered: {output_video.name}")
     print(f"   Duration: {duration_seconds:.1f}s")
@@ -110,5 +95,6 @@ def ffmpeg_audio_with_banner(job_dir: Path, job_data: Dict[str, Any]) -> Dict[st
         'codec': 'h264',
         'resolution': '1920x1080',
         'renderer': 'ffmpeg',
-        'mode': 'audio-only'
+        'mode': 'audio-only',
+        **render_stats
     }
@@ -20,6 +20,9 @@ import sys
 from pathlib import Path
 from typing import List, Dict, Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.artifact_io import artifact_exists, load_json_artifact
+
 
 def get_speaker_at_timestamp(transcript: Dict, insights: Dict, timestamp: int) -> Optional[str]:
     """
@@ -127,8 +130,8 @@ def filter_highlights_for_shorts(highlights: List[Dict],
 
         # Filter by duration
         if min_duration <= estimated_duration <= max_duration:
-            h['estimated_duration'] = estimated_duration
-            filtered.append(h)
+            # Copy - insights are shared with later steps through the artifact cache
+            filtered.append({**h, 'estimated_duration': estimated_duration})
 
     # Sort by category priority
     category_priority = {
@@ -191,19 +194,17 @@ def generate_shorts(job_yaml_path: str) -> Dict:
     transcript_file = job_dir / 'transcripts' / 'transcript.json'
     insights_file = job_dir / 'insights.raw.json'
 
-    if not transcript_file.exists():
+    if not artifact_exists(transcript_file):
         return {'status': 'error', 'message': 'transcript.json not found'}
 
-    if not insights_file.exists():
+    if not artifact_exists(insights_file):
         return {'status': 'error', 'message': 'insights.raw.json not found'}
 
     # Load data
-    with open(transcript_file) as f:
-        transcript = json.load(f)
+    transcript = load_json_artifact(transcript_file)
 
-    with open(insights_file) as f:
-        insights_data = json.load(f)
-        insights = insights_data.get('insights', {})
+    insights_data = load_json_artifact(insights_file)
+    insights = insights_data.get('insights', {})
 
     # Get company info
     company_name = insights.get('company_name', 'Unknown')
@@ -7,6 +7,10 @@ Shows extracted metadata to user and allows confirmation or editing
 from pathlib import Path
 from typing import Dict, Any
 
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.artifact_io import artifact_exists, load_json_artifact
+
 
 def interactive_confirm_metadata(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -28,14 +32,12 @@ def interactive_confirm_metadata(job_dir: Path, job_data: Dict[str, Any]) -> Dic
         )
 
     insights_file = insights_result.get('insights_file')
-    if not insights_file or not Path(insights_file).exists():
+    if not insights_file or not artifact_exists(Path(insights_file)):
         raise ValueError(f"Insights file not found: {insights_file}")
 
     # Load insights JSON to extract metadata
-    import json
-    with open(insights_file, 'r') as f:
-        insights_data = json.load(f)
-        insights_obj = insights_data.get('insights', {})
+    insights_data = load_json_artifact(insights_file)
+    insights_obj = insights_data.get('insights', {})
 
     ticker = insights_obj.get('company_ticker')
     company = insights_obj.get('company_name')
@@ -10,36 +10,35 @@ from typing import Dict, Any
 LENS_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(LENS_DIR))
 
-from refine_timestamps import refine_job_timestamps
+from refine_timestamps import refine_insights
+from lib.artifact_io import artifact_exists, load_json_artifact
 
 
 def refine_timestamps_step(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Refine timestamps to word-level precision (step handler wrapper)
 
+    The orchestrator owns job.yaml and saves it after the handler returns, so
+    the refined metrics and highlights come back in the result (stored on the
+    refine_timestamps step) instead of being written separately.
+
     Args:
         job_dir: Job directory path
         job_data: Job data dict
 
     Returns:
-        Result dict with refinement statistics
+        Result dict with refined financial_metrics/highlights and refinement statistics
     """
-    # Find job.yaml path
-    job_yaml_path = job_dir / "job.yaml"
-    if not job_yaml_path.exists():
-        raise FileNotFoundError(f"job.yaml not found: {job_yaml_path}")
-
     # Find transcript.json path (convention-based)
     transcript_path = job_dir / "transcripts" / "transcript.json"
-    if not transcript_path.exists():
+    if not artifact_exists(transcript_path):
         raise FileNotFoundError(f"Transcript not found: {transcript_path}")
 
-    # Call refine_timestamps
-    result = refine_job_timestamps(
-        job_yaml_path=job_yaml_path,
-        transcript_path=transcript_path,
-        window_seconds=30
-    )
+    insights = job_data.get('processing', {}).get('insights', {})
+    refined = refine_insights(insights, load_json_artifact(transcript_path), window_seconds=30)
 
-    # Return result
-    return result
+    return {
+        **refined['stats'],
+        'financial_metrics': refined['financial_metrics'],
+        'highlights': refined['highlights'],
+    }
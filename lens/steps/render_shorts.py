@@ -0,0 +1,73 @@
+"""
+Render Shorts - Render vertical YouTube Shorts for the job's highlights
+
+Renderer is chosen per workflow (`shorts.renderer` in the workflow YAML, a
+job's own `shorts.renderer` wins):
+    ffmpeg    (default) lib/shorts_render - no Node/Chromium, all shorts in parallel
+    remotion  npx remotion render EarningsShort (original path)
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from lib.shorts_render import find_props, render_shorts as render_all_shorts
+from steps.generate_shorts import generate_shorts
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def render_shorts(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render every short of the job (props are generated first if missing)
+
+    Args:
+        job_dir: Job directory path
+        job_data: Job data dict
+
+    Returns:
+        Result dict with rendered files and timings
+    """
+    config = job_data.get('shorts', {})
+    renderer = config.get('renderer', 'ffmpeg')
+    shorts_dir = job_dir / "shorts"
+
+    # Props (short_N.json) from insights highlights + word timings
+    if not shorts_dir.exists() or not find_props(shorts_dir):
+        generated = generate_shorts(str(job_dir / "job.yaml"))
+        if generated['status'] == 'error':
+            raise ValueError(f"Cannot generate shorts: {generated['message']}")
+
+    # Transcript timestamps refer to the transcribed source
+    sources = sorted((job_dir / "input").glob("source.*"))
+    if renderer == 'ffmpeg' and not sources:
+        raise FileNotFoundError(f"No source media found in {job_dir / 'input'}")
+
+    print(f"🎬 Rendering shorts ({renderer})")
+    results = render_all_shorts(
+        shorts_dir,
+        sources[0] if sources else None,
+        renderer=renderer,
+        max_parallel=config.get('max_parallel'),
+        studio_dir=PROJECT_ROOT / "studio"
+    )
+
+    rendered = [r for r in results if r['success']]
+    for r in results:
+        if r['success']:
+            print(f"   ✓ short_{r['index']}.mp4 ({r.get('duration', 0):.1f}s, rendered in {r['render_seconds']:.1f}s)")
+        else:
+            print(f"   ✗ short_{r['index']}: {r['error'][:200]}")
+
+    if not rendered:
+        raise RuntimeError(f"No shorts rendered ({len(results)} attempted)")
+
+    return {
+        'renderer': renderer,
+        'shorts_dir': str(shorts_dir),
+        'total_shorts': len(results),
+        'rendered': len(rendered),
+        'files': [r['file'] for r in rendered],
+        'results': results
+    }
@@ -10,6 +10,7 @@ from typing import Dict, Any
 LENS_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(LENS_DIR))
 
+from lib.media_probe import ProbeError, probe
 from transcribe_whisperx import transcribe_earnings_call
 
 
@@ -39,6 +40,14 @@ def transcribe_step(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     output_dir = job_dir / "transcripts"
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # Media info (memoized - later steps reuse the same probe)
+    try:
+        media = probe(audio_file, job_dir)
+    except ProbeError as e:
+        raise RuntimeError(f"Cannot read source media: {e}")
+    if not media.has_audio:
+        raise ValueError(f"Source has no audio stream: {audio_file}")
+
     print(f"🎤 Transcribing: {audio_file.name}")
 
     # Call WhisperX transcription
@@ -53,6 +62,9 @@ def transcribe_step(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     return {
         'transcript_file': str(output_dir / "transcript.json"),
         'audio_file': str(audio_file),
+        'duration_seconds': media.duration,
+        'audio_codec': media.codec('audio'),
+        'has_video': media.has_video,
         'model': 'medium',
         'language': 'en'
     }
@@ -3,7 +3,6 @@ Update Database - Insert/update earnings_calls table
 """
 
 import os
-import subprocess
 import json
 from pathlib import Path
 from typing import Dict, Any
@@ -13,6 +12,9 @@ from datetime import datetime
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from env_loader import get_database_url
+from lib.artifact_io import artifact_exists, load_json_artifact
+from lib.upload_queue import wait_for_uploads
+from lib.tracing import traced_run
 
 
 def update_database(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -49,6 +51,11 @@ def update_database(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     upload_artifacts_result = job_data.get('processing', {}).get('upload_artifacts', {})
     artifacts = upload_artifacts_result.get('artifacts', {})
 
+    # Background uploads: only write URLs once the objects they point at exist
+    wait_for_uploads(
+        upload_r2_result.get('upload_ids', []) + upload_artifacts_result.get('upload_ids', [])
+    )
+
     # Generate record ID: {TICKER}-{QUARTER}-{YEAR}-{JOB_ID_SUFFIX}
     # Use last 4 chars of job_id for uniqueness
     job_suffix = job_id.split('_')[-1] if '_' in job_id else job_id[-4:]
@@ -82,11 +89,9 @@ def update_database(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     # Load insights from insights.raw.json
     insights = {}
     insights_file = job_data.get('processing', {}).get('extract_insights', {}).get('insights_file')
-    if insights_file and Path(insights_file).exists():
-        import json
-        with open(insights_file, 'r') as f:
-            insights_data = json.load(f)
-            insights = insights_data.get('insights', {})
+    if insights_file and artifact_exists(Path(insights_file)):
+        insights_data = load_json_artifact(insights_file)
+        insights = insights_data.get('insights', {})
 
     # Build transcripts object (URLs to transcript files in R2)
     transcripts = {}
@@ -153,7 +158,7 @@ SET
     ]
 
     print(f"🔄 Executing database update...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = traced_run(cmd, capture_output=True, text=True)
 
     if result.returncode != 0:
         print(f"❌ Database update failed: {result.stderr}")
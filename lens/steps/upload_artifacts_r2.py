@@ -1,10 +1,12 @@
 """
 Upload Artifacts to R2 - Upload transcript and insights JSON to R2 storage
+
+Artifacts are uploaded as compact, compressed JSON (gzip by default) with
+Content-Encoding set, under their usual .json keys.
 """
 
 import os
 import json
-import subprocess
 from pathlib import Path
 from typing import Dict, Any
 from datetime import datetime
@@ -13,6 +15,12 @@ from datetime import datetime
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from env_loader import get_r2_bucket_name
+from lib.artifact_io import (
+    artifact_exists, compress_json_artifact, drop_uncompressed,
+    keep_uncompressed, load_json_artifact
+)
+from lib.step_payloads import load_job_file
+from lib.upload_queue import submit_uploads
 
 
 def upload_artifacts_r2(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -57,181 +65,180 @@ def upload_artifacts_r2(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, An
     # R2 base path: <company-slug>/<year>/<quarter>/<job-id>/
     r2_base_path = f"{slug}/{year}/{quarter}/{job_id}"
 
-    artifacts = {}
+    # Collect artifacts, then upload them concurrently over one pooled client
+    uploads = {}
 
-    # Upload transcript.json
     transcript_file = job_dir / 'transcripts' / 'transcript.json'
-    if transcript_file.exists():
-        r2_transcript_path = f"{r2_base_path}/transcripts/transcript.json"
-        print(f"📤 Uploading transcript to R2: {r2_transcript_path}")
-
-        cmd = [
-            'rclone',
-            'copyto',
-            str(transcript_file),
-            f"r2-markethawkeye:{R2_BUCKET}/{r2_transcript_path}",
-            '--s3-no-check-bucket'
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            # Use r2:// URL format (signed URL generated on-demand)
-            transcript_r2_url = f"r2://{R2_BUCKET}/{r2_transcript_path}"
-
-            # Get file metadata
-            file_size = transcript_file.stat().st_size
-            with open(transcript_file, 'r') as f:
-                transcript_data = json.load(f)
-                segment_count = len(transcript_data.get('segments', []))
-                speakers = len(set(seg.get('speaker', 'unknown') for seg in transcript_data.get('segments', [])))
-
-            artifacts['transcript'] = {
-                'r2_url': transcript_r2_url,
-                'r2_path': r2_transcript_path,
-                'file_size_bytes': file_size,
-                'segment_count': segment_count,
-                'speakers': speakers,
-                'format': 'whisperx_json',
-                'uploaded_at': datetime.now().isoformat()
-            }
-            print(f"✅ Transcript uploaded: {transcript_r2_url}")
-        else:
-            print(f"❌ Failed to upload transcript: {result.stderr}")
-            raise Exception(f"Transcript upload failed: {result.stderr}")
+    if artifact_exists(transcript_file):
+        uploads['transcript'] = (transcript_file, f"{r2_base_path}/transcripts/transcript.json")
     else:
         print(f"⚠️  Transcript not found: {transcript_file}")
 
     # Upload insights.json (check both insights.raw.json and insights.json)
     insights_file = job_dir / 'insights.raw.json'
-    if not insights_file.exists():
+    if not artifact_exists(insights_file):
         insights_file = job_dir / 'insights.json'
 
-    if insights_file.exists():
-        r2_insights_path = f"{r2_base_path}/insights.json"
-        print(f"📤 Uploading insights to R2: {r2_insights_path}")
-
-        cmd = [
-            'rclone',
-            'copyto',
-            str(insights_file),
-            f"r2-markethawkeye:{R2_BUCKET}/{r2_insights_path}",
-            '--s3-no-check-bucket'
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            insights_r2_url = f"r2://{R2_BUCKET}/{r2_insights_path}"
-
-            # Get file metadata
-            file_size = insights_file.stat().st_size
-            with open(insights_file, 'r') as f:
-                insights_data = json.load(f)
-                # Extract from nested 'insights' object if present
-                insights_obj = insights_data.get('insights', insights_data)
-                metrics_count = len(insights_obj.get('financial_metrics', []))
-                highlights_count = len(insights_obj.get('highlights', []))
-
-            artifacts['insights'] = {
-                'r2_url': insights_r2_url,
-                'r2_path': r2_insights_path,
-                'file_size_bytes': file_size,
-                'metrics_count': metrics_count,
-                'highlights_count': highlights_count,
-                'format': 'openai_structured_output',
-                'uploaded_at': datetime.now().isoformat()
-            }
-            print(f"✅ Insights uploaded: {insights_r2_url}")
-        else:
-            print(f"❌ Failed to upload insights: {result.stderr}")
-            raise Exception(f"Insights upload failed: {result.stderr}")
+    if artifact_exists(insights_file):
+        uploads['insights'] = (insights_file, f"{r2_base_path}/insights.json")
     else:
         print(f"⚠️  Insights not found: {insights_file}")
 
     # Upload job.json (with speakers list)
     job_yaml_file = job_dir / 'job.yaml'
+    job_json_file = job_dir / 'job.json'
     if job_yaml_file.exists():
         # Convert job.yaml to job.json
-        import yaml
-        job_json_file = job_dir / 'job.json'
-
-        # Load YAML and save as JSON
-        with open(job_yaml_file, 'r') as f:
-            job_yaml_data = yaml.safe_load(f)
+        # Load YAML (step payloads from their sidecars) and save as JSON
+        job_yaml_data = load_job_file(job_yaml_file, resolve=True)
 
         # Write to temp JSON file
         with open(job_json_file, 'w') as f:
             json.dump(job_yaml_data, f, indent=2)
 
-        r2_job_path = f"{r2_base_path}/job.json"
-        print(f"📤 Uploading job.json to R2: {r2_job_path}")
-
-        cmd = [
-            'rclone',
-            'copyto',
-            str(job_json_file),
-            f"r2-markethawkeye:{R2_BUCKET}/{r2_job_path}",
-            '--s3-no-check-bucket'
-        ]
+        uploads['job'] = (job_json_file, f"{r2_base_path}/job.json")
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    # Upload transcript.paragraphs.json (if exists)
+    paragraphs_file = job_dir / 'transcripts' / 'transcript.paragraphs.json'
+    if artifact_exists(paragraphs_file):
+        uploads['paragraphs'] = (paragraphs_file, f"{r2_base_path}/transcripts/transcript.paragraphs.json")
+
+    # Compact + compress each artifact (R2 key keeps .json, Content-Encoding tells clients to decode)
+    compressed = {}
+    for name, (local_file, r2_path) in uploads.items():
+        compressed[name] = compress_json_artifact(local_file)
+        artifact = compressed[name]
+        print(f"📤 Uploading {name} to R2: {r2_path}")
+        if artifact.encoding:
+            print(f"   🗜️  {artifact.raw_bytes / 1024:.0f} KB → {artifact.compressed_bytes / 1024:.0f} KB "
+                  f"({artifact.ratio:.1f}x {artifact.encoding})")
+
+    names = list(uploads.keys())
+    results = submit_uploads([
+        {'local_path': compressed[name].path, 'key': r2_path, 'artifact': name,
+         'extra_args': compressed[name].upload_args}
+        for name, (local_file, r2_path) in uploads.items()
+    ], R2_BUCKET, job_id=job_id)
+    results = dict(zip(names, results))
 
-        if result.returncode == 0:
-            job_r2_url = f"r2://{R2_BUCKET}/{r2_job_path}"
+    artifacts = {}
 
+    # Transcript metadata
+    upload = results.get('transcript')
+    if upload:
+        if not upload.ok:
+            print(f"❌ Failed to upload transcript: {upload.error}")
+            raise Exception(f"Transcript upload failed: {upload.error}")
+
+        transcript_data = load_json_artifact(transcript_file)
+        segment_count = len(transcript_data.get('segments', []))
+        speakers = len(set(seg.get('speaker', 'unknown') for seg in transcript_data.get('segments', [])))
+
+        artifacts['transcript'] = {
+            'r2_url': upload.r2_url,
+            'r2_path': upload.key,
+            'file_size_bytes': upload.size_bytes,
+            'segment_count': segment_count,
+            'speakers': speakers,
+            'format': 'whisperx_json',
+            'upload_status': upload.status,
+            'uploaded_at': datetime.now().isoformat()
+        }
+        print(f"✅ Transcript uploaded: {upload.r2_url}")
+
+    # Insights metadata
+    upload = results.get('insights')
+    if upload:
+        if not upload.ok:
+            print(f"❌ Failed to upload insights: {upload.error}")
+            raise Exception(f"Insights upload failed: {upload.error}")
+
+        insights_data = load_json_artifact(insights_file)
+        # Extract from nested 'insights' object if present
+        insights_obj = insights_data.get('insights', insights_data)
+        metrics_count = len(insights_obj.get('financial_metrics', []))
+        highlights_count = len(insights_obj.get('highlights', []))
+
+        artifacts['insights'] = {
+            'r2_url': upload.r2_url,
+            'r2_path': upload.key,
+            'file_size_bytes': upload.size_bytes,
+            'metrics_count': metrics_count,
+            'highlights_count': highlights_count,
+            'format': 'openai_structured_output',
+            'upload_status': upload.status,
+            'uploaded_at': datetime.now().isoformat()
+        }
+        print(f"✅ Insights uploaded: {upload.r2_url}")
+
+    # Job metadata (optional - don't raise on failure)
+    upload = results.get('job')
+    if upload:
+        if upload.ok:
             # Extract speakers from insights
             speakers = []
-            if insights_file.exists():
-                with open(insights_file, 'r') as f:
-                    insights_data = json.load(f)
-                    insights_obj = insights_data.get('insights', insights_data)
-                    speakers = insights_obj.get('speakers', [])
+            if artifact_exists(insights_file):
+                insights_data = load_json_artifact(insights_file)
+                insights_obj = insights_data.get('insights', insights_data)
+                speakers = insights_obj.get('speakers', [])
 
             artifacts['job'] = {
-                'r2_url': job_r2_url,
-                'r2_path': r2_job_path,
-                'file_size_bytes': job_json_file.stat().st_size,
+                'r2_url': upload.r2_url,
+                'r2_path': upload.key,
+                'file_size_bytes': upload.size_bytes,
                 'speakers_count': len(speakers),
                 'format': 'job_metadata_json',
+                'upload_status': upload.status,
                 'uploaded_at': datetime.now().isoformat()
             }
-            print(f"✅ Job metadata uploaded: {job_r2_url}")
+            print(f"✅ Job metadata uploaded: {upload.r2_url}")
         else:
-            print(f"❌ Failed to upload job.json: {result.stderr}")
-            # Don't raise exception, this is optional
-
-    # Upload transcript.paragraphs.json (if exists)
-    paragraphs_file = job_dir / 'transcripts' / 'transcript.paragraphs.json'
-    if paragraphs_file.exists():
-        r2_paragraphs_path = f"{r2_base_path}/transcripts/transcript.paragraphs.json"
-        print(f"📤 Uploading paragraphs to R2: {r2_paragraphs_path}")
-
-        cmd = [
-            'rclone',
-            'copyto',
-            str(paragraphs_file),
-            f"r2-markethawkeye:{R2_BUCKET}/{r2_paragraphs_path}",
-            '--s3-no-check-bucket'
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            paragraphs_r2_url = f"r2://{R2_BUCKET}/{r2_paragraphs_path}"
+            print(f"❌ Failed to upload job.json: {upload.error}")
 
+    # Paragraphs (optional)
+    upload = results.get('paragraphs')
+    if upload:
+        if upload.ok:
             artifacts['paragraphs'] = {
-                'r2_url': paragraphs_r2_url,
-                'r2_path': r2_paragraphs_path,
-                'file_size_bytes': paragraphs_file.stat().st_size,
+                'r2_url': upload.r2_url,
+                'r2_path': upload.key,
+                'file_size_bytes': upload.size_bytes,
                 'format': 'whisperx_paragraphs',
+                'upload_status': upload.status,
                 'uploaded_at': datetime.now().isoformat()
             }
-            print(f"✅ Paragraphs uploaded: {paragraphs_r2_url}")
+            print(f"✅ Paragraphs uploaded: {upload.r2_url}")
         else:
-            print(f"⚠️  Failed to upload paragraphs: {result.stderr}")
+            print(f"⚠️  Failed to upload paragraphs: {upload.error}")
 
     if not artifacts:
         raise Exception("No artifacts uploaded")
 
-    return {'artifacts': artifacts}
+    # Compression report (file_size_bytes above is the uploaded, compressed size)
+    for name, entry in artifacts.items():
+        artifact = compressed[name]
+        entry['content_encoding'] = artifact.encoding
+        entry['raw_size_bytes'] = artifact.raw_bytes
+        entry['compression_ratio'] = round(artifact.ratio, 2)
+
+    raw_total = sum(a.raw_bytes for a in compressed.values())
+    sent_total = sum(a.compressed_bytes for a in compressed.values())
+    if sent_total:
+        print(f"🗜️  Artifacts: {raw_total / 1024:.0f} KB → {sent_total / 1024:.0f} KB ({raw_total / sent_total:.1f}x)")
+
+    # Optionally keep only the compressed form locally (consumers read via lib.artifact_io)
+    if not keep_uncompressed():
+        for name, artifact in compressed.items():
+            if results[name].ok:
+                drop_uncompressed(artifact)
+
+    skipped = sum(1 for r in results.values() if r.status == 'skipped')
+    if skipped:
+        print(f"⏭️  {skipped} artifact(s) already up to date in R2")
+
+    # Background mode: update_database waits on these before writing URLs
+    upload_ids = [r.upload_id for r in results.values() if r.upload_id]
+    if upload_ids:
+        print(f"📥 {len(upload_ids)} artifact(s) queued for background upload")
+
+    return {'artifacts': artifacts, 'upload_ids': upload_ids}
@@ -3,7 +3,6 @@ Upload Media to R2 - Upload audio/video file to R2 storage
 """
 
 import os
-import subprocess
 from pathlib import Path
 from typing import Dict, Any
 from datetime import datetime
@@ -12,6 +11,7 @@ from datetime import datetime
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from env_loader import get_r2_bucket_name
+from lib.upload_queue import submit_upload
 
 
 def upload_media_r2(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,20 +98,19 @@ def upload_media_r2(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     print(f"   Source: {media_file}")
     print(f"   Size: {media_file.stat().st_size / (1024*1024):.1f} MB")
 
-    # Upload with rclone
-    cmd = [
-        'rclone',
-        'copyto',
-        str(media_file),
-        f"r2-markethawkeye:{R2_BUCKET}/{r2_path}",
-        '--s3-no-check-bucket',
-        '--progress'
-    ]
+    # Upload in-process (concurrent multipart parts, skipped if already up to date),
+    # or hand off to the background uploader when one is active
+    upload = submit_upload(media_file, r2_path, R2_BUCKET, job_id=job_id, artifact='media')
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    if not upload.ok:
+        raise Exception(f"Media upload failed: {upload.error}")
 
-    if result.returncode != 0:
-        raise Exception(f"Media upload failed: {result.stderr}")
+    if upload.status == 'queued':
+        print(f"📥 Queued for background upload (id {upload.upload_id})")
+    elif upload.status == 'skipped':
+        print(f"⏭️  Already up to date in R2 (size and checksum match)")
+    else:
+        print(f"   {upload.seconds:.1f}s ({upload.mb_per_second:.1f} MB/s)")
 
     # Use r2:// URL format (signed URL generated on-demand)
     media_r2_url = f"r2://{R2_BUCKET}/{r2_path}"
@@ -119,7 +118,7 @@ def upload_media_r2(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
     # Get file metadata
     file_size = media_file.stat().st_size
 
-    print(f"✅ Media uploaded: {media_r2_url}")
+    print(f"✅ Media {'queued' if upload.status == 'queued' else 'uploaded'}: {media_r2_url}")
 
     return {
         'media_url': media_r2_url,
@@ -128,5 +127,9 @@ def upload_media_r2(job_dir: Path, job_data: Dict[str, Any]) -> Dict[str, Any]:
         'file_size_mb': round(file_size / (1024 * 1024), 2),
         'media_type': media_type,
         'filename': media_file.name,
+        'etag': upload.etag,
+        'upload_status': upload.status,
+        'upload_seconds': round(upload.seconds, 2),
+        'upload_ids': [upload.upload_id] if upload.upload_id else [],
         'uploaded_at': datetime.now().isoformat()
     }
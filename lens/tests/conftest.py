@@ -0,0 +1,8 @@
+"""
+Shared pytest setup - makes lens/ importable as the scripts see it (lib.*, steps.*)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,127 @@
+"""
+Tests for lib/r2_uploader.py against an in-memory S3 (moto)
+
+Requires: pip install moto
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('moto')
+import boto3
+from moto import mock_aws
+
+from lib import r2_uploader
+from lib.r2_uploader import MB, R2Uploader
+
+BUCKET = 'test-bucket'
+ENDPOINT = 'https://s3.amazonaws.com'
+
+
+@pytest.fixture
+def uploader(monkeypatch):
+    """Uploader on a mocked bucket; 5 MB parts (S3 minimum) so multipart stays small"""
+    for name in ('R2_ACCESS_KEY_ID', 'R2_SECRET_ACCESS_KEY', 'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+        monkeypatch.setenv(name, 'test')
+    with mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket=BUCKET)
+        yield R2Uploader(bucket=BUCKET, endpoint_url=ENDPOINT, max_workers=4,
+                         multipart_threshold=5 * MB, part_size=5 * MB)
+
+
+@pytest.fixture
+def digests(monkeypatch):
+    """Count how often local files are hashed"""
+    calls = []
+    original = r2_uploader._file_digests
+
+    def counting(path, part_size):
+        calls.append(str(path))
+        return original(path, part_size)
+
+    monkeypatch.setattr(r2_uploader, '_file_digests', counting)
+    return calls
+
+
+def _write(path, size: int):
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def test_multipart_upload(uploader, tmp_path):
+    source = _write(tmp_path / 'source.mp4', 11 * MB)
+
+    result = uploader.upload_file(source, 'media/source.mp4')
+
+    assert result.status == 'uploaded'
+    assert result.size_bytes == 11 * MB
+    assert result.etag.endswith('-3')  # three 5 MB parts
+    body = uploader.client.get_object(Bucket=BUCKET, Key='media/source.mp4')['Body'].read()
+    assert body == source.read_bytes()
+
+
+def test_unchanged_files_are_skipped(uploader, tmp_path):
+    small = _write(tmp_path / 'insights.json', 1024)
+    large = _write(tmp_path / 'audio.mp3', 6 * MB)
+
+    assert uploader.upload_file(small, 'insights.json').status == 'uploaded'
+    assert uploader.upload_file(large, 'audio.mp3').status == 'uploaded'
+
+    assert uploader.upload_file(small, 'insights.json').status == 'skipped'
+    assert uploader.upload_file(large, 'audio.mp3').status == 'skipped'  # multipart ETag
+
+
+def test_changed_file_with_same_size_is_uploaded(uploader, tmp_path):
+    path = _write(tmp_path / 'transcript.json', 2048)
+    uploader.upload_file(path, 'transcript.json')
+
+    _write(path, 2048)
+    result = uploader.upload_file(path, 'transcript.json')
+
+    assert result.status == 'uploaded'
+    body = uploader.client.get_object(Bucket=BUCKET, Key='transcript.json')['Body'].read()
+    assert body == path.read_bytes()
+
+
+def test_file_is_hashed_only_when_remote_size_matches(uploader, tmp_path, digests):
+    path = _write(tmp_path / 'audio.mp3', 4096)
+
+    uploader.upload_file(path, 'audio.mp3')          # no remote object
+    assert digests == []
+
+    _write(path, 8192)
+    uploader.upload_file(path, 'audio.mp3')          # remote has another size
+    assert digests == []
+
+    assert uploader.upload_file(path, 'audio.mp3').status == 'skipped'
+    assert digests == [str(path)]
+
+
+def test_upload_many_keeps_item_order(uploader, tmp_path):
+    # Largest first, so completion order differs from item order
+    items = [
+        {'local_path': _write(tmp_path / f"file_{i}.bin", size), 'key': f"many/file_{i}.bin"}
+        for i, size in enumerate([6 * MB, 512 * 1024, 1024, 3 * MB, 10])
+    ]
+
+    results = uploader.upload_many(items)
+
+    assert [r.key for r in results] == [item['key'] for item in items]
+    assert [r.size_bytes for r in results] == [item['local_path'].stat().st_size for item in items]
+    assert all(r.status == 'uploaded' for r in results)
+
+
+def test_failures_are_returned_not_raised(uploader, tmp_path):
+    good = _write(tmp_path / 'good.json', 100)
+    items = [
+        {'local_path': good, 'key': 'good.json'},
+        {'local_path': tmp_path / 'missing.json', 'key': 'missing.json'},
+        {'local_path': good, 'key': 'good.json', 'bucket': 'no-such-bucket'},
+    ]
+
+    results = uploader.upload_many(items)
+
+    assert [r.status for r in results] == ['uploaded', 'failed', 'failed']
+    assert all(r.error for r in results[1:])
+    assert not results[1].ok and results[1].size_bytes == 0
@@ -0,0 +1,86 @@
+"""
+Tests for lib/remotion_render.py - chunk planning and manifest resume
+
+Remotion and ffmpeg are replaced by fakes that write placeholder files.
+"""
+
+import pytest
+
+from lib import remotion_render
+from lib.remotion_render import render_chunked, split_frames
+
+
+@pytest.fixture
+def fake_remotion(monkeypatch):
+    """Fake npx/ffmpeg: records rendered frame ranges, fails ranges listed in `fail`"""
+    state = {'rendered': [], 'fail': set()}
+
+    def fake_render(cmd, studio_dir, retries):
+        frames = next((a.split('=', 1)[1] for a in cmd if a.startswith('--frames=')), None)
+        if frames in state['fail']:
+            return False, retries + 1, 'boom'
+        if frames:
+            state['rendered'].append(frames)
+        with open(cmd[5], 'w') as f:
+            f.write('x')
+        return True, 1, ''
+
+    monkeypatch.setattr(remotion_render, 'bundle', lambda studio_dir, out_dir: None)
+    monkeypatch.setattr(remotion_render, '_render', fake_render)
+    monkeypatch.setattr(remotion_render, '_chunk_valid', lambda chunk, fps: chunk.file.exists())
+    monkeypatch.setattr(remotion_render, 'concat', lambda chunks, audio, output: output.write_text('mp4'))
+    return state
+
+
+def test_split_frames_covers_every_frame():
+    ranges = split_frames(5000, 4)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 4999
+    assert all(b[0] == a[1] + 1 for a, b in zip(ranges, ranges[1:]))
+
+
+def test_second_run_reuses_finished_chunks(tmp_path, fake_remotion):
+    output = tmp_path / 'render.mp4'
+    args = dict(composition_id='Comp', output=output, studio_dir=tmp_path,
+                total_frames=4000, fps=30, workers=2, chunks=4)
+    ranges = [f"{start}-{end}" for start, end in split_frames(4000, 4)]
+
+    fake_remotion['fail'] = {ranges[2]}
+    with pytest.raises(RuntimeError):
+        render_chunked(**args)
+    assert sorted(fake_remotion['rendered']) == sorted(r for r in ranges if r != ranges[2])
+
+    fake_remotion['fail'] = set()
+    fake_remotion['rendered'] = []
+    stats = render_chunked(**args)
+
+    assert stats['chunks_reused'] == 3
+    assert fake_remotion['rendered'] == [ranges[2]]
+    assert output.read_text() == 'mp4'
+
+
+@pytest.mark.parametrize('edit', ['job', 'studio'])
+def test_changed_fingerprint_rerenders_every_chunk(tmp_path, fake_remotion, edit):
+    studio = tmp_path / 'studio'
+    (studio / 'src').mkdir(parents=True)
+    (studio / 'src' / 'Root.tsx').write_text('export const Root = 1;')
+    job_file = tmp_path / 'job.yaml'
+    job_file.write_text('trim_start_seconds: 5\n')
+    output = tmp_path / 'render.mp4'
+    args = dict(composition_id='Comp', output=output, studio_dir=studio, total_frames=4000,
+                fps=30, workers=2, chunks=4, inputs=[job_file])
+    ranges = [f"{start}-{end}" for start, end in split_frames(4000, 4)]
+
+    fake_remotion['fail'] = {ranges[2]}
+    with pytest.raises(RuntimeError):
+        render_chunked(**args)
+
+    if edit == 'job':
+        job_file.write_text('trim_start_seconds: 12\n')
+    else:
+        (studio / 'src' / 'Root.tsx').write_text('export const Root = 2;')
+    fake_remotion['fail'] = set()
+    fake_remotion['rendered'] = []
+    stats = render_chunked(**args)
+
+    assert stats['chunks_reused'] == 0
+    assert sorted(fake_remotion['rendered']) == sorted(ranges)
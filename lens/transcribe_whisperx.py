@@ -15,6 +15,8 @@ import logging
 from pathlib import Path
 from typing import Dict, Optional
 
+from lib.tracing import file_size, init_from_env, span
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -52,16 +54,21 @@ def transcribe_earnings_call(
 
     # 1. Load WhisperX model
     logger.info(f"Loading WhisperX model: {model_size}")
-    model = whisperx.load_model(model_size, device, compute_type=compute_type)
+    with span('model_load', cat='model', model=f"whisperx-{model_size}", device=device, compute_type=compute_type):
+        model = whisperx.load_model(model_size, device, compute_type=compute_type)
 
     # 2. Load audio
     logger.info("Loading audio...")
-    audio = whisperx.load_audio(str(video_file))
+    with span('load_audio', cat='io', file=video_file.name, file_bytes=file_size(video_file)) as traced:
+        audio = whisperx.load_audio(str(video_file))
+        traced.set(audio_seconds=round(len(audio) / whisperx.audio.SAMPLE_RATE, 1))
 
     # 3. Transcribe
     logger.info("Transcribing...")
     batch_size = 16  # Reduce if low on GPU memory
-    result = model.transcribe(audio, batch_size=batch_size, language=language)
+    with span('asr', cat='model', model=f"whisperx-{model_size}", batch_size=batch_size, language=language) as traced:
+        result = model.transcribe(audio, batch_size=batch_size, language=language)
+        traced.set(segments=len(result.get('segments', [])))
 
     # Clear GPU memory
     gc.collect()
@@ -73,18 +80,20 @@ def transcribe_earnings_call(
     language_code = result["language"]
     if language_code in {"en", "fr", "de", "es", "it"}:
         logger.info(f"Aligning transcription for language: {language_code}")
-        model_a, metadata = whisperx.load_align_model(
-            language_code=language_code,
-            device=device
-        )
-        result = whisperx.align(
-            result["segments"],
-            model_a,
-            metadata,
-            audio,
-            device,
-            return_char_alignments=False
-        )
+        with span('align_model_load', cat='model', language=language_code, device=device):
+            model_a, metadata = whisperx.load_align_model(
+                language_code=language_code,
+                device=device
+            )
+        with span('alignment', cat='model', language=language_code, segments=len(result["segments"])):
+            result = whisperx.align(
+                result["segments"],
+                model_a,
+                metadata,
+                audio,
+                device,
+                return_char_alignments=False
+            )
 
         # Clear GPU memory
         gc.collect()
@@ -98,12 +107,15 @@ def transcribe_earnings_call(
         if not hf_token:
             logger.warning("HF_TOKEN not found. Skipping diarization.")
         else:
-            diarize_model = whisperx.DiarizationPipeline(
-                use_auth_token=hf_token,
-                device=device
-            )
-            diarize_segments = diarize_model(audio)
-            result = whisperx.assign_word_speakers(diarize_segments, result)
+            with span('diarization_model_load', cat='model', device=device):
+                diarize_model = whisperx.DiarizationPipeline(
+                    use_auth_token=hf_token,
+                    device=device
+                )
+            with span('diarization', cat='model') as traced:
+                diarize_segments = diarize_model(audio)
+                result = whisperx.assign_word_speakers(diarize_segments, result)
+                traced.set(speakers=len({seg.get('speaker') for seg in result.get('segments', []) if seg.get('speaker')}))
 
             # Clear GPU memory
             gc.collect()
@@ -194,6 +206,9 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    # Spans go to the parent's trace when it runs us with tracing on
+    init_from_env('transcribe_whisperx')
+
     video_file = Path(args.video_file)
 
     if args.output_dir:
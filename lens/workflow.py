@@ -2,6 +2,15 @@
 Workflow Orchestrator - Execute composable workflows defined in YAML
 
 Replaces hardcoded pipeline logic with flexible workflow execution
+
+With staging (--stage or the workflow's `staging.mode: scratch`) the job runs
+on local scratch and is synced back to its shared directory at checkpoints
+(steps with `checkpoint: true`, every `staging.checkpoint_minutes`) and at
+the end of the run - see lib/job_staging.py.
+
+--trace records a timeline of the run (steps, model loads, LLM calls,
+subprocesses, uploads) as Chrome trace JSON for Perfetto; --profile adds a
+cProfile or pyinstrument profile - see lib/tracing.py.
 """
 
 import sys
@@ -19,12 +28,25 @@ sys.path.insert(0, str(LENS_DIR / "scripts"))
 
 from job import JobManager
 from step_registry import get_handler, list_handlers
+from lib.artifact_io import ArtifactContext, set_active_context
+from lib.job_catalog import index_saved_job
+from lib.job_staging import JobStage
+from lib.step_payloads import load_job_file
+from lib.tracing import finish_tracing, profiling, span, start_tracing
+from lib.upload_queue import BackgroundUploader, UploadQueue, set_active_queue
 
 
 class WorkflowOrchestrator:
     """Execute workflow steps defined in YAML"""
 
-    def __init__(self, job_file: Path, workflow_file: Optional[Path] = None, force: bool = False):
+    def __init__(
+        self,
+        job_file: Path,
+        workflow_file: Optional[Path] = None,
+        force: bool = False,
+        background_uploads: Optional[bool] = None,
+        staging: Optional[bool] = None
+    ):
         """
         Initialize workflow orchestrator
 
@@ -32,12 +54,48 @@ class WorkflowOrchestrator:
             job_file: Path to job.yaml
             workflow_file: Optional path to custom workflow YAML (overrides job's workflow)
             force: Force re-run completed steps
+            background_uploads: Overlap R2 uploads with later steps
+                                (None = use workflow's `uploads.mode`)
+            staging: Run on local scratch and sync to the job dir at checkpoints
+                     (None = use workflow's `staging.mode`)
         """
         self.job = JobManager(job_file)
         self.job_dir = job_file.parent
         self.workflow = self._load_workflow(workflow_file)
         self.force = force
 
+        # Local-scratch staging: steps and job.yaml saves work on local disk
+        staging_config = self.workflow.get('staging', {})
+        if staging is None:
+            staging = staging_config.get('mode') == 'scratch'
+        self.checkpoint_seconds = staging_config.get('checkpoint_minutes', 10) * 60
+        self.stage: Optional[JobStage] = None
+        if staging:
+            self.stage = JobStage(self.job_dir, inputs=staging_config.get('inputs', 'copy'))
+            job_file = self.stage.stage_in()
+            self.stage.localize_inputs()
+            self.job = JobManager(job_file, index=False)
+            self.job_dir = job_file.parent
+
+        # Workflow-level source media preference (a job's own input.media wins)
+        source_media = self.workflow.get('source', {}).get('media')
+        if source_media:
+            self.job.job.setdefault('input', {}).setdefault('media', source_media)
+
+        # Workflow-level shorts renderer settings (a job's own shorts.* wins)
+        for key, value in self.workflow.get('shorts', {}).items():
+            self.job.job.setdefault('shorts', {}).setdefault(key, value)
+
+        uploads_config = self.workflow.get('uploads', {})
+        if background_uploads is None:
+            background_uploads = uploads_config.get('mode') == 'background'
+        self.background_uploads = background_uploads
+        self.upload_parallel = uploads_config.get('max_parallel', 4)
+        self.uploader: Optional[BackgroundUploader] = None
+
+        # Parsed transcript/insights shared by the steps of one run
+        self.artifacts = ArtifactContext()
+
     def _load_workflow(self, workflow_file: Optional[Path] = None) -> Dict[str, Any]:
         """
         Load workflow definition from YAML
@@ -91,9 +149,11 @@ class WorkflowOrchestrator:
             'job': self.job.job,
             'processing': self.job.job.get('processing', {}),
             'company': self.job.job.get('company', {}),
-            'insights': self.job.job.get('processing', {}).get('extract_insights', {}).get('data', {}),
             'metadata': self.job.job.get('metadata', {}),
         }
+        # Insights usually live in a sidecar (steps/extract_insights.json) - only read them if needed
+        if 'insights' in condition:
+            context['insights'] = self.job.job.get('processing', {}).get('extract_insights', {}).get('data', {})
 
         try:
             # Evaluate condition safely
@@ -167,7 +227,11 @@ class WorkflowOrchestrator:
 
             # Execute handler
             # Handlers receive (job_dir, job_data) and return result dict
-            result = handler(self.job_dir, self.job.job)
+            hits_before = self.artifacts.totals()
+            with span(step_name, cat='step', handler=handler_name, job_id=self.job.job.get('job_id')) as traced:
+                result = handler(self.job_dir, self.job.job)
+                traced.set(artifact_cache_hits=self.artifacts.totals().hits - hits_before.hits)
+            self._report_step_cache(hits_before)
 
             # Update job with result (merge result dict into step data)
             self.job.update_step(
@@ -178,6 +242,7 @@ class WorkflowOrchestrator:
             )
 
             print(f"✅ {step_name} completed")
+            self._checkpoint(step)
             return True
 
         except Exception as e:
@@ -190,6 +255,7 @@ class WorkflowOrchestrator:
             )
 
             print(f"❌ {step_name} failed: {e}")
+            self._checkpoint(step)
 
             if required:
                 print(f"\n⚠️  Step '{step_name}' is required. Stopping workflow.")
@@ -198,6 +264,86 @@ class WorkflowOrchestrator:
                 print(f"\n⚠️  Step '{step_name}' is optional. Continuing workflow.")
                 return False
 
+    def _report_step_cache(self, before):
+        """Print artifact cache hits of the step that just ran"""
+        after = self.artifacts.totals()
+        hits = after.hits - before.hits
+        if hits:
+            saved = after.saved_seconds - before.saved_seconds
+            print(f"📦 Artifact cache: {hits} hit(s), {saved:.2f}s parse time saved")
+
+    def _start_artifact_cache(self):
+        """Make load_json_artifact() read through this run's cache"""
+        set_active_context(self.artifacts)
+
+    def _finish_artifact_cache(self):
+        """Deactivate the cache and print what it saved"""
+        set_active_context(None)
+        total = self.artifacts.totals()
+        if total.hits == 0:
+            return
+        print(f"\n📦 Artifact cache: {total.hits} hit(s), {total.misses} parse(s), "
+              f"{total.saved_seconds:.2f}s parse time saved")
+        for path, stats in sorted(self.artifacts.report().items()):
+            if stats['hits']:
+                print(f"   {Path(path).name:40} {stats['hits']} hit(s), "
+                      f"{stats['saved_seconds']:.2f}s saved")
+
+    def _checkpoint(self, step: Dict[str, Any]):
+        """Sync a staged job after a step marked `checkpoint` or when the last sync is too old"""
+        if not self.stage:
+            return
+        self.stage.localize_inputs()
+        if step.get('checkpoint') or self.stage.seconds_since_sync() >= self.checkpoint_seconds:
+            self.stage.sync(reason=f"after {step['name']}")
+            self._index_shared()
+
+    def _finish_staging(self, success: bool):
+        """Final sync of a staged job (scratch is kept after a failed run for a fast re-run)"""
+        if not self.stage:
+            return
+        self.stage.finish(keep_scratch=not success)
+        self._index_shared()
+
+    def _index_shared(self):
+        """Catalog the shared job dir (staged saves skip per-save indexing)"""
+        shared_dir = self.stage.shared_dir
+        index_saved_job(load_job_file(shared_dir / 'job.yaml'), shared_dir, scan=True)
+
+    def _start_uploads(self):
+        """Start background uploader (upload steps enqueue instead of blocking)"""
+        if not self.background_uploads:
+            return
+
+        queue = UploadQueue()
+        set_active_queue(queue)
+        self.uploader = BackgroundUploader(queue, max_parallel=self.upload_parallel)
+        self.uploader.start()
+        print(f"📤 Background uploads enabled ({self.upload_parallel} parallel, queue: {queue.db_path})")
+
+    def _finish_uploads(self) -> int:
+        """
+        Drain remaining uploads and stop the background uploader
+
+        Returns:
+            Number of this job's uploads that failed
+        """
+        if not self.uploader:
+            return 0
+
+        queue = self.uploader.queue
+        print(f"\n⏳ Draining background uploads...")
+        self.uploader.stop(drain=True)
+        self.uploader = None
+        set_active_queue(None)
+
+        failed = queue.list_uploads(status='failed', job_id=self.job.job['job_id'])
+        for row in failed:
+            print(f"❌ Upload failed: {row['key']} ({row['error']})")
+        if not failed:
+            print(f"✅ Background uploads complete")
+        return len(failed)
+
     def run_all(self):
         """Execute all steps in workflow"""
         print(f"\n{'#'*60}")
@@ -212,16 +358,22 @@ class WorkflowOrchestrator:
         failed_steps = 0
         skipped_steps = 0
 
-        for step in self.workflow['steps']:
-            try:
-                success = self._execute_step(step)
-                if success:
-                    successful_steps += 1
-                else:
+        self._start_uploads()
+        self._start_artifact_cache()
+        try:
+            for step in self.workflow['steps']:
+                try:
+                    success = self._execute_step(step)
+                    if success:
+                        successful_steps += 1
+                    else:
+                        failed_steps += 1
+                except Exception:
                     failed_steps += 1
-            except Exception:
-                failed_steps += 1
-                break  # Stop on required step failure
+                    break  # Stop on required step failure
+        finally:
+            self._finish_artifact_cache()
+            failed_uploads = self._finish_uploads()
 
         total_steps = len(self.workflow['steps'])
         print(f"\n{'#'*60}")
@@ -233,13 +385,18 @@ class WorkflowOrchestrator:
         print(f"⏭️  Skipped: {total_steps - successful_steps - failed_steps}")
         print(f"{'#'*60}\n")
 
-        if failed_steps == 0:
+        if failed_uploads:
+            print(f"⚠️  {failed_uploads} background upload(s) failed (retry: python lens/scripts/upload_queue.py retry)")
+
+        if failed_steps == 0 and failed_uploads == 0:
             self.job.set_status("completed")
             print("🎉 Workflow completed successfully!")
         else:
             self.job.set_status("failed")
             print("⚠️  Workflow incomplete. See errors above.")
 
+        self._finish_staging(success=failed_steps == 0 and failed_uploads == 0)
+
     def run_step(self, step_name: str):
         """
         Execute single step by name
@@ -263,7 +420,13 @@ class WorkflowOrchestrator:
         print(f"# Job: {self.job.job['job_id']}")
         print(f"{'#'*60}\n")
 
-        self._execute_step(step)
+        self._start_artifact_cache()
+        success = False
+        try:
+            success = self._execute_step(step)
+        finally:
+            self._finish_artifact_cache()
+            self._finish_staging(success)
 
     def run_from_step(self, start_step_name: str):
         """
@@ -289,12 +452,21 @@ class WorkflowOrchestrator:
         print(f"{'#'*60}\n")
 
         # Execute from start_index onwards
-        for step in self.workflow['steps'][start_index:]:
-            try:
-                self._execute_step(step)
-            except Exception:
-                print(f"\n⚠️  Stopping workflow at {step['name']}")
-                break
+        self._start_uploads()
+        self._start_artifact_cache()
+        success = True
+        try:
+            for step in self.workflow['steps'][start_index:]:
+                try:
+                    success = self._execute_step(step) and success
+                except Exception:
+                    success = False
+                    print(f"\n⚠️  Stopping workflow at {step['name']}")
+                    break
+        finally:
+            self._finish_artifact_cache()
+            success = self._finish_uploads() == 0 and success
+            self._finish_staging(success)
 
 
 def main():
@@ -310,6 +482,42 @@ def main():
     parser.add_argument("--from-step", help="Run from specific step onwards")
     parser.add_argument("--force", action="store_true", help="Force re-run completed steps")
     parser.add_argument("--list-handlers", action="store_true", help="List available step handlers")
+    parser.add_argument(
+        "--background-uploads",
+        action="store_true",
+        default=None,
+        help="Queue R2 uploads and keep running later steps (default: workflow's uploads.mode)"
+    )
+    parser.add_argument(
+        "--no-background-uploads",
+        dest="background_uploads",
+        action="store_false",
+        help="Upload to R2 synchronously inside each upload step"
+    )
+    parser.add_argument(
+        "--stage",
+        action="store_true",
+        default=None,
+        help="Run on local scratch (JOB_SCRATCH_DIR) and sync to the job dir at checkpoints "
+             "(default: workflow's staging.mode)"
+    )
+    parser.add_argument(
+        "--no-stage",
+        dest="stage",
+        action="store_false",
+        help="Run directly in the job dir"
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="auto",
+        help="Record a span timeline as Chrome trace JSON (default path: <job>/traces/workflow-<time>.json)"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "pyinstrument"],
+        help="Also profile the run (output next to the trace)"
+    )
 
     args = parser.parse_args()
 
@@ -328,16 +536,40 @@ def main():
         print(f"❌ Job file not found: {args.job_file}")
         sys.exit(1)
 
+    # Tracing starts before the orchestrator so staging shows on the timeline
+    trace_file = args.trace
+    if trace_file is None and args.profile:
+        trace_file = 'auto'
+    if trace_file == 'auto':
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        trace_file = args.job_file.parent / 'traces' / f"workflow-{timestamp}.json"
+    if trace_file:
+        trace_file = Path(trace_file)
+        start_tracing(trace_file, process_name=f"workflow {args.job_file.parent.name}")
+
     # Create orchestrator
-    orchestrator = WorkflowOrchestrator(args.job_file, args.workflow_file, force=args.force)
+    orchestrator = WorkflowOrchestrator(
+        args.job_file,
+        args.workflow_file,
+        force=args.force,
+        background_uploads=args.background_uploads,
+        staging=args.stage
+    )
 
     # Execute workflow
-    if args.step:
-        orchestrator.run_step(args.step)
-    elif args.from_step:
-        orchestrator.run_from_step(args.from_step)
-    else:
-        orchestrator.run_all()
+    try:
+        with profiling(args.profile, trace_file.with_suffix('') if trace_file else None), \
+                span('workflow', cat='workflow', workflow=orchestrator.workflow['name'],
+                     job_id=orchestrator.job.job.get('job_id')):
+            if args.step:
+                orchestrator.run_step(args.step)
+            elif args.from_step:
+                orchestrator.run_from_step(args.from_step)
+            else:
+                orchestrator.run_all()
+    finally:
+        if trace_file:
+            finish_tracing(trace_file)
 
 
 if __name__ == "__main__":
@@ -3,11 +3,12 @@
 Download YouTube video using yt-dlp (more reliable than RapidAPI)
 
 Usage:
-    python scripts/download-youtube-ytdlp.py <youtube_url_or_video_id>
+    python scripts/download-youtube-ytdlp.py <youtube_url_or_video_id> [ticker] [--audio-only]
 
 Examples:
     python scripts/download-youtube-ytdlp.py https://www.youtube.com/watch?v=i2IQv6zfgA8
     python scripts/download-youtube-ytdlp.py i2IQv6zfgA8
+    python scripts/download-youtube-ytdlp.py i2IQv6zfgA8 PLTR --audio-only   # best audio stream only (.m4a)
 """
 
 import os
@@ -28,8 +29,8 @@ def extract_video_id(url_or_id: str) -> str:
         return url_or_id
 
 
-def download_video(video_id: str, output_dir: str, ticker: str = "PLTR"):
-    """Download YouTube video using yt-dlp"""
+def download_video(video_id: str, output_dir: str, ticker: str = "PLTR", audio_only: bool = False):
+    """Download YouTube video using yt-dlp (audio_only: best audio stream, kept as-is)"""
 
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
@@ -46,35 +47,52 @@ def download_video(video_id: str, output_dir: str, ticker: str = "PLTR"):
     print(f"Video URL: {youtube_url}")
     print(f"Video ID: {video_id}")
     print(f"Output directory: {output_dir}")
+    print(f"Media: {'audio only' if audio_only else 'video'}")
     print(f"{'='*60}\n")
 
     # yt-dlp command
-    # Download best video+audio in mp4 format
-    cmd = [
-        'yt-dlp',
-        '-f', 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-        '--merge-output-format', 'mp4',
-        '-o', output_template,
-        '--write-info-json',  # Save metadata
-        '--no-playlist',
-        youtube_url
-    ]
-
-    print(f"⬇️  Downloading video...")
+    if audio_only:
+        # Best audio-only stream, no video bytes and no merge/re-encode
+        cmd = [
+            'yt-dlp',
+            '-f', 'bestaudio[ext=m4a]/bestaudio',
+            '-o', output_template,
+            '--write-info-json',  # Save metadata
+            '--no-playlist',
+            youtube_url
+        ]
+    else:
+        # Download best video+audio in mp4 format
+        cmd = [
+            'yt-dlp',
+            '-f', 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+            '--merge-output-format', 'mp4',
+            '-o', output_template,
+            '--write-info-json',  # Save metadata
+            '--no-playlist',
+            youtube_url
+        ]
+
+    print(f"⬇️  Downloading {'audio' if audio_only else 'video'}...")
     print(f"Running: {' '.join(cmd)}\n")
 
     try:
         # Run yt-dlp
         result = subprocess.run(cmd, check=True, capture_output=False, text=True)
 
-        # Check if file was created
+        # Check if file was created (audio keeps its native extension: m4a, webm, ...)
         video_path = os.path.join(output_dir, f"{video_id}.mp4")
+        if audio_only:
+            media_files = [f for f in Path(output_dir).glob(f"{video_id}.*")
+                           if f.suffix not in ('.json', '.part', '.ytdl')]
+            if media_files:
+                video_path = str(media_files[0])
 
         if os.path.exists(video_path):
             file_size = os.path.getsize(video_path) / (1024 * 1024)  # MB
 
             print(f"\n{'='*60}")
-            print(f"✅ Successfully downloaded video {video_id}")
+            print(f"✅ Successfully downloaded {'audio' if audio_only else 'video'} {video_id}")
             print(f"📁 Location: {video_path}")
             print(f"📦 Size: {file_size:.1f} MB")
 
@@ -95,15 +113,20 @@ def download_video(video_id: str, output_dir: str, ticker: str = "PLTR"):
             # Print next steps
             audio_dir = os.path.join(os.path.dirname(output_dir), 'audio', ticker)
             print(f"\n✅ Next steps:")
-            print(f"1. Extract audio track:")
-            print(f"   mkdir -p {audio_dir}")
-            print(f"   ffmpeg -i {video_path} -vn -acodec copy {audio_dir}/{video_id}.m4a")
+            if audio_only:
+                print(f"1. Move audio track:")
+                print(f"   mkdir -p {audio_dir}")
+                print(f"   mv {video_path} {audio_dir}/")
+            else:
+                print(f"1. Extract audio track:")
+                print(f"   mkdir -p {audio_dir}")
+                print(f"   ffmpeg -i {video_path} -vn -acodec copy {audio_dir}/{video_id}.m4a")
             print(f"2. Create Remotion composition")
             print(f"3. Render video\n")
 
             return True
         else:
-            print(f"❌ Error: Video file not created at {video_path}")
+            print(f"❌ Error: Media file not created at {video_path}")
             return False
 
     except subprocess.CalledProcessError as e:
@@ -116,24 +139,27 @@ def download_video(video_id: str, output_dir: str, ticker: str = "PLTR"):
 
 def main():
     """Main entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/download-youtube-ytdlp.py <youtube_url_or_video_id>")
+    audio_only = '--audio-only' in sys.argv
+    argv = [a for a in sys.argv if a != '--audio-only']
+
+    if len(argv) < 2:
+        print("Usage: python scripts/download-youtube-ytdlp.py <youtube_url_or_video_id> [ticker] [--audio-only]")
         print("\nExamples:")
         print("  python scripts/download-youtube-ytdlp.py https://www.youtube.com/watch?v=i2IQv6zfgA8")
         print("  python scripts/download-youtube-ytdlp.py i2IQv6zfgA8")
         sys.exit(1)
 
-    url_or_id = sys.argv[1].strip()
+    url_or_id = argv[1].strip()
     video_id = extract_video_id(url_or_id)
 
     # Ticker can be passed as second argument (default: PLTR)
-    ticker = sys.argv[2] if len(sys.argv) > 2 else "PLTR"
+    ticker = argv[2] if len(argv) > 2 else "PLTR"
 
     # Determine download directory
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     download_dir = os.path.join(base_dir, "public", "videos", ticker)
 
-    success = download_video(video_id, download_dir, ticker)
+    success = download_video(video_id, download_dir, ticker, audio_only=audio_only)
 
     sys.exit(0 if success else 1)
 